@@ -0,0 +1,249 @@
+import argparse
+import glob
+import json
+import logging
+import os
+import time
+
+import pandas as pd
+
+from resources.constants.berebel.BerebelConstants import berebel_statement_template
+from resources.constants.common.Constants import (
+    extraction_store_folder_path,
+    metrics_folder_path,
+)
+from resources.constants.light_bills.LightBillsConstants import light_bill_templates
+from resources.functions.ExtractionStoreFunctions import load_domain_extractions
+from resources.functions.Functions import compute_file_hash
+from resources.functions.MetricsFunctions import compute_quantile
+from resources.functions.PipelineFunctions import domain_configs
+from transformations.berebel import BerebelPdfParser
+from transformations.light_bills import EnelPdfParser
+from transformations.salary import RelatechPdfParser
+
+# Configurazione del logger
+logging.basicConfig(
+    level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s"
+)
+logger = logging.getLogger()
+
+# Estrattori diretti da confrontare con le risposte dell'LLM, per dominio:
+# funzione che restituisce i campi estratti da un PDF e la loro confidenza, colonne dello storico
+# corrispondenti ai campi (per i documenti senza estrazione salvata) e campo usato per abbinare
+# documento e riga dello storico
+benchmark_configs = {
+    "berebel": {
+        "input_folder": "backend/resources/input_data/berebel",
+        "extract": BerebelPdfParser.extract_statement_fields,
+        "history_columns": {field: field for field in berebel_statement_template["fields"]},
+        "match_field": "periodo_estratto_conto",
+    },
+    "light_bills": {
+        "input_folder": "backend/resources/input_data/light_bills",
+        "extract": EnelPdfParser.extract_bill_fields,
+        "history_columns": {
+            field: field for field in light_bill_templates["Enel Energia"]["fields"]
+        },
+        "match_field": "numero_fattura",
+    },
+    "salary": {
+        "input_folder": "backend/resources/input_data/salary",
+        "extract": RelatechPdfParser.extract_payslip_fields,
+        "history_columns": {
+            "periodo_di_retribuzione": "string_periodo_di_retribuzione",
+            "totale_retribuzione_minima_lorda": "retribuzione_minima_lorda",
+            "giorni_lavorati": "giorni_lavorati",
+            "ore_lavorate": "ore_lavorate",
+            "ore_straordinarie": "ore_straordinarie",
+            "ritenute_irpef": "irpef_pagata",
+            "totale_competenze": "totale_competenze",
+            "totale_trattenute": "totale_trattenute",
+            "arrotondamento": "arrotondamento",
+            "netto_del_mese": "netto_del_mese",
+            "retribuzione_utile_tfr": "retribuzione_utile_tfr",
+            "quota_tfr": "quota_tfr",
+            "totale_ferie_rimanenti": "totale_ferie_rimanenti",
+            "totale_permessi_rimanenti": "totale_permessi_rimanenti",
+        },
+        "match_field": "periodo_di_retribuzione",
+    },
+}
+
+# Differenza massima tra due valori numerici considerati uguali (lo storico arrotonda per eccesso)
+numeric_tolerance = 0.011
+
+
+def parse_arguments():
+    parser = argparse.ArgumentParser(
+        description="Confronta accuratezza e velocità degli estrattori diretti dei PDF "
+        "con le risposte dell'LLM salvate (store delle estrazioni o storico del dominio)."
+    )
+    parser.add_argument(
+        "--domain",
+        choices=sorted(benchmark_configs),
+        default="salary",
+        help="Dominio da misurare (default: salary).",
+    )
+    return parser.parse_args()
+
+
+def values_match(extracted, reference):
+    """
+    Confronta un valore estratto con quello di riferimento: numeri con tolleranza,
+    stringhe senza maiuscole e spazi. Un valore assente equivale allo 0 o alla stringa vuota
+    con cui lo storico riempie i campi mancanti; i numeri dello storico possono avere la virgola decimale.
+    """
+    if pd.isnull(reference) or reference == "":
+        reference = None
+    if isinstance(reference, (int, float)) or isinstance(extracted, (int, float)):
+        try:
+            return (
+                abs(float(extracted or 0) - float(str(reference or 0).replace(",", ".")))
+                <= numeric_tolerance
+            )
+        except (TypeError, ValueError):
+            return False
+    return str(extracted or "").strip().lower() == str(reference or "").strip().lower()
+
+
+def load_history_references(domain, config):
+    """
+    Carica le righe dello storico del dominio come riferimenti, con i nomi dei campi estratti.
+    """
+    history_path = domain_configs[domain]["output_path"]
+    if not os.path.isfile(history_path):
+        return []
+    history_df = pd.read_csv(history_path, encoding="utf-8-sig")
+    references = []
+    for _, row in history_df.iterrows():
+        references.append(
+            {field: row.get(column) for field, column in config["history_columns"].items()}
+        )
+    return references
+
+
+def find_reference(fields, stored_responses, history_references, config, document_hash):
+    """
+    Trova la risposta di riferimento di un documento: l'estrazione salvata con lo stesso hash,
+    altrimenti la riga dello storico con lo stesso valore del campo di abbinamento che concorda
+    sul maggior numero di campi.
+
+    Returns:
+        tuple: Riferimento (dict) e sua origine ('store' o 'history'), oppure (None, None).
+    """
+    if document_hash in stored_responses:
+        return stored_responses[document_hash], "store"
+
+    match_field = config["match_field"]
+    candidates = [
+        reference
+        for reference in history_references
+        if values_match(fields.get(match_field), reference.get(match_field))
+    ]
+    if not candidates:
+        return None, None
+    best = max(
+        candidates,
+        key=lambda reference: sum(
+            values_match(fields.get(field), reference.get(field)) for field in fields
+        ),
+    )
+    return best, "history"
+
+
+def load_stored_responses(domain):
+    """
+    Carica le risposte JSON dell'LLM salvate nello store delle estrazioni, per hash del documento.
+    """
+    stored_responses = {}
+    for record in load_domain_extractions(extraction_store_folder_path, domain):
+        try:
+            stored_responses[record["document_hash"]] = json.loads(record["response"])
+        except (TypeError, ValueError):
+            continue
+    return stored_responses
+
+
+def load_llm_stage_quantiles():
+    """
+    Legge dallo storico delle esecuzioni la durata mediana della fase LLM più recente, se disponibile.
+    """
+    history_path = os.path.join(metrics_folder_path, "run_history.jsonl")
+    if not os.path.isfile(history_path):
+        return None
+    with open(history_path, "r", encoding="utf-8") as f:
+        runs = [json.loads(line) for line in f if line.strip()]
+    for run in reversed(runs):
+        stats = run.get("stages", {}).get("copilot")
+        if stats:
+            return stats
+    return None
+
+
+def run_benchmark(domain):
+    config = benchmark_configs[domain]
+    pdf_paths = sorted(
+        glob.glob(os.path.join(config["input_folder"], "**", "*.pdf"), recursive=True)
+    )
+    stored_responses = load_stored_responses(domain)
+    history_references = load_history_references(domain, config)
+
+    durations, matched_files = [], 0
+    # Per campo: valori concordi, valori confrontati e somma delle confidenze
+    field_results = {field: [0, 0, 0.0] for field in config["history_columns"]}
+    for pdf_path in pdf_paths:
+        started = time.perf_counter()
+        fields, confidences = config["extract"](pdf_path)
+        durations.append(time.perf_counter() - started)
+        if not fields:
+            logger.warning(f"{os.path.basename(pdf_path)}: layout non riconosciuto.")
+            continue
+
+        reference, source = find_reference(
+            fields,
+            stored_responses,
+            history_references,
+            config,
+            compute_file_hash(pdf_path),
+        )
+        if reference is None:
+            logger.warning(f"{os.path.basename(pdf_path)}: nessuna risposta di riferimento.")
+            continue
+        matched_files += 1
+        mismatches = []
+        for field, results in field_results.items():
+            results[1] += 1
+            results[2] += confidences.get(field, 0.0)
+            if values_match(fields.get(field), reference.get(field)):
+                results[0] += 1
+            else:
+                mismatches.append(f"{field}={fields.get(field)!r} (LLM {reference.get(field)!r})")
+        if mismatches:
+            logger.info(f"{os.path.basename(pdf_path)} [{source}]: {'; '.join(mismatches)}")
+
+    logger.info(
+        f"Dominio {domain}: {len(pdf_paths)} PDF, {matched_files} con una risposta di riferimento."
+    )
+    for field, (agreed, total, confidence) in field_results.items():
+        if total:
+            logger.info(
+                f"Campo '{field}': {agreed}/{total} concordi ({agreed / total:.0%}), "
+                f"confidenza media {confidence / total:.2f}."
+            )
+    if durations:
+        logger.info(
+            f"Estrattore diretto: p50 {compute_quantile(durations, 0.5) * 1000:.0f} ms, "
+            f"p95 {compute_quantile(durations, 0.95) * 1000:.0f} ms, "
+            f"totale {sum(durations):.2f}s per {len(durations)} PDF."
+        )
+    llm_stats = load_llm_stage_quantiles()
+    if llm_stats:
+        logger.info(
+            f"Fase LLM dell'ultima esecuzione registrata: p50 {llm_stats['p50_seconds']:.2f}s, "
+            f"p95 {llm_stats['p95_seconds']:.2f}s per documento."
+        )
+
+
+if __name__ == "__main__":
+    args = parse_arguments()
+    run_benchmark(args.domain)
@@ -1,32 +1,60 @@
-import json
+import argparse
+from concurrent.futures import ProcessPoolExecutor, as_completed
 
-from resources.constants.bank_transactions.BankConstants import (
-    bank_key_field,
-    bank_df_columns_to_select,
-    bank_copilot_info_to_extract,
+from resources.constants.common.Constants import (
+    checkpoint_store_file_path,
+    llm_backend_url,
+    metrics_folder_path,
+    scan_index_file_path,
 )
-from resources.constants.berebel.BerebelConstants import (
-    berebel_key_field,
-    berebel_df_columns_to_select,
-    berebel_copilot_info_to_extract,
+from resources.functions.CheckpointFunctions import (
+    get_file_fingerprint,
+    is_file_processed,
+    is_file_registered,
+    load_checkpoint_store,
+    save_checkpoint_store,
 )
-from resources.constants.light_bills.LightBillsConstants import (
-    light_key_field,
-    light_df_columns_to_select,
-    light_copilot_info_to_extract,
+from resources.functions.CopilotFunctions import (
+    configure_copilot_pool,
+    configure_copilot_response_wait,
 )
-from resources.constants.salary.RelatechConstants import (
-    relatech_df_columns_to_select,
-    relatech_key_field,
-    relatech_copilot_info_to_extract,
+from resources.functions.ExtractionBackendFunctions import (
+    backend_factories,
+    close_extraction_backend,
+    configure_extraction_backend,
 )
-from resources.functions.CopilotFunctions import run_copilot
-from resources.functions.PdfFunctions import extract_pdf_data
-from transformations.bank_transactions import IngTransform
-from transformations.berebel import BerebelTransform
-from transformations.light_bills import EnelTransform
-from transformations.salary import RelatechTransform
 from resources.functions.Functions import *
+from resources.functions.MetricsFunctions import (
+    create_run_metrics,
+    measure_stage,
+    write_run_metrics,
+)
+from resources.functions.PipelineFunctions import (
+    build_pipeline_stages,
+    collect_result,
+    commit_batches,
+    compact_histories,
+    configure_chunked_extraction,
+    configure_hybrid_extraction,
+    configure_native_parsers,
+    configure_page_selection,
+    configure_text_compaction,
+    describe_job,
+    domain_configs,
+    group_jobs_for_batching,
+    prepare_job,
+    process_file,
+    process_job_group,
+    replay_domain,
+)
+from resources.functions.ResponseCacheFunctions import configure_response_cache
+from resources.functions.ScanFunctions import (
+    load_scan_index,
+    save_scan_index,
+    scan_input_folder,
+)
+from resources.functions.StagedPipelineFunctions import run_staged_pipeline
+from resources.functions.WatchFunctions import watch_input_folder
 
 # Configurazione del logger
 logging.basicConfig(
@@ -34,214 +62,550 @@ logging.basicConfig(
 )
 logger = logging.getLogger()
 
-if __name__ == "__main__":
+
+def parse_arguments():
+    parser = argparse.ArgumentParser(
+        description="Elabora i file CSV e PDF presenti nella cartella input_data."
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help="Numero di processi per l'elaborazione dei file (default: 1, sequenziale).",
+    )
+    parser.add_argument(
+        "--pipeline",
+        action="store_true",
+        help="Usa la pipeline a stadi (estrazione -> LLM -> trasformazione -> caricamento) "
+        "con code limitate tra le fasi.",
+    )
+    parser.add_argument(
+        "--extract-workers",
+        type=int,
+        default=1,
+        help="Thread della fase di estrazione nella pipeline a stadi (default: 1).",
+    )
+    parser.add_argument(
+        "--llm-workers",
+        type=int,
+        default=1,
+        help="Thread della fase LLM nella pipeline a stadi (default: 1).",
+    )
+    parser.add_argument(
+        "--transform-workers",
+        type=int,
+        default=1,
+        help="Thread della fase di trasformazione nella pipeline a stadi (default: 1).",
+    )
+    parser.add_argument(
+        "--queue-size",
+        type=int,
+        default=2,
+        help="Capacità delle code tra le fasi della pipeline a stadi (default: 2).",
+    )
+    parser.add_argument(
+        "--backend",
+        choices=list(backend_factories),
+        default="selenium",
+        help="Backend di estrazione dei PDF: 'selenium' (Copilot nel browser) o 'http' "
+        "(servizio JSON, es. mock_llm_server_main.py) (default: selenium).",
+    )
+    parser.add_argument(
+        "--backend-url",
+        default=llm_backend_url,
+        help=f"URL del backend HTTP (default: {llm_backend_url}).",
+    )
+    parser.add_argument(
+        "--backend-concurrency",
+        type=int,
+        default=4,
+        help="Richieste contemporanee per processo verso il backend HTTP (default: 4).",
+    )
+    parser.add_argument(
+        "--backend-rate-limit",
+        type=float,
+        default=0,
+        help="Richieste al secondo per processo verso il backend HTTP (default: 0, nessun limite).",
+    )
+    parser.add_argument(
+        "--backend-timeout",
+        type=float,
+        default=120,
+        help="Secondi massimi per una richiesta al backend HTTP (default: 120).",
+    )
+    parser.add_argument(
+        "--copilot-max-uses",
+        type=int,
+        default=20,
+        help="Query servite da una sessione del browser di Copilot prima di essere riavviata (default: 20).",
+    )
+    parser.add_argument(
+        "--copilot-timeout",
+        type=float,
+        default=90.0,
+        help="Secondi massimi di attesa di una risposta completa di Copilot (default: 90).",
+    )
+    parser.add_argument(
+        "--copilot-stable-seconds",
+        type=float,
+        default=1.5,
+        help="Secondi con testo invariato dopo i quali una risposta di Copilot che non inizia "
+        "come un JSON è considerata completa (default: 1.5).",
+    )
+    parser.add_argument(
+        "--copilot-batch-chars",
+        type=int,
+        default=0,
+        help="Invia a Copilot i PDF dello stesso dominio in query multi-documento fino a questo "
+        "numero di caratteri di testo (default: 0, una query per documento).",
+    )
+    parser.add_argument(
+        "--chunked-extraction",
+        action="store_true",
+        help="Estrae a blocchi i PDF lunghi (estratti conto): il testo completo viene diviso "
+        "per pagine o movimenti e i blocchi vengono inviati in parallelo.",
+    )
+    parser.add_argument(
+        "--chunk-chars",
+        type=int,
+        default=6000,
+        help="Caratteri massimi di un blocco nell'estrazione a blocchi (default: 6000).",
+    )
+    parser.add_argument(
+        "--chunk-workers",
+        type=int,
+        default=4,
+        help="Blocchi dello stesso documento inviati in parallelo (default: 4).",
+    )
+    parser.add_argument(
+        "--no-native-parsers",
+        action="store_true",
+        help="Estrae con l'LLM anche i PDF con un layout noto (es. estratti conto ING), "
+        "senza leggerli direttamente.",
+    )
+    parser.add_argument(
+        "--no-hybrid-extraction",
+        action="store_true",
+        help="Estrae interamente con l'LLM i PDF che il parser diretto legge solo in parte, "
+        "invece di chiedere all'LLM i soli campi mancanti.",
+    )
+    parser.add_argument(
+        "--snippet-chars",
+        type=int,
+        default=300,
+        help="Caratteri di testo inviati all'LLM prima e dopo l'etichetta di ogni campo mancante "
+        "nell'estrazione ibrida (default: 300).",
+    )
+    parser.add_argument(
+        "--no-page-selection",
+        action="store_true",
+        help="Invia all'LLM il testo dei PDF in ordine di pagina fino al limite di caratteri, "
+        "senza selezionare le pagine con i campi da estrarre.",
+    )
+    parser.add_argument(
+        "--no-text-compaction",
+        action="store_true",
+        help="Non rimuove dal testo dei PDF le intestazioni e i piè di pagina ripetuti "
+        "e il testo ricorrente del dominio.",
+    )
+    parser.add_argument(
+        "--no-llm-cache",
+        action="store_true",
+        help="Non usa la cache delle risposte LLM (le risposte non vengono né lette né salvate).",
+    )
+    parser.add_argument(
+        "--llm-cache-ttl-days",
+        type=float,
+        default=90,
+        help="Giorni di validità di una risposta nella cache delle risposte LLM (default: 90).",
+    )
+    parser.add_argument(
+        "--history-store",
+        choices=["rewrite", "append"],
+        default="rewrite",
+        help="Scrittura degli storici: 'rewrite' rilegge e riscrive il CSV, "
+        "'append' aggiunge in coda usando l'indice delle chiavi (default: rewrite).",
+    )
+    parser.add_argument(
+        "--full-scan",
+        action="store_true",
+        help="Rilegge tutte le cartelle di input ignorando l'indice di scansione.",
+    )
+    parser.add_argument(
+        "--watch",
+        action="store_true",
+        help="Resta in esecuzione ed elabora i nuovi file man mano che arrivano in input_data.",
+    )
+    parser.add_argument(
+        "--debounce",
+        type=float,
+        default=2.0,
+        help="Secondi senza modifiche prima di elaborare i nuovi file in modalità watch (default: 2).",
+    )
+    parser.add_argument(
+        "--poll-interval",
+        type=float,
+        default=10.0,
+        help="Secondi tra due scansioni quando la modalità watch usa il polling (default: 10).",
+    )
+    parser.add_argument(
+        "--polling",
+        action="store_true",
+        help="In modalità watch usa il polling anche se inotify è disponibile.",
+    )
+    parser.add_argument(
+        "--compact",
+        action="store_true",
+        help="Compatta gli storici e ricostruisce gli indici delle chiavi, poi termina.",
+    )
+    parser.add_argument(
+        "--replay",
+        choices=list(domain_configs) + ["all"],
+        help="Ricostruisce lo storico del dominio indicato dalle risposte di Copilot salvate, "
+        "senza interrogare di nuovo l'LLM, poi termina.",
+    )
+    args = parser.parse_args()
+
+    # La pipeline a stadi usa thread in un solo processo e interroga un documento alla volta
+    if args.pipeline:
+        if args.workers > 1:
+            parser.error(
+                "--pipeline non supporta --workers: usare --extract-workers, --llm-workers "
+                "e --transform-workers."
+            )
+        if args.copilot_batch_chars > 0:
+            parser.error("--pipeline non supporta le query multi-documento (--copilot-batch-chars).")
+        if args.watch:
+            parser.error("--pipeline non è disponibile in modalità --watch.")
+    return args
+
+
+def find_files_to_process(
+    input_data_folder_path, checkpoint_store, scan_index, full_scan=False
+):
+    """
+    Scansiona ricorsivamente la cartella di input e restituisce i file CSV/PDF non ancora elaborati.
+    Nelle cartelle invariate secondo l'indice di scansione i file non vengono nemmeno letti:
+    si scartano in memoria quelli già registrati nello store dei checkpoint.
+
+    Parameters:
+        input_data_folder_path (str): Cartella radice dei file di input.
+        checkpoint_store (dict): Store dei checkpoint con i file già elaborati.
+        scan_index (dict): Indice di scansione della cartella di input.
+        full_scan (bool): Se True ignora l'indice di scansione.
+
+    Returns:
+        list: Percorsi dei file da elaborare.
+    """
+    changed_files, unchanged_files = scan_input_folder(
+        scan_index, input_data_folder_path, (".csv", ".pdf"), full_scan
+    )
+
+    files_to_process = [
+        file_path
+        for file_path in unchanged_files
+        if not is_file_registered(checkpoint_store, file_path)
+    ]
+    for file_path in changed_files:
+        try:
+            if not is_file_processed(checkpoint_store, file_path):
+                files_to_process.append(file_path)
+        except OSError as e:
+            logger.error(
+                f"Errore durante la verifica del file {os.path.basename(file_path)}: {e}"
+            )
+    return files_to_process
+
+
+def run_sequential(files_to_process, batches, run_metrics=None):
+    for file_path in files_to_process:
+        try:
+            collect_result(batches, process_file(file_path), run_metrics)
+        except Exception as e:
+            # Gestione degli errori per ogni fase dell'elaborazione del file
+            logger.error(
+                f"Errore durante l'elaborazione del file {os.path.basename(file_path)}: {e}"
+            )
+
+
+def run_parallel(files_to_process, executor, batches, run_metrics=None):
+    """
+    Distribuisce lettura, estrazione e trasformazione su un pool di processi.
+    I risultati tornano al processo principale, che raccoglie i batch e fa da unico writer.
+    Le durate delle fasi viaggiano insieme al risultato di ogni file.
+    """
+    logger.info(
+        f"Elaborazione di {len(files_to_process)} file sul pool di processi."
+    )
+    futures = {
+        executor.submit(process_file, file_path): file_path
+        for file_path in files_to_process
+    }
+    for future in as_completed(futures):
+        filename = os.path.basename(futures[future])
+        try:
+            collect_result(batches, future.result(), run_metrics)
+        except Exception as e:
+            logger.error(f"Errore durante l'elaborazione del file {filename}: {e}")
+
+
+def run_batched(
+    files_to_process, batches, max_chars, executor=None, run_metrics=None
+):
+    """
+    Elaborazione con query multi-documento: estrae tutti i file, raggruppa i PDF dello stesso
+    dominio entro max_chars caratteri di testo e invia ogni gruppo a Copilot con una sola query.
+    Con un pool di processi estrazione e gruppi vengono distribuiti sui worker.
+    """
+    jobs = []
+    for file_path, result in map_files(prepare_job, files_to_process, executor):
+        if isinstance(result, Exception):
+            logger.error(
+                f"Errore durante l'elaborazione del file {os.path.basename(file_path)}: {result}"
+            )
+        else:
+            jobs.append(result)
+
+    groups = group_jobs_for_batching(jobs, max_chars)
+    logger.info(f"{len(jobs)} file raggruppati in {len(groups)} query a Copilot.")
+    for group, results in map_files(process_job_group, groups, executor):
+        if isinstance(results, Exception):
+            filenames = ", ".join(job["filename"] for job in group)
+            logger.error(f"Errore durante l'elaborazione dei file {filenames}: {results}")
+            continue
+        for result in results:
+            collect_result(batches, result, run_metrics)
+
+
+def map_files(function, items, executor=None):
+    """
+    Applica function a ogni elemento, sul pool di processi se presente, restituendo
+    coppie (elemento, risultato) in cui il risultato è l'eccezione sollevata in caso di errore.
+    """
+    if executor is None:
+        for item in items:
+            try:
+                yield item, function(item)
+            except Exception as e:
+                yield item, e
+        return
+
+    futures = {
+        executor.submit(function, item): index
+        for index, item in enumerate(items)
+    }
+    for future in as_completed(futures):
+        item = items[futures[future]]
+        try:
+            yield item, future.result()
+        except Exception as e:
+            yield item, e
+
+
+def run_files(files_to_process, batches, args, executor=None, run_metrics=None):
+    """
+    Elabora i file con la modalità richiesta: query multi-documento, pool di processi o sequenziale.
+    """
+    if args.copilot_batch_chars > 0:
+        run_batched(
+            files_to_process, batches, args.copilot_batch_chars, executor, run_metrics
+        )
+    elif executor is not None:
+        run_parallel(files_to_process, executor, batches, run_metrics)
+    else:
+        run_sequential(files_to_process, batches, run_metrics)
+
+
+def configure_extraction(args):
+    """
+    Applica al processo corrente le impostazioni di estrazione della riga di comando:
+    backend da usare, riutilizzo delle sessioni Copilot, attesa della risposta, parser diretti,
+    estrazione ibrida, estrazione a blocchi, selezione delle pagine, compattazione del testo e cache delle risposte.
+    """
+    configure_extraction_backend(
+        {
+            "type": args.backend,
+            "url": args.backend_url,
+            "concurrency": args.backend_concurrency,
+            "rate_limit": args.backend_rate_limit,
+            "timeout": args.backend_timeout,
+        }
+    )
+    configure_copilot_pool(max_uses=args.copilot_max_uses)
+    if args.chunked_extraction:
+        # Con Selenium i blocchi in parallelo richiedono altrettante sessioni del browser
+        configure_copilot_pool(max_sessions=args.chunk_workers)
+    configure_chunked_extraction(
+        args.chunked_extraction, args.chunk_chars, args.chunk_workers
+    )
+    configure_native_parsers(not args.no_native_parsers)
+    configure_hybrid_extraction(not args.no_hybrid_extraction, args.snippet_chars)
+    configure_page_selection(not args.no_page_selection)
+    configure_text_compaction(not args.no_text_compaction)
+    configure_copilot_response_wait(args.copilot_timeout, args.copilot_stable_seconds)
+    configure_response_cache(
+        enabled=not args.no_llm_cache, ttl_seconds=args.llm_cache_ttl_days * 24 * 60 * 60
+    )
+
+
+def create_process_pool(args):
+    """
+    Crea il pool di processi: ogni worker crea il proprio backend di estrazione
+    (per Selenium, un proprio pool con una sessione Copilot).
+    """
+    return ProcessPoolExecutor(
+        max_workers=args.workers, initializer=configure_extraction, initargs=(args,)
+    )
+
+
+def run_ingestion(args):
     input_data_folder_path = "backend/resources/input_data"
-    checkpoints_folder_path = "backend/resources/checkpoints"
 
-    new_files_processed = False  # Flag per verificare se ci sono nuovi file processati
-    processed_files = []
+    # Carica i file già elaborati, migrando i vecchi checkpoint basati sul nome del file
+    checkpoint_store = load_checkpoint_store(
+        checkpoint_store_file_path,
+        [config["checkpoint_file"] for config in domain_configs.values()],
+    )
 
+    scan_index = load_scan_index(scan_index_file_path)
+    run_metrics = create_run_metrics()
+
+    with measure_stage(run_metrics["durations"], "scan"):
+        files_to_process = find_files_to_process(
+            input_data_folder_path, checkpoint_store, scan_index, args.full_scan
+        )
+        save_scan_index(scan_index)
+
+    # Frame trasformati raccolti per dominio, scritti con una sola scrittura a fine esecuzione
+    batches = {}
+    configure_extraction(args)
     try:
-        processed_files = load_processed_files(
-            checkpoints_folder_path
-        )  # Carica i file già elaborati
-    except Exception as e:
-        logger.error(f"Errore durante il caricamento dei file processati: {e}")
-
-    # Usa os.walk per scansionare ricorsivamente tutte le subfolder
-    for root, _, files in os.walk(input_data_folder_path):
-        for filename in files:
-            if (
-                filename.endswith(".csv") or filename.endswith(".pdf")
-            ) and filename not in processed_files:
-                file_path = os.path.join(root, filename)
-                logger.info(f"Inizio elaborazione del file: {filename}")
-
-                try:
-                    # Estrai la data dal nome del file
-                    extracted_date = extract_date_from_filename(filename)
-
-                    if filename.endswith(".csv"):
-                        # Trasformazione dei dati in DataFrame
-                        df = pd.read_csv(
-                            file_path, delimiter=";", header=0
-                        )  # Crea il DataFrame solo con i dati del file corrente
-                        if "bank_transactions" in root.lower():
-                            checkpoint_file = "backend/resources/checkpoints/bank_transactions_processed_files.txt"
-                            output_path = "backend/resources/output_data/bank_transactions/ing/bank_transactions_history.csv"
-                            transformed_df = IngTransform.transform_df(
-                                df, bank_df_columns_to_select, extracted_date
-                            )
-                            upsert_to_csv(transformed_df, output_path, bank_key_field)
-                            # Aggiorna il checkpoint
-                            update_checkpoint(checkpoint_file, [filename])
-                            logger.info(
-                                f"File {filename} elaborato e salvato con successo."
-                            )
-                        elif "berebel" in root.lower():
-                            checkpoint_file = (
-                                "backend/resources/checkpoints/berebel_processed_files.txt"
-                            )
-                            output_path = (
-                                "backend/resources/output_data/berebel/berebel_history.csv"
-                            )
-                            transformed_df = BerebelTransform.transform_df(
-                                df, berebel_df_columns_to_select
-                            )
-                            upsert_to_csv(
-                                transformed_df, output_path, berebel_key_field
-                            )
-                            # Aggiorna il checkpoint
-                            update_checkpoint(checkpoint_file, [filename])
-                            logger.info(
-                                f"File {filename} elaborato e salvato con successo."
-                            )
-                        elif "light_bills" in root.lower():
-                            checkpoint_file = (
-                                "backend/resources/checkpoints/light_bills_processed_files.txt"
-                            )
-                            output_path = "backend/resources/output_data/light_bills/light_bills_history.csv"
-                            transformed_df = EnelTransform.transform_df(
-                                df, light_df_columns_to_select
-                            )
-                            upsert_to_csv(transformed_df, output_path, light_key_field)
-                            # Aggiorna il checkpoint
-                            update_checkpoint(checkpoint_file, [filename])
-                            logger.info(
-                                f"File {filename} elaborato e salvato con successo."
-                            )
-                        elif "salary" in root.lower():
-                            checkpoint_file = (
-                                "backend/resources/checkpoints/salary_processed_files.txt"
-                            )
-                            output_path = (
-                                "backend/resources/output_data/salary/salary_history.csv"
-                            )
-                            transformed_df = RelatechTransform.transform_df(
-                                df, relatech_df_columns_to_select
-                            )
-                            upsert_to_csv(
-                                transformed_df, output_path, relatech_key_field
-                            )
-                            # Aggiorna il checkpoint
-                            update_checkpoint(checkpoint_file, [filename])
-                            logger.info(
-                                f"File {filename} elaborato e salvato con successo."
-                            )
-                        else:
-                            logger.error(f"Folder non gestita: {root.lower()}")
-                    elif filename.endswith(".pdf"):
-                        # Estrazione dei dati dal PDF
-                        text = extract_pdf_data(file_path)
-                        formatted_text = re.sub(r"\s+", " ", text).strip()
-
-                        if "bank_transactions" in root.lower():
-                            checkpoint_file = "backend/resources/checkpoints/bank_transactions_processed_files.txt"
-                            # Interazione con Copilot
-                            response_copilot = run_copilot(
-                                formatted_text, bank_copilot_info_to_extract
-                            )
-                            data = json.loads(response_copilot)
-                            # Trasformazione dei dati in DataFrame
-                            df = pd.DataFrame(
-                                [data]
-                            )  # Crea il DataFrame solo con i dati del file corrente
-                            output_path = "backend/resources/output_data/bank_transactions/ing/bank_transactions_history.csv"
-                            transformed_df = IngTransform.transform_df(
-                                df, bank_df_columns_to_select, extracted_date
-                            )
-                            upsert_to_csv(transformed_df, output_path, bank_key_field)
-                            # Aggiorna il checkpoint
-                            update_checkpoint(checkpoint_file, [filename])
-                            logger.info(
-                                f"File {filename} elaborato e salvato con successo."
-                            )
-                        elif "berebel" in root.lower():
-                            checkpoint_file = (
-                                "backend/resources/checkpoints/berebel_processed_files.txt"
-                            )
-                            # Interazione con Copilot
-                            response_copilot = run_copilot(
-                                formatted_text, berebel_copilot_info_to_extract
-                            )
-                            data = json.loads(response_copilot)
-                            # Trasformazione dei dati in DataFrame
-                            df = pd.DataFrame(
-                                [data]
-                            )  # Crea il DataFrame solo con i dati del file corrente
-                            output_path = (
-                                "backend/resources/output_data/berebel/berebel_history.csv"
-                            )
-                            transformed_df = BerebelTransform.transform_df(
-                                df, berebel_df_columns_to_select
-                            )
-                            upsert_to_csv(
-                                transformed_df, output_path, berebel_key_field
-                            )
-                            # Aggiorna il checkpoint
-                            update_checkpoint(checkpoint_file, [filename])
-                            logger.info(
-                                f"File {filename} elaborato e salvato con successo."
-                            )
-                        elif "light_bills" in root.lower():
-                            checkpoint_file = (
-                                "backend/resources/checkpoints/light_bills_processed_files.txt"
-                            )
-                            # Interazione con Copilot
-                            response_copilot = run_copilot(
-                                formatted_text, light_copilot_info_to_extract
-                            )
-                            data = json.loads(response_copilot)
-                            # Trasformazione dei dati in DataFrame
-                            df = pd.DataFrame(
-                                [data]
-                            )  # Crea il DataFrame solo con i dati del file corrente
-                            output_path = "backend/resources/output_data/light_bills/light_bills_history.csv"
-                            transformed_df = EnelTransform.transform_df(
-                                df, light_df_columns_to_select
-                            )
-                            upsert_to_csv(transformed_df, output_path, light_key_field)
-                            # Aggiorna il checkpoint
-                            update_checkpoint(checkpoint_file, [filename])
-                            logger.info(
-                                f"File {filename} elaborato e salvato con successo."
-                            )
-                        elif "salary" in root.lower():
-                            checkpoint_file = (
-                                "backend/resources/checkpoints/salary_processed_files.txt"
-                            )
-                            # Interazione con Copilot
-                            response_copilot = run_copilot(
-                                formatted_text, relatech_copilot_info_to_extract
-                            )
-                            data = json.loads(response_copilot)
-                            # Trasformazione dei dati in DataFrame
-                            df = pd.DataFrame(
-                                [data]
-                            )  # Crea il DataFrame solo con i dati del file corrente
-                            output_path = (
-                                "backend/resources/output_data/salary/salary_history.csv"
-                            )
-                            transformed_df = RelatechTransform.transform_df(
-                                df, relatech_df_columns_to_select
-                            )
-                            upsert_to_csv(
-                                transformed_df, output_path, relatech_key_field
-                            )
-                            # Aggiorna il checkpoint
-                            update_checkpoint(checkpoint_file, [filename])
-                            logger.info(
-                                f"File {filename} elaborato e salvato con successo."
-                            )
-                        else:
-                            logger.error(f"Folder non gestita: {root.lower()}")
-
-                    new_files_processed = True  # Imposta il flag a True
-
-                except Exception as e:
-                    # Gestione degli errori per ogni fase dell'elaborazione del file
-                    logger.error(
-                        f"Errore durante l'elaborazione del file {filename}: {e}"
-                    )
+        if args.pipeline:
+            stages = build_pipeline_stages(
+                batches,
+                args.extract_workers,
+                args.llm_workers,
+                args.transform_workers,
+                run_metrics,
+            )
+            run_staged_pipeline(
+                files_to_process, stages, args.queue_size, describe_item=describe_job
+            )
+        elif args.workers > 1 and len(files_to_process) > 1:
+            with create_process_pool(args) as executor:
+                run_files(files_to_process, batches, args, executor, run_metrics)
+        else:
+            run_files(files_to_process, batches, args, run_metrics=run_metrics)
+    finally:
+        close_extraction_backend()
+
+    commit_batches(batches, checkpoint_store, args.history_store, run_metrics)
+    # Salva anche le impronte dei file migrati o rinominati riconosciuti durante la scansione
+    save_checkpoint_store(checkpoint_store)
+    write_run_metrics(run_metrics, metrics_folder_path)
 
     logger.info("Elaborazione completata.")
+
+
+def run_watch(args):
+    """
+    Modalità watch: elabora i file in sospeso e poi resta in ascolto su input_data,
+    elaborando solo i file nuovi o modificati. Store dei checkpoint, indice di scansione,
+    indici delle chiavi, pool di processi e sessione del browser restano attivi tra un evento e l'altro.
+    """
+    input_data_folder_path = "backend/resources/input_data"
+
+    checkpoint_store = load_checkpoint_store(
+        checkpoint_store_file_path,
+        [config["checkpoint_file"] for config in domain_configs.values()],
+    )
+    scan_index = load_scan_index(scan_index_file_path)
+    # File falliti con la loro impronta: non vengono ritentati finché non cambiano
+    failed_files = {}
+    configure_extraction(args)
+    executor = create_process_pool(args) if args.workers > 1 else None
+
+    def ingest(file_paths):
+        if not file_paths:
+            return
+        batches = {}
+        run_metrics = create_run_metrics()
+        run_files(file_paths, batches, args, executor, run_metrics)
+        committed_files = set(
+            commit_batches(batches, checkpoint_store, args.history_store, run_metrics)
+        )
+        save_checkpoint_store(checkpoint_store)
+        write_run_metrics(run_metrics, metrics_folder_path)
+
+        for file_path in file_paths:
+            normalized_path = os.path.normpath(file_path)
+            if file_path in committed_files:
+                failed_files.pop(normalized_path, None)
+            elif os.path.isfile(file_path):
+                failed_files[normalized_path] = get_file_fingerprint(file_path)
+        logger.info(
+            f"Elaborati {len(committed_files)} file su {len(file_paths)}. In attesa di nuovi file."
+        )
+
+    def discover_files():
+        files_to_process = find_files_to_process(
+            input_data_folder_path, checkpoint_store, scan_index
+        )
+        save_scan_index(scan_index)
+        save_checkpoint_store(checkpoint_store)
+        return [
+            file_path
+            for file_path in files_to_process
+            if failed_files.get(os.path.normpath(file_path))
+            != get_file_fingerprint(file_path)
+        ]
+
+    def on_files(file_paths):
+        files_to_process = []
+        for file_path in file_paths:
+            try:
+                if os.path.isfile(file_path) and not is_file_processed(
+                    checkpoint_store, file_path
+                ):
+                    files_to_process.append(file_path)
+            except OSError as e:
+                logger.error(
+                    f"Errore durante la verifica del file {os.path.basename(file_path)}: {e}"
+                )
+        ingest(files_to_process)
+
+    try:
+        # Recupera i file arrivati mentre il processo non era in esecuzione
+        ingest(discover_files())
+        watch_input_folder(
+            input_data_folder_path,
+            (".csv", ".pdf"),
+            discover_files,
+            on_files,
+            debounce_seconds=args.debounce,
+            poll_interval=args.poll_interval,
+            use_polling=args.polling,
+        )
+    except KeyboardInterrupt:
+        logger.info("Modalità watch interrotta.")
+    finally:
+        if executor is not None:
+            executor.shutdown()
+        close_extraction_backend()
+
+
+if __name__ == "__main__":
+    args = parse_arguments()
+
+    if args.compact:
+        compact_histories()
+        logger.info("Compattazione completata.")
+    elif args.replay:
+        domains = list(domain_configs) if args.replay == "all" else [args.replay]
+        for domain in domains:
+            replay_domain(domain, args.history_store)
+        logger.info("Rielaborazione completata.")
+    elif args.watch:
+        run_watch(args)
+    else:
+        run_ingestion(args)
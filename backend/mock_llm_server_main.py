@@ -0,0 +1,171 @@
+import argparse
+import itertools
+import json
+import logging
+import random
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from resources.constants.common.Constants import extraction_store_folder_path
+from resources.functions.CopilotFunctions import get_field_names
+from resources.functions.ExtractionStoreFunctions import load_domain_extractions
+from resources.functions.PipelineFunctions import domain_configs
+
+# Configurazione del logger
+logging.basicConfig(
+    level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s"
+)
+logger = logging.getLogger()
+
+
+def parse_arguments():
+    parser = argparse.ArgumentParser(
+        description="Server HTTP locale che simula il backend LLM con risposte preconfezionate, "
+        "per misurare la pipeline senza Copilot (usare con main.py --backend http)."
+    )
+    parser.add_argument(
+        "--host", default="127.0.0.1", help="Indirizzo di ascolto (default: 127.0.0.1)."
+    )
+    parser.add_argument(
+        "--port", type=int, default=8765, help="Porta di ascolto (default: 8765)."
+    )
+    parser.add_argument(
+        "--latency",
+        type=float,
+        default=1.0,
+        help="Secondi di attesa simulati per ogni risposta (default: 1).",
+    )
+    parser.add_argument(
+        "--jitter",
+        type=float,
+        default=0.0,
+        help="Variazione casuale massima della latenza, in secondi (default: 0).",
+    )
+    return parser.parse_args()
+
+
+def load_canned_responses():
+    """
+    Prepara le risposte per dominio: le estrazioni salvate del dominio (vedi ExtractionStoreFunctions),
+    restituite a rotazione, oppure un oggetto vuoto se non ce ne sono.
+
+    Returns:
+        dict: Per dominio, i campi che il dominio può richiedere nel prompt (documento intero,
+              blocchi dell'estrazione a blocchi) e un iteratore infinito di risposte.
+    """
+    canned_responses = {}
+    for domain, config in domain_configs.items():
+        responses = []
+        for record in load_domain_extractions(extraction_store_folder_path, domain):
+            try:
+                responses.append(json.loads(record["response"]))
+            except ValueError:
+                continue
+        canned_responses[domain] = {
+            "info_to_extract": config["copilot_info_to_extract"]
+            + config.get("chunk_info_to_extract", []),
+            "responses": itertools.cycle(responses or [{}]),
+        }
+        logger.info(f"Dominio {domain}: {len(responses)} risposte preconfezionate.")
+    return canned_responses
+
+
+def find_requested_info(prompt, canned_responses):
+    """
+    Riconosce dominio e campi richiesti da un prompt: i campi sono cercati solo nelle istruzioni,
+    prima del testo dei documenti, e vince il dominio con più campi presenti. Così vengono
+    riconosciuti anche i prompt con una parte dei campi (estrazione ibrida) e quelli dei blocchi.
+
+    Returns:
+        tuple: Dominio e descrizioni dei campi richiesti, (None, []) se nessun campo è riconosciuto.
+    """
+    instructions = re.split(
+        r" dal seguente testo non formattato: | Documenti non formattati: ", prompt, maxsplit=1
+    )[0]
+    best_domain, best_info = None, []
+    for domain, canned in canned_responses.items():
+        requested_info = [info for info in canned["info_to_extract"] if info in instructions]
+        if len(requested_info) > len(best_info):
+            best_domain, best_info = domain, requested_info
+    return best_domain, best_info
+
+
+def build_canned_entry(canned, requested_info):
+    """
+    Restituisce la prossima risposta preconfezionata con i soli campi richiesti: i campi assenti
+    valgono null, oppure una lista vuota se il campo è una lista (es. i movimenti di un blocco).
+    """
+    response = next(canned["responses"])
+    return {
+        name: response.get(name, [] if "(lista" in info else None)
+        for name, info in zip(get_field_names(requested_info), requested_info)
+    }
+
+
+def build_mock_response(prompt, canned_responses, lock):
+    """
+    Costruisce la risposta a un prompt con i campi effettivamente richiesti e, per le query
+    multi-documento, restituisce una voce per ogni document_id.
+    """
+    domain, requested_info = find_requested_info(prompt, canned_responses)
+    if domain is None:
+        return "{}"
+    canned = canned_responses[domain]
+    document_ids = re.findall(r"\[documento (\w+)\]", prompt)
+    with lock:
+        if not document_ids:
+            return json.dumps(build_canned_entry(canned, requested_info), ensure_ascii=False)
+        entries = [
+            {"document_id": document_id, **build_canned_entry(canned, requested_info)}
+            for document_id in document_ids
+        ]
+    return json.dumps(entries, ensure_ascii=False)
+
+
+def create_handler(canned_responses, latency, jitter):
+    lock = threading.Lock()
+
+    class MockLlmHandler(BaseHTTPRequestHandler):
+        def do_POST(self):
+            try:
+                length = int(self.headers.get("Content-Length", 0))
+                prompt = json.loads(self.rfile.read(length))["prompt"]
+            except (ValueError, KeyError):
+                self.send_error(400, "Richiesta non valida: atteso {\"prompt\": ...}")
+                return
+
+            time.sleep(max(0.0, latency + random.uniform(-jitter, jitter)))
+            body = json.dumps(
+                {"response": build_mock_response(prompt, canned_responses, lock)}
+            ).encode("utf-8")
+
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            logger.info(f"{self.address_string()} - {format % args}")
+
+    return MockLlmHandler
+
+
+if __name__ == "__main__":
+    args = parse_arguments()
+    server = ThreadingHTTPServer(
+        (args.host, args.port),
+        create_handler(load_canned_responses(), args.latency, args.jitter),
+    )
+    logger.info(
+        f"Server LLM simulato in ascolto su http://{args.host}:{args.port}/extract "
+        f"(latenza {args.latency}s ± {args.jitter}s)."
+    )
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        logger.info("Server LLM simulato arrestato.")
+    finally:
+        server.server_close()
@@ -0,0 +1,153 @@
+import argparse
+import glob
+import hashlib
+import logging
+import os
+import time
+
+import numpy as np
+import pandas as pd
+
+from resources.constants.bank_transactions.BankConstants import (
+    bank_df_columns_to_select,
+    bank_history_file_path,
+    bank_record_key_columns,
+)
+from resources.constants.salary.RelatechConstants import (
+    relatech_history_file_path,
+    relatech_record_key_columns,
+)
+from resources.functions.Functions import extract_date_from_filename
+from resources.functions.RecordKeyFunctions import build_record_keys
+from transformations.bank_transactions import IngTransform
+
+# Configurazione del logger
+logging.basicConfig(
+    level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s"
+)
+logger = logging.getLogger()
+
+ing_input_folder = "backend/resources/input_data/bank_transactions/ing"
+
+
+def parse_arguments():
+    parser = argparse.ArgumentParser(
+        description="Verifica che le record_key generate in blocco coincidano con quelle già "
+        "salvate negli storici e ne misura la velocità su un DataFrame sintetico."
+    )
+    parser.add_argument(
+        "--rows",
+        type=int,
+        default=1000000,
+        help="Righe del DataFrame sintetico del benchmark (default: 1000000).",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=4,
+        help="Thread per l'hash nella misura con il pool (default: 4).",
+    )
+    return parser.parse_args()
+
+
+def build_legacy_record_keys(df, key_columns):
+    """
+    Calcolo riga per riga delle trasformazioni precedenti: concatenazione di astype(str)
+    successivi e hashlib.sha256 applicato a ogni riga.
+    """
+    concatenated_key = df[key_columns[0]].astype(str)
+    for column in key_columns[1:]:
+        concatenated_key = concatenated_key + "|" + df[column].astype(str)
+    return concatenated_key.apply(lambda x: hashlib.sha256(x.encode()).hexdigest())
+
+
+def check_history_compatibility():
+    """
+    Ricalcola le record_key dei movimenti ING e delle buste paga e le confronta con quelle
+    degli storici.
+
+    Returns:
+        bool: True se tutte le chiavi ricalcolate sono presenti negli storici.
+    """
+    compatible = True
+
+    bank_history_keys = set(pd.read_csv(bank_history_file_path)["record_key"])
+    for csv_path in sorted(glob.glob(os.path.join(ing_input_folder, "*.csv"))):
+        filename = os.path.basename(csv_path)
+        df = pd.read_csv(csv_path, delimiter=";", header=0)
+        transformed_df = IngTransform.transform_df(
+            df, bank_df_columns_to_select, extract_date_from_filename(filename)
+        )
+        missing_keys = set(transformed_df["record_key"]) - bank_history_keys
+        compatible &= not missing_keys
+        logger.info(
+            f"{filename}: {len(transformed_df) - len(missing_keys)}/{len(transformed_df)} "
+            "record_key presenti nello storico dei movimenti."
+        )
+
+    salary_history = pd.read_csv(relatech_history_file_path)
+    salary_keys = build_record_keys(
+        salary_history.assign(netto_del_mese=salary_history["netto_del_mese"].astype(int)),
+        relatech_record_key_columns,
+    )
+    matching = int((salary_keys == salary_history["record_key"]).sum())
+    compatible &= matching == len(salary_history)
+    logger.info(
+        f"Storico delle buste paga: {matching}/{len(salary_history)} record_key ricalcolate identiche."
+    )
+    return compatible
+
+
+def build_synthetic_movements(rows):
+    """
+    Crea un DataFrame di movimenti con le colonne della chiave bancaria: importi mancanti
+    in metà delle righe, come nell'export ING, e descrizioni con caratteri non ASCII.
+    """
+    rng = np.random.default_rng(0)
+    amounts = np.round(rng.uniform(0, 5000, rows), 2)
+    outgoing = rng.random(rows) < 0.5
+    return pd.DataFrame(
+        {
+            "data_operazione": pd.Series(
+                pd.Timestamp("2024-01-01") + pd.to_timedelta(rng.integers(0, 365, rows), "D")
+            ).dt.strftime("%Y-%m-%d"),
+            "uscite": np.where(outgoing, -amounts, np.nan),
+            "entrate": np.where(outgoing, np.nan, amounts),
+            "descrizione": [f"Pagamento POS n. {i} - caffè" for i in range(rows)],
+            "causale": np.where(outgoing, "Pagamento carta", "Accredito bonifico"),
+        }
+    )
+
+
+def run_benchmark(rows, workers):
+    df = build_synthetic_movements(rows)
+    logger.info(f"DataFrame sintetico: {rows} righe.")
+
+    started = time.perf_counter()
+    legacy_keys = build_legacy_record_keys(df, bank_record_key_columns)
+    legacy_seconds = time.perf_counter() - started
+
+    measures = {}
+    for label, key_workers in (("sequenziale", 1), (f"{workers} thread", workers)):
+        started = time.perf_counter()
+        keys = build_record_keys(df, bank_record_key_columns, workers=key_workers)
+        measures[label] = time.perf_counter() - started
+        if not keys.equals(legacy_keys):
+            logger.error(f"Le record_key ({label}) differiscono dal calcolo riga per riga.")
+            return False
+
+    logger.info(f"Calcolo riga per riga: {legacy_seconds:.2f}s.")
+    for label, seconds in measures.items():
+        logger.info(
+            f"build_record_keys ({label}): {seconds:.2f}s, "
+            f"{legacy_seconds / seconds:.1f}x, chiavi identiche."
+        )
+    return True
+
+
+if __name__ == "__main__":
+    args = parse_arguments()
+    compatible = check_history_compatibility()
+    compatible &= run_benchmark(args.rows, args.workers)
+    if not compatible:
+        raise SystemExit(1)
@@ -10,6 +10,38 @@ bank_copilot_info_to_extract = [
     "causale (prova a categorizzare il movimento dell'estratto conto)",
 ]
 
+# Campi richiesti per ogni porzione di un estratto conto lungo (estrazione a blocchi):
+# solo i movimenti, nello stesso formato delle colonne dell'export CSV di ING
+bank_copilot_movements_to_extract = [
+    "movimenti (lista di tutti i movimenti presenti nel testo, ognuno con i campi: "
+    "data_contabile (formato dd/mm/yyyy), data_valuta (formato dd/mm/yyyy), "
+    "uscite (double positivo, null se il movimento è un'entrata), "
+    "entrate (double positivo, null se il movimento è un'uscita), "
+    "causale (come riportata nell'estratto conto), "
+    "descrizione_operazione (testo completo della descrizione del movimento))",
+]
+
+# Parole chiave delle pagine che contengono i campi da estrarre (selezione delle pagine rilevanti)
+bank_relevant_page_keywords = [
+    "estratto conto",
+    "conto corrente",
+    "iban",
+    "saldo",
+    "data contabile",
+    "data valuta",
+    "uscite",
+    "entrate",
+    "causale",
+    "descrizione operazione",
+]
+
+# Righe ricorrenti degli estratti conto (note legali, recapiti) rimosse dal testo
+bank_boilerplate_patterns = [
+    r"Fondo Interbancario di Tutela dei Depositi",
+    r"Registro delle Imprese",
+    r"^Per (informazioni|reclami)",
+]
+
 bank_df_mandatory_fields = [
     "banca",
     "numero_conto_corrente",
@@ -22,6 +54,15 @@ bank_df_mandatory_fields = [
     "causale",
 ]
 
+# Colonne da cui è calcolata la record_key di un movimento, nell'ordine di concatenazione
+bank_record_key_columns = [
+    "data_operazione",
+    "uscite",
+    "entrate",
+    "descrizione",
+    "causale",
+]
+
 bank_df_columns_to_select = [
     "record_key",
     "banca",
@@ -83,3 +124,11 @@ bank_airtable_ing_table_name = "tblRwAoWEmI3RrxPh"
 bank_airtable_deutsche_table_name = "tblB7XCUmNxnF38AT"
 
 bank_key_field = "record_key"
+
+bank_checkpoint_file_path = (
+    "backend/resources/checkpoints/bank_transactions_processed_files.txt"
+)
+
+bank_history_file_path = (
+    "backend/resources/output_data/bank_transactions/ing/bank_transactions_history.csv"
+)
@@ -11,6 +11,62 @@ berebel_copilot_info_to_extract = [
     "totale_pagato (è un double ed è mandatory)",
 ]
 
+# Parole chiave delle pagine che contengono i campi da estrarre (selezione delle pagine rilevanti)
+berebel_relevant_page_keywords = [
+    "estratto conto",
+    "minimo mensile",
+    "costo al km",
+    "percorsi",
+    "inclusi",
+    "residui",
+    "premio di conguaglio",
+    "targa",
+    "totale",
+    "saldo",
+]
+
+# Righe ricorrenti degli estratti conto BeRebel (iniziative promozionali, note legali) rimosse dal testo
+berebel_boilerplate_patterns = [
+    r"^Puoi compensare le tue emissioni",
+    r"^preferenze per diventare protagonista",
+    r"^stesso importo, insieme saremo",
+    r"^Documento emesso in relazione al pagamento",
+    r"^BeRebel S\.p\.A\. - www\.berebel\.it",
+    r"^Agenzia di assicurazione",
+]
+
+# Template dell'estratto conto BeRebel per la lettura diretta del PDF, senza LLM
+# (stesso formato dei template di light_bill_templates)
+berebel_statement_template = {
+    "detect": r"^ESTRATTO CONTO \w+ \d{4}$",
+    "fields": {
+        "minimo_mensile": {"pattern": r"(-?[\d.,]+) €/mese", "type": "float"},
+        "periodo_estratto_conto": {"pattern": r"^ESTRATTO CONTO (\w+ \d{4})$", "type": "month"},
+        "costo_al_km": {"pattern": r"(-?[\d.,]+) €/km", "type": "float"},
+        "targa": {"pattern": r"^([A-Z]{2}\d{3}[A-Z]{2})$", "type": "str"},
+        "km_percorsi": {"pattern": r"€/km (\d+) \d+ \d+ \d+ ", "type": "int"},
+        "km_inclusi": {"pattern": r"€/km \d+ (\d+) \d+ \d+ ", "type": "int"},
+        "km_da_pagare": {"pattern": r"€/km \d+ \d+ (\d+) \d+ ", "type": "int"},
+        "km_residui": {"pattern": r"€/km \d+ \d+ \d+ (\d+) ", "type": "int"},
+        "premio_di_conguaglio": {"pattern": r"€/km \d+ \d+ \d+ \d+ (-?[\d.,]+) €", "type": "float"},
+        "totale_pagato": {"pattern": r"^Totale (-?[\d.,]+) €$", "type": "float"},
+    },
+}
+
+# Etichette vicino alle quali si trova ogni campo nel testo degli estratti conto (estrazione ibrida)
+berebel_field_labels = {
+    "minimo_mensile": ["Minimo mensile"],
+    "periodo_estratto_conto": ["ESTRATTO CONTO"],
+    "costo_al_km": ["Costo al km"],
+    "targa": ["TARGA"],
+    "km_percorsi": ["RIEPILOGO KM"],
+    "km_inclusi": ["RIEPILOGO KM"],
+    "km_da_pagare": ["RIEPILOGO KM"],
+    "km_residui": ["RIEPILOGO KM"],
+    "premio_di_conguaglio": ["Premio di conguaglio"],
+    "totale_pagato": ["Totale"],
+}
+
 berebel_df_mandatory_fields = [
     "minimo_mensile",
     "periodo_estratto_conto",
@@ -85,3 +141,7 @@ INSERT INTO berebel_history (
 berebel_airtable_table_name = "tblYr6mF4ZO1oVat1"
 
 berebel_key_field = "periodo_estratto_conto"
+
+berebel_checkpoint_file_path = "backend/resources/checkpoints/berebel_processed_files.txt"
+
+berebel_history_file_path = "backend/resources/output_data/berebel/berebel_history.csv"
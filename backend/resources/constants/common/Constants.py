@@ -13,3 +13,32 @@ aiven_postgresql_db_username = "avnadmin"
 aiven_postgresql_db_password = "AVNS__fw4ruPbauocp_OC1--"
 aiven_postgresql_db_default_name = "defaultdb"
 aiven_postgresql_db_name = "pdfextract"
+
+checkpoint_store_file_path = "backend/resources/checkpoints/checkpoint_store.json"
+
+scan_index_file_path = "backend/resources/checkpoints/scan_index.json"
+
+pdf_text_cache_folder_path = "backend/resources/cache/pdf_text"
+pdf_text_cache_max_bytes = 50 * 1024 * 1024
+
+extraction_store_folder_path = "backend/resources/extractions"
+
+metrics_folder_path = "backend/resources/metrics"
+
+llm_backend_url = "http://127.0.0.1:8765/extract"
+
+llm_response_cache_folder_path = "backend/resources/cache/llm_responses"
+llm_response_cache_max_bytes = 20 * 1024 * 1024
+llm_response_cache_ttl_seconds = 90 * 24 * 60 * 60
+
+# Limite di caratteri del testo di un PDF inviato all'LLM
+prompt_text_max_chars = 8000
+
+# Righe ricorrenti in tutti i domini, rimosse dal testo prima di inviarlo all'LLM
+common_boilerplate_patterns = [
+    r"^(Pag\.|Pagina) \d+( di \d+)?$",
+    r"Capitale Sociale",
+]
+
+# Confidenza minima di un campo letto dai parser diretti dei PDF perché il documento non passi dall'LLM
+native_parser_min_confidence = 0.5
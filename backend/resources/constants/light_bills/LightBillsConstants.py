@@ -17,6 +17,112 @@ light_copilot_info_to_extract = [
     "imposte_iva (è un double, dettaglio specifico)",
 ]
 
+# Parole chiave delle pagine che contengono i campi da estrarre (selezione delle pagine rilevanti)
+light_relevant_page_keywords = [
+    "totale bolletta",
+    "totale da pagare",
+    "quanto devo pagare",
+    "fattura elettronica",
+    "rif. bolletta",
+    "periodo",
+    "prezzo unitario",
+    "kwh",
+    "f1",
+    "f2",
+    "f3",
+    "canone",
+    "spesa per l'energia",
+    "spesa per la materia energia",
+    "spesa per il trasporto",
+    "oneri di sistema",
+    "altre partite",
+    "imposte",
+    "iva",
+    "letture",
+    "consumi",
+    "riepilogo",
+]
+
+# Righe ricorrenti delle bollette (dati societari, istruzioni di pagamento) rimosse dal testo
+light_boilerplate_patterns = [
+    r"Società con unico socio",
+    r"^Enel P\.I\. ",
+    r"Registro Imprese",
+    r"Società soggetta all",
+    r"^Per sapere come pagare senza spese",
+    r"^Fiscale e Partita IVA \d+ - R\.E\.A\.",
+]
+
+# Template per fornitore per la lettura diretta delle bollette, senza LLM: 'detect' riconosce il fornitore
+# nel testo del PDF, per ogni campo 'pattern' è l'espressione regolare (multilinea) dell'etichetta con il valore
+# nel gruppo 'group' (default 1) e 'type' il tipo del valore; 'default' è il valore dei campi la cui etichetta
+# compare solo quando la voce è in bolletta, 'value' un valore fisso
+light_bill_templates = {
+    "Enel Energia": {
+        "detect": r"Enel Energia - Mercato libero dell'energia",
+        "fields": {
+            "fornitore": {"value": "Enel Energia"},
+            "numero_fattura": {"pattern": r"fattura elettronica n\. (\d+) del", "type": "str"},
+            "data_fattura": {"pattern": r"fattura elettronica n\. \d+ del (\d{2}/\d{2}/\d{4})", "type": "date"},
+            "periodo_fornitura": {"pattern": r"^Periodo (.+?) - spesa per", "type": "str"},
+            "prezzo_unitario_kWh": {"pattern": r"^Energia \w+ .*?€/kWh (-?[\d.,]+)", "type": "float"},
+            "totale_da_pagare": {"pattern": r"Totale da pagare (-?[\d.,]+) €", "type": "float"},
+            "kWh_consumati_totali": {"pattern": r"Totale energia\n(?:[\d.]+ kWh ){7}([\d.]+) kWh", "type": "int"},
+            "kWh_F1_consumati": {"pattern": r"Totale energia\n(?:[\d.]+ kWh ){4}([\d.]+) kWh", "type": "int"},
+            "kWh_F2_consumati": {"pattern": r"Totale energia\n(?:[\d.]+ kWh ){5}([\d.]+) kWh", "type": "int"},
+            "kWh_F3_consumati": {"pattern": r"Totale energia\n(?:[\d.]+ kWh ){6}([\d.]+) kWh", "type": "int"},
+            "canone_tv": {"pattern": r"televisione per uso privato(?: di)? (-?[\d.,]+) €", "type": "float", "default": 0.0},
+            "spese_per_energia": {"pattern": r"Spesa per l'energia \(\w\) (-?[\d.,]+) €", "type": "float"},
+            "spese_trasporto_gestione_contatore": {"pattern": r"del contatore \(\w\) (-?[\d.,]+) €", "type": "float"},
+            "spese_oneri": {"pattern": r"Spesa oneri di sistema \(\w\) (-?[\d.,]+) €", "type": "float"},
+            "altre_partite": {"pattern": r"^Altre partite \(\w\) (-?[\d.,]+) €", "type": "float", "default": 0.0},
+            "imposte_iva": {"pattern": r"Totale imposte e IVA \(\w\) (-?[\d.,]+) €", "type": "float"},
+        },
+    },
+    "ENI Plenitude": {
+        "detect": r"Eni Plenitude S\.?p\.?A\.? Società Benefit",
+        "fields": {
+            "fornitore": {"value": "ENI Plenitude"},
+            "numero_fattura": {"pattern": r"^rif\. bolletta\* data di emissione numero cliente\n(\d+)", "type": "str"},
+            "data_fattura": {"pattern": r"^rif\. bolletta\* data di emissione numero cliente\n\d+ (\d{2}\.\d{2}\.\d{4})", "type": "date"},
+            "periodo_fornitura": {"pattern": r"^da \d{1,2} (\w+ \d{4})", "type": "str"},
+            "prezzo_unitario_kWh": {"pattern": r"^Corrispettivo Energia kWh €\n.*?€/kWh (-?[\d.,]+)", "type": "float", "default": 0.0},
+            "totale_da_pagare": {"pattern": r"Totale da pagare per questa bolletta (-?[\d.,]+) €", "type": "float"},
+            "kWh_consumati_totali": {"pattern": r"Totale fornitura luce kWh ([\d.]+)", "type": "int"},
+            "kWh_F1_consumati": {"pattern": r"^lettura .*?\d{2}\.\d{2}\.\d{2} \d+ (\d+) \d+ \d+ \d+ \d+(?=(?:.*\n){1,3}consumo rilevato)", "type": "int", "default": 0},
+            "kWh_F2_consumati": {"pattern": r"^lettura .*?\d{2}\.\d{2}\.\d{2} \d+ \d+ \d+ (\d+) \d+ \d+(?=(?:.*\n){1,3}consumo rilevato)", "type": "int", "default": 0},
+            "kWh_F3_consumati": {"pattern": r"^lettura .*?\d{2}\.\d{2}\.\d{2} \d+ \d+ \d+ \d+ \d+ (\d+)(?=(?:.*\n){1,3}consumo rilevato)", "type": "int", "default": 0},
+            "canone_tv": {"pattern": r"^Totale canone di abbonamento alla televisione per uso privato (-?[\d.,]+) €", "type": "float", "default": 0.0},
+            "spese_per_energia": {"pattern": r"^Spesa per la materia energia (-?[\d.,]+) €", "type": "float", "default": 0.0},
+            "spese_trasporto_gestione_contatore": {"pattern": r"^Spesa per il trasporto dell'energia elettrica e la gestione del contatore (-?[\d.,]+) €", "type": "float", "default": 0.0},
+            "spese_oneri": {"pattern": r"^Spesa per gli oneri di sistema (-?[\d.,]+) €", "type": "float", "default": 0.0},
+            "altre_partite": {"pattern": r"^Totale Altre partite (-?[\d.,]+) €", "type": "float"},
+            "imposte_iva": {"pattern": r"^totale imposte e IVA (-?[\d.,]+) €", "type": "float"},
+        },
+    },
+}
+
+# Etichette vicino alle quali si trova ogni campo nel testo delle bollette: nell'estrazione ibrida
+# all'LLM vengono inviate solo le porzioni di testo attorno alle etichette dei campi mancanti
+light_field_labels = {
+    "fornitore": ["Enel Energia", "Eni Plenitude"],
+    "numero_fattura": ["fattura elettronica n.", "rif. bolletta"],
+    "data_fattura": ["fattura elettronica n.", "data di emissione"],
+    "periodo_fornitura": ["Periodo", "Periodo di riferimento"],
+    "prezzo_unitario_kWh": ["€/kWh"],
+    "totale_da_pagare": ["Totale da pagare"],
+    "kWh_consumati_totali": ["Consumo rilevato", "Totale fornitura luce"],
+    "kWh_F1_consumati": ["Consumo rilevato", "Letture"],
+    "kWh_F2_consumati": ["Consumo rilevato", "Letture"],
+    "kWh_F3_consumati": ["Consumo rilevato", "Letture"],
+    "canone_tv": ["Canone di abbonamento"],
+    "spese_per_energia": ["Spesa per l'energia", "Spesa per la materia energia"],
+    "spese_trasporto_gestione_contatore": ["Spesa per il trasporto"],
+    "spese_oneri": ["oneri di sistema"],
+    "altre_partite": ["Altre partite"],
+    "imposte_iva": ["imposte e IVA"],
+}
+
 light_df_mandatory_fields = [
     "fornitore",
     "numero_fattura",
@@ -114,3 +220,11 @@ INSERT INTO bollette_luce_history (
 light_airtable_table_name = "tbl9W0Qz1oU6dkOOU"
 
 light_key_field = "numero_fattura"
+
+light_checkpoint_file_path = (
+    "backend/resources/checkpoints/light_bills_processed_files.txt"
+)
+
+light_history_file_path = (
+    "backend/resources/output_data/light_bills/light_bills_history.csv"
+)
@@ -15,6 +15,68 @@ relatech_copilot_info_to_extract = [
     "totale_permessi_rimanenti (Saldo R.O.L è un double non arrotondare)",
 ]
 
+# Parole chiave delle pagine che contengono i campi da estrarre (selezione delle pagine rilevanti)
+relatech_relevant_page_keywords = [
+    "periodo",
+    "lavorato",
+    "paga base",
+    "competenze",
+    "trattenute",
+    "irpef",
+    "arrotondame",
+    "netto",
+    "t.f.r.",
+    "tfr",
+    "ferie",
+    "r.o.l.",
+]
+
+# Righe ricorrenti delle buste paga rimosse dal testo: frammenti di una-tre lettere
+# del testo verticale a margine e la riga dell'autorizzazione Inail
+relatech_boilerplate_patterns = [
+    r"^[^\d\s]{1,3}$",
+    r"^Zucchetti spa, Autorizzazione Inail",
+]
+
+# Template del cedolino Relatech (layout Zucchetti, pagina A4 in punti) per la lettura diretta del PDF:
+# per ogni campo l'etichetta da cercare (espressione regolare su una parola), l'intervallo orizzontale
+# del valore e il suo scostamento verticale dall'etichetta. I totali compaiono solo sull'ultima pagina.
+relatech_payslip_template = {
+    "periodo_di_retribuzione": {"label": r"^PERIODOsDIsRETRIBUZIONE$", "x": (425, 530), "dy": (4, 18), "type": "period"},
+    "totale_retribuzione_minima_lorda": {"label": r"^TOTALE$", "x": (510, 580), "dy": (6, 18), "type": "float"},
+    "giorni_lavorati": {"label": r"^LAVORATO$", "x": (140, 172), "dy": (8, 20), "type": "float"},
+    "ore_lavorate": {"label": r"^LAVORATO$", "x": (172, 218), "dy": (8, 20), "type": "float"},
+    "ore_straordinarie": {"label": r"^LAVORATO$", "x": (218, 258), "dy": (8, 20), "type": "float"},
+    "ritenute_irpef": {"label": r"^F0[36]020Ritenute$", "x": (440, 500), "dy": (-4, 4), "type": "float"},
+    "totale_competenze": {"label": r"^TOTALEsCOMPETENZE$", "x": (485, 585), "dy": (-4, 6), "type": "float"},
+    "totale_trattenute": {"label": r"^TOTALEsTRATTENUTE$", "x": (485, 585), "dy": (-4, 6), "type": "float"},
+    "arrotondamento": {"label": r"^ARROTONDAMENTO$", "x": (485, 585), "dy": (-4, 5), "type": "float"},
+    "netto_del_mese": {"label": r"^NETTOsDELsMESE$", "x": (480, 585), "dy": (5, 18), "type": "float"},
+    "retribuzione_utile_tfr": {"label": r"^Retribuzione$", "x": (270, 320), "dy": (-4, 4), "type": "float"},
+    "quota_tfr": {"label": r"^Quota$", "x": (270, 320), "dy": (-4, 4), "type": "float"},
+    "totale_ferie_rimanenti": {"label": r"^Ferie$", "x": (310, 360), "dy": (-4, 4), "type": "float"},
+    "totale_permessi_rimanenti": {"label": r"^R\.O\.L\.$", "x": (310, 360), "dy": (-4, 4), "type": "float"},
+}
+
+# Etichette vicino alle quali si trova ogni campo nel testo dei cedolini (estrazione ibrida);
+# nel testo estratto gli spazi delle intestazioni compaiono come 's'
+relatech_field_labels = {
+    "periodo_di_retribuzione": ["Centro di costo"],
+    "totale_retribuzione_minima_lorda": ["Paga Base"],
+    "giorni_lavorati": ["Detrazioni"],
+    "ore_lavorate": ["Detrazioni"],
+    "ore_straordinarie": ["Detrazioni"],
+    "ritenute_irpef": ["Ritenute IRPEF"],
+    "totale_competenze": ["TOTALEsCOMPETENZE"],
+    "totale_trattenute": ["TOTALEsTRATTENUTE"],
+    "arrotondamento": ["ARROTONDAMENTO"],
+    "netto_del_mese": ["NETTOsDELsMESE"],
+    "retribuzione_utile_tfr": ["Retribuzione utile T.F.R."],
+    "quota_tfr": ["Quota T.F.R."],
+    "totale_ferie_rimanenti": ["Residuo AP"],
+    "totale_permessi_rimanenti": ["R.O.L."],
+}
+
 relatech_df_mandatory_fields = [
     "periodo_di_retribuzione",
     "totale_retribuzione_minima_lorda",
@@ -29,6 +91,9 @@ relatech_df_mandatory_fields = [
     "totale_permessi_rimanenti",
 ]
 
+# Colonne da cui è calcolata la record_key di una busta paga (netto del mese come intero)
+relatech_record_key_columns = ["date_periodo_di_retribuzione", "netto_del_mese"]
+
 relatech_df_columns_to_select = [
     "record_key",
     "ragione_sociale_azienda",
@@ -114,3 +179,7 @@ INSERT INTO buste_paga_history (
 relatech_airtable_table_name = "tbl3pSxuXeWGe1PeV"
 
 relatech_key_field = "record_key"
+
+relatech_checkpoint_file_path = "backend/resources/checkpoints/salary_processed_files.txt"
+
+relatech_history_file_path = "backend/resources/output_data/salary/salary_history.csv"
@@ -0,0 +1,135 @@
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import time
+import zlib
+
+# Configurazione del logger
+logging.basicConfig(
+    level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s"
+)
+logger = logging.getLogger()
+
+# Estensione delle voci della cache su disco (JSON compresso con zlib)
+cache_entry_extension = ".zlib"
+
+
+def build_cache_key(*parts):
+    """
+    Costruisce una chiave di cache stabile (SHA-256) a partire da valori serializzabili in JSON.
+    """
+    serialized = json.dumps(parts, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(serialized.encode("utf-8")).hexdigest()
+
+
+def get_cache_entry_path(cache_dir, key):
+    return os.path.join(cache_dir, key + cache_entry_extension)
+
+
+def cache_get(cache_dir, key, ttl_seconds=None):
+    """
+    Legge un valore dalla cache su disco.
+    Su ogni lettura riuscita aggiorna l'mtime della voce, usato come ordine LRU per l'eliminazione.
+
+    Parameters:
+        cache_dir (str): Cartella della cache.
+        key (str): Chiave della voce.
+        ttl_seconds (float, opzionale): Età massima della voce dalla sua scrittura; se superata la voce viene eliminata.
+
+    Returns:
+        str: Il valore memorizzato, oppure None se assente, scaduto o illeggibile.
+    """
+    entry_path = get_cache_entry_path(cache_dir, key)
+    try:
+        with open(entry_path, "rb") as f:
+            entry = json.loads(zlib.decompress(f.read()).decode("utf-8"))
+    except FileNotFoundError:
+        return None
+    except Exception as e:
+        logger.warning(f"Voce di cache illeggibile {entry_path}, verrà ignorata: {e}")
+        return None
+
+    if ttl_seconds is not None and time.time() - entry["created"] > ttl_seconds:
+        try:
+            os.remove(entry_path)
+        except OSError:
+            pass
+        return None
+
+    try:
+        os.utime(entry_path)
+    except OSError:
+        pass
+    return entry["value"]
+
+
+def cache_set(cache_dir, key, value, max_bytes=None):
+    """
+    Scrive un valore nella cache su disco (compresso) ed elimina le voci meno usate
+    se la cache supera max_bytes.
+
+    Parameters:
+        cache_dir (str): Cartella della cache.
+        key (str): Chiave della voce.
+        value (str): Valore da memorizzare.
+        max_bytes (int, opzionale): Dimensione massima complessiva della cache.
+    """
+    os.makedirs(cache_dir, exist_ok=True)
+    entry_path = get_cache_entry_path(cache_dir, key)
+    payload = json.dumps({"created": time.time(), "value": value}, ensure_ascii=False)
+
+    # File temporaneo univoco nella stessa cartella: più thread e processi possono scrivere
+    # la stessa voce contemporaneamente senza sovrascriversi il file prima di os.replace
+    file_descriptor, temporary_path = tempfile.mkstemp(dir=cache_dir, suffix=".tmp")
+    try:
+        with os.fdopen(file_descriptor, "wb") as f:
+            f.write(zlib.compress(payload.encode("utf-8")))
+        os.replace(temporary_path, entry_path)
+    except BaseException:
+        try:
+            os.remove(temporary_path)
+        except OSError:
+            pass
+        raise
+
+    if max_bytes is not None:
+        evict_cache(cache_dir, max_bytes)
+
+
+def evict_cache(cache_dir, max_bytes):
+    """
+    Elimina le voci usate meno di recente finché la cache non rientra in max_bytes.
+
+    Parameters:
+        cache_dir (str): Cartella della cache.
+        max_bytes (int): Dimensione massima complessiva della cache.
+
+    Returns:
+        int: Numero di voci eliminate.
+    """
+    entries = []
+    total_bytes = 0
+    with os.scandir(cache_dir) as scanned:
+        for entry in scanned:
+            if entry.is_file() and entry.name.endswith(cache_entry_extension):
+                stat = entry.stat()
+                entries.append((stat.st_mtime_ns, stat.st_size, entry.path))
+                total_bytes += stat.st_size
+
+    if total_bytes <= max_bytes:
+        return 0
+
+    removed = 0
+    for _, size, path in sorted(entries):
+        if total_bytes <= max_bytes:
+            break
+        try:
+            os.remove(path)
+            total_bytes -= size
+            removed += 1
+        except FileNotFoundError:
+            pass
+    logger.info(f"Cache {cache_dir}: eliminate {removed} voci meno recenti.")
+    return removed
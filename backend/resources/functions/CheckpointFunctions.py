@@ -0,0 +1,163 @@
+import json
+import logging
+import os
+
+from resources.functions.Functions import compute_file_hash
+
+# Configurazione del logger
+logging.basicConfig(
+    level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s"
+)
+logger = logging.getLogger()
+
+
+def get_file_fingerprint(file_path):
+    """
+    Restituisce la coppia (dimensione, mtime in nanosecondi) di un file senza aprirlo.
+    """
+    stat = os.stat(file_path)
+    return stat.st_size, stat.st_mtime_ns
+
+
+def load_checkpoint_store(store_path, legacy_checkpoint_files=None):
+    """
+    Carica lo store dei checkpoint, indicizzato per percorso e per hash del contenuto.
+
+    Sul disco lo store è un JSON compatto {percorso: [dimensione, mtime_ns, sha256]};
+    in memoria vengono costruiti anche l'indice inverso hash -> percorso e l'insieme
+    dei nomi presenti nei vecchi checkpoint testuali, usato per migrare i file già elaborati.
+
+    Parameters:
+        store_path (str): Percorso del file JSON dello store.
+        legacy_checkpoint_files (list[str], opzionale): File di checkpoint testuali (un nome per riga).
+
+    Returns:
+        dict: Store dei checkpoint.
+    """
+    files = {}
+    if os.path.isfile(store_path):
+        with open(store_path, "r") as f:
+            files = {path: tuple(record) for path, record in json.load(f).items()}
+        logger.info(f"Store dei checkpoint caricato: {len(files)} file registrati.")
+    else:
+        logger.info(f"Store dei checkpoint non trovato, ne verrà creato uno nuovo: {store_path}")
+
+    legacy_names = set()
+    for legacy_file in legacy_checkpoint_files or []:
+        if os.path.isfile(legacy_file):
+            with open(legacy_file, "r") as f:
+                legacy_names.update(f.read().splitlines())
+
+    return {
+        "path": store_path,
+        "files": files,
+        "hashes": {record[2]: path for path, record in files.items()},
+        "legacy_names": legacy_names,
+        "pending": {},
+        "dirty": False,
+    }
+
+
+def register_file(store, file_path, fingerprint, file_hash):
+    normalized_path = os.path.normpath(file_path)
+    store["files"][normalized_path] = (fingerprint[0], fingerprint[1], file_hash)
+    store["hashes"][file_hash] = normalized_path
+    store["dirty"] = True
+
+
+def is_file_registered(store, file_path):
+    """
+    Verifica solo in memoria se un percorso è registrato nello store, senza accedere al file.
+    """
+    return os.path.normpath(file_path) in store["files"]
+
+
+def is_file_processed(store, file_path):
+    """
+    Verifica se un file è già stato elaborato.
+
+    Se percorso, dimensione e mtime coincidono con lo store il file non viene nemmeno aperto;
+    altrimenti se ne calcola l'hash: un file rinominato con contenuto già visto viene
+    considerato elaborato, un file con lo stesso nome ma contenuto diverso viene rielaborato.
+
+    Parameters:
+        store (dict): Store dei checkpoint.
+        file_path (str): Percorso del file da verificare.
+
+    Returns:
+        bool: True se il file non va rielaborato.
+    """
+    normalized_path = os.path.normpath(file_path)
+    fingerprint = get_file_fingerprint(normalized_path)
+    record = store["files"].get(normalized_path)
+
+    # Percorso veloce: file invariato, nessuna lettura del contenuto
+    if record is not None and record[:2] == fingerprint:
+        return True
+
+    file_hash = compute_file_hash(normalized_path)
+
+    if record is not None:
+        if record[2] == file_hash:
+            # Solo mtime modificato (es. copia): aggiorna l'impronta
+            register_file(store, normalized_path, fingerprint, file_hash)
+            return True
+        logger.info(f"File {normalized_path} modificato dall'ultima elaborazione.")
+        store["pending"][normalized_path] = (fingerprint, file_hash)
+        return False
+
+    if file_hash in store["hashes"]:
+        logger.info(
+            f"File {normalized_path} già elaborato come {store['hashes'][file_hash]}: salto."
+        )
+        register_file(store, normalized_path, fingerprint, file_hash)
+        return True
+
+    if os.path.basename(normalized_path) in store["legacy_names"]:
+        # Migrazione dai vecchi checkpoint basati sul solo nome del file
+        register_file(store, normalized_path, fingerprint, file_hash)
+        return True
+
+    store["pending"][normalized_path] = (fingerprint, file_hash)
+    return False
+
+
+def mark_files_processed(store, file_paths):
+    """
+    Registra nello store i file elaborati con la loro impronta e il loro hash.
+
+    Parameters:
+        store (dict): Store dei checkpoint.
+        file_paths (list[str]): Percorsi dei file elaborati con successo.
+    """
+    for file_path in file_paths:
+        normalized_path = os.path.normpath(file_path)
+        fingerprint, file_hash = store["pending"].pop(normalized_path, (None, None))
+        current_fingerprint = get_file_fingerprint(normalized_path)
+        if fingerprint != current_fingerprint:
+            # Il file è cambiato (o non è stato verificato) durante l'elaborazione
+            file_hash = compute_file_hash(normalized_path)
+        register_file(store, normalized_path, current_fingerprint, file_hash)
+    logger.info(f"Checkpoint aggiornato in memoria con {len(file_paths)} file.")
+
+
+def save_checkpoint_store(store):
+    """
+    Salva lo store dei checkpoint su disco in modo atomico, solo se è stato modificato.
+
+    Parameters:
+        store (dict): Store dei checkpoint.
+    """
+    if not store["dirty"]:
+        return
+
+    temporary_path = store["path"] + ".tmp"
+    with open(temporary_path, "w") as f:
+        json.dump(
+            {path: list(record) for path, record in sorted(store["files"].items())},
+            f,
+            separators=(",", ":"),
+        )
+    os.replace(temporary_path, store["path"])
+    store["dirty"] = False
+    logger.info(f"Store dei checkpoint salvato: {store['path']}")
@@ -0,0 +1,74 @@
+import logging
+import re
+
+# Configurazione del logger
+logging.basicConfig(
+    level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s"
+)
+logger = logging.getLogger()
+
+# Inizio di un movimento in un estratto conto: una riga che comincia con una data dd/mm/yyyy
+movement_start_pattern = re.compile(r"^\d{2}/\d{2}/\d{4}\b", re.MULTILINE)
+
+
+def split_at_movements(text, max_chars):
+    """
+    Divide il testo di una pagina troppo lunga all'inizio dei movimenti.
+    Un singolo movimento più lungo di max_chars viene diviso in parti di max_chars caratteri.
+
+    Parameters:
+        text (str): Testo della pagina (con gli a capo originali).
+        max_chars (int): Lunghezza massima di ogni parte.
+
+    Returns:
+        list: Parti del testo, ognuna al più di max_chars caratteri.
+    """
+    starts = [match.start() for match in movement_start_pattern.finditer(text)]
+    if not starts or starts[0] != 0:
+        starts.insert(0, 0)
+
+    pieces = []
+    for start, end in zip(starts, starts[1:] + [len(text)]):
+        segment = text[start:end]
+        while len(segment) > max_chars:
+            pieces.append(segment[:max_chars])
+            segment = segment[max_chars:]
+        pieces.append(segment)
+    return pieces
+
+
+def split_pages_into_chunks(pages, max_chars):
+    """
+    Raggruppa le pagine di un documento in blocchi di al più max_chars caratteri, da inviare
+    all'estrazione separatamente. Le pagine intere restano nello stesso blocco; quelle più lunghe
+    di max_chars vengono divise all'inizio dei movimenti, così che un movimento non sia spezzato.
+
+    Parameters:
+        pages (list[str]): Testo di ogni pagina.
+        max_chars (int): Lunghezza massima di un blocco.
+
+    Returns:
+        list: Blocchi di testo con gli spazi normalizzati.
+    """
+    pieces = []
+    for page in pages:
+        if len(page) <= max_chars:
+            pieces.append(page)
+        else:
+            pieces.extend(split_at_movements(page, max_chars))
+
+    chunks, current = [], ""
+    for piece in pieces:
+        if current and len(current) + 1 + len(piece) > max_chars:
+            chunks.append(current)
+            current = piece
+        else:
+            current = f"{current}\n{piece}" if current else piece
+    chunks.append(current)
+
+    chunks = [re.sub(r"\s+", " ", chunk).strip() for chunk in chunks]
+    chunks = [chunk for chunk in chunks if chunk]
+    logger.info(
+        f"{len(pages)} pagine divise in {len(chunks)} blocchi da al più {max_chars} caratteri."
+    )
+    return chunks
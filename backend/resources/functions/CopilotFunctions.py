@@ -1,7 +1,13 @@
+import hashlib
+import json
 import logging
+import re
+import threading
 import time
+from multiprocessing.util import Finalize
 
 from selenium import webdriver
+from selenium.common.exceptions import StaleElementReferenceException
 from selenium.webdriver.common.by import By
 from selenium.webdriver.common.keys import Keys
 from selenium.webdriver.support import expected_conditions as ec
@@ -15,92 +21,470 @@ logging.basicConfig(
 )
 logger = logging.getLogger()
 
+copilot_url = "https://copilot.microsoft.com/"
+copilot_onboarding_url = "https://copilot.microsoft.com/onboarding"
 
-def run_copilot(input_text, info_to_extract):
+# XPath del blocco di codice che contiene la risposta di Copilot
+copilot_response_xpath = '//*[@class="text-sm font-ligatures-none"]'
+
+# Attesa della risposta: timeout per la comparsa, timeout complessivo, secondi con testo invariato
+# perché la risposta sia considerata completa e intervallo tra due controlli
+copilot_response_wait = {
+    "first_response_timeout": 30.0,
+    "response_timeout": 90.0,
+    "stable_seconds": 1.5,
+    "poll_interval": 0.25,
+}
+
+# Pool di sessioni del browser riutilizzate tra più chiamate a run_copilot (keep_session=True).
+# Ogni sessione fa l'onboarding una sola volta e viene riciclata dopo max_uses query o in caso di errore.
+copilot_pool = {
+    "condition": threading.Condition(),
+    "idle_sessions": [],
+    "open_sessions": 0,
+    "max_sessions": 1,
+    "max_uses": 20,
+    "finalizer": None,
+}
+
+
+def start_copilot_session():
     """
-    Automazione dell'interazione con il sito Copilot di Microsoft con logica di fallback.
+    Avvia un browser Chrome sulla pagina di Copilot e completa l'onboarding.
+
+    Ritorna:
+    webdriver.Chrome: Il driver pronto a ricevere query.
+    """
+    # Avvia il browser Chrome
+    driver = webdriver.Chrome()
+    logger.info("Caricamento della pagina Copilot.")
+    driver.get(copilot_onboarding_url)
+
+    # Tentativo di cliccare su "Inizia"
+    try:
+        logger.info("Tentativo di cliccare sul pulsante 'Inizia'.")
+        WebDriverWait(driver, 5).until(
+            ec.element_to_be_clickable((By.XPATH, '//*[@title="Inizia"]'))
+        ).click()
+        logger.info("Pulsante 'Inizia' cliccato.")
+    except Exception:
+        logger.warning(
+            "Pulsante 'Inizia' non trovato. Procedo al passaggio successivo."
+        )
+
+    # Tentativo di inserire "Christian"
+    try:
+        logger.info("Tentativo di inserire 'Christian' nella casella di input.")
+        WebDriverWait(driver, 5).until(
+            ec.presence_of_element_located((By.ID, "userInput"))
+        ).send_keys("Christian", Keys.RETURN)
+        logger.info("'Christian' inserito con successo.")
+    except Exception:
+        logger.warning(
+            "Casella di input per 'Christian' non trovata. Procedo al passaggio successivo."
+        )
+
+    # Tentativo di cliccare su "Avanti"
+    try:
+        logger.info("Tentativo di cliccare sul pulsante 'Avanti'.")
+        WebDriverWait(driver, 5).until(
+            ec.element_to_be_clickable((By.XPATH, '//*[@title="Avanti"]'))
+        ).click()
+        logger.info("Pulsante 'Avanti' cliccato.")
+    except Exception:
+        logger.warning(
+            "Pulsante 'Avanti' non trovato. Procedo al passaggio successivo."
+        )
+
+    return driver
+
+
+def build_copilot_query(input_text, info_to_extract):
+    """
+    Costruisce la query da inviare a Copilot per estrarre i campi indicati dal testo.
+    """
+    return f"Estrai le seguenti informazioni senza commenti, in formato json, su una sola riga e in un blocco di codice: {concat_fields(info_to_extract)} dal seguente testo non formattato: {input_text}"
+
+
+def build_copilot_batch_query(documents, info_to_extract):
+    """
+    Costruisce una query unica per più documenti dello stesso dominio: la risposta attesa è una
+    lista JSON con un oggetto per documento, identificato dal campo document_id.
 
     Parametri:
-    input_text (str): Il testo non formattato che verrà analizzato da Copilot.
+    documents (dict): Testi dei documenti indicizzati per identificativo.
+    info_to_extract (list[str]): Campi da estrarre da ciascun documento.
+    """
+    documents_text = " ".join(
+        f"[documento {document_id}] {text}" for document_id, text in documents.items()
+    )
+    return (
+        "Estrai da ciascuno dei seguenti documenti le seguenti informazioni senza commenti, "
+        "in formato json, su una sola riga e in un blocco di codice: una lista con un oggetto "
+        "per documento, con il campo document_id (l'identificativo tra parentesi quadre) e i campi "
+        f"{concat_fields(info_to_extract)}; usa null per i campi non presenti. "
+        f"Documenti non formattati: {documents_text}"
+    )
 
-    Questo metodo automatizza l'interazione con Copilot: apre il sito, invia richieste e riceve risposte.
-    In caso di errori, vengono loggati e il browser viene chiuso correttamente.
+
+def get_field_names(info_to_extract):
     """
-    logger.info("Inizio interazione con Copilot.")
+    Restituisce i nomi dei campi richiesti (la prima parola di ogni descrizione).
+    """
+    return [
+        match.group(1)
+        for match in (re.match(r"\s*(\w+)", field) for field in info_to_extract)
+        if match
+    ]
 
-    driver = None
+
+def parse_copilot_batch_response(response_text, document_ids, info_to_extract):
+    """
+    Divide la risposta di una query multi-documento nei risultati dei singoli documenti.
+    Sono scartate le voci non valide: non oggetti, con identificativo sconosciuto o duplicato,
+    o prive di uno dei campi richiesti.
+
+    Parametri:
+    response_text (str): Testo della risposta (lista JSON).
+    document_ids (list[str]): Identificativi dei documenti inviati.
+    info_to_extract (list[str]): Campi richiesti.
+
+    Ritorna:
+    dict: Dati estratti per identificativo, solo per i documenti con una voce valida.
+    """
     try:
-        # Avvia il browser Chrome
-        driver = webdriver.Chrome()
-        logger.info("Caricamento della pagina Copilot.")
-        driver.get("https://copilot.microsoft.com/onboarding")
+        entries = json.loads(response_text)
+    except (TypeError, ValueError):
+        logger.warning("Risposta multi-documento di Copilot non in formato JSON.")
+        return {}
+    if not isinstance(entries, list):
+        logger.warning("La risposta multi-documento di Copilot non è una lista.")
+        return {}
 
-        # Tentativo di cliccare su "Inizia"
-        try:
-            logger.info("Tentativo di cliccare sul pulsante 'Inizia'.")
-            WebDriverWait(driver, 5).until(
-                ec.element_to_be_clickable((By.XPATH, '//*[@title="Inizia"]'))
-            ).click()
-            logger.info("Pulsante 'Inizia' cliccato.")
-        except Exception:
-            logger.warning(
-                "Pulsante 'Inizia' non trovato. Procedo al passaggio successivo."
-            )
+    field_names = get_field_names(info_to_extract)
+    results, duplicated_ids = {}, set()
+    for entry in entries:
+        if not isinstance(entry, dict):
+            continue
+        document_id = str(entry.pop("document_id", ""))
+        if document_id not in document_ids or any(name not in entry for name in field_names):
+            continue
+        if document_id in results:
+            duplicated_ids.add(document_id)
+        results[document_id] = entry
+    for document_id in duplicated_ids:
+        del results[document_id]
+    return results
 
-        # Tentativo di inserire "Christian"
-        try:
-            logger.info("Tentativo di inserire 'Christian' nella casella di input.")
-            WebDriverWait(driver, 5).until(
-                ec.presence_of_element_located((By.ID, "userInput"))
-            ).send_keys("Christian", Keys.RETURN)
-            logger.info("'Christian' inserito con successo.")
-        except Exception:
-            logger.warning(
-                "Casella di input per 'Christian' non trovata. Procedo al passaggio successivo."
-            )
 
-        # Tentativo di cliccare su "Avanti"
-        try:
-            logger.info("Tentativo di cliccare sul pulsante 'Avanti'.")
-            WebDriverWait(driver, 5).until(
-                ec.element_to_be_clickable((By.XPATH, '//*[@title="Avanti"]'))
-            ).click()
-            logger.info("Pulsante 'Avanti' cliccato.")
-        except Exception:
-            logger.warning(
-                "Pulsante 'Avanti' non trovato. Procedo al passaggio successivo."
-            )
+def get_copilot_prompt_version(info_to_extract):
+    """
+    Restituisce la versione del prompt: un hash breve dei modelli di query (singola e
+    multi-documento) e dei campi richiesti. Cambia ogni volta che cambia la lista dei campi
+    di un dominio o il testo di una delle due query.
+    """
+    prompt_template = build_copilot_query("", info_to_extract) + build_copilot_batch_query(
+        {}, info_to_extract
+    )
+    return hashlib.sha256(prompt_template.encode("utf-8")).hexdigest()[:12]
+
+
+def send_copilot_query(driver, query):
+    """
+    Invia una query nella sessione Copilot aperta e ne restituisce la risposta.
+
+    Parametri:
+    driver (webdriver.Chrome): Sessione del browser su cui è già stato fatto l'onboarding.
+    query (str): Testo della query.
+
+    Ritorna:
+    str: Il testo della risposta, oppure None se la casella di input non è disponibile.
+    """
+    logger.info("Invio della query a Copilot.")
+    try:
+        question_box = WebDriverWait(driver, 10).until(
+            ec.presence_of_element_located((By.ID, "userInput"))
+        )
+        question_box.send_keys(query, Keys.RETURN)
+        logger.info("Query inviata con successo.")
+    except Exception:
+        logger.error(
+            "Casella di input per la query non trovata. Interazione fallita."
+        )
+        return None
+
+    # Attesa della risposta
+    logger.info("Attesa della risposta da Copilot.")
+    response_text = wait_for_copilot_response(driver)
+    logger.info(response_text)
+
+    return response_text
+
+
+def configure_copilot_response_wait(
+    response_timeout=None, stable_seconds=None, first_response_timeout=None
+):
+    """
+    Imposta i tempi di attesa della risposta di Copilot. I parametri non indicati restano invariati.
+
+    Parametri:
+    response_timeout (float): Secondi massimi dall'invio della query alla risposta completa.
+    stable_seconds (float): Secondi con testo invariato dopo i quali la risposta è considerata completa.
+    first_response_timeout (float): Secondi massimi per la comparsa della risposta.
+    """
+    for name, value in (
+        ("response_timeout", response_timeout),
+        ("stable_seconds", stable_seconds),
+        ("first_response_timeout", first_response_timeout),
+    ):
+        if value is not None:
+            copilot_response_wait[name] = value
+
+
+def is_complete_json(text):
+    """
+    Verifica se il testo è un oggetto o una lista JSON completi (una risposta parziale non lo è).
+    """
+    try:
+        return isinstance(json.loads(text), (dict, list))
+    except ValueError:
+        return False
+
+
+def is_json_prefix(text):
+    """
+    Verifica se il testo è l'inizio di una risposta JSON (oggetto, lista o blocco ```json),
+    anche se ancora incompleta.
+    """
+    return text.lstrip().startswith(("{", "[", "```"))
+
+
+def wait_for_copilot_response(driver):
+    """
+    Attende la risposta di Copilot senza pause fisse: la risposta è completa appena il testo
+    è un JSON valido oppure, se non è l'inizio di un JSON, quando resta invariato per
+    stable_seconds. Un JSON ancora incompleto viene atteso fino a response_timeout, così una
+    pausa dello streaming non tronca le risposte lunghe.
+
+    Parametri:
+    driver (webdriver.Chrome): Sessione su cui è appena stata inviata la query.
+
+    Ritorna:
+    str: Il testo della risposta (quello disponibile allo scadere del timeout complessivo).
+    """
+    settings = copilot_response_wait
+    started = time.monotonic()
+    WebDriverWait(
+        driver, settings["first_response_timeout"], poll_frequency=settings["poll_interval"]
+    ).until(ec.presence_of_element_located((By.XPATH, copilot_response_xpath)))
 
-        # Invio della query
-        query = f"Estrai le seguenti informazioni senza commenti, in formato json, su una sola riga e in un blocco di codice: {concat_fields(info_to_extract)} dal seguente testo non formattato: {input_text}"
-        logger.info("Invio della query a Copilot.")
+    response_text = ""
+    stable_since = time.monotonic()
+    while True:
         try:
-            question_box = WebDriverWait(driver, 10).until(
-                ec.presence_of_element_located((By.ID, "userInput"))
+            # Durante lo streaming l'elemento può essere sostituito: viene cercato a ogni controllo
+            current_text = driver.find_elements(By.XPATH, copilot_response_xpath)[-1].text
+        except (IndexError, StaleElementReferenceException):
+            current_text = response_text
+        now = time.monotonic()
+
+        if current_text != response_text:
+            response_text = current_text
+            stable_since = now
+        if response_text and is_complete_json(response_text):
+            logger.info(f"Risposta completa ricevuta da Copilot in {now - started:.1f}s.")
+            return response_text
+        if (
+            response_text
+            and not is_json_prefix(response_text)
+            and now - stable_since >= settings["stable_seconds"]
+        ):
+            logger.info(
+                f"Risposta ricevuta da Copilot in {now - started:.1f}s (testo stabile)."
             )
-            question_box.send_keys(query, Keys.RETURN)
-            logger.info("Query inviata con successo.")
-        except Exception:
-            logger.error(
-                "Casella di input per la query non trovata. Interazione fallita."
+            return response_text
+        if now - started >= settings["response_timeout"]:
+            logger.warning(
+                f"Timeout di {settings['response_timeout']}s nell'attesa della risposta di Copilot."
             )
-            return None
+            return response_text
+        time.sleep(settings["poll_interval"])
 
-        # Attesa della risposta
-        logger.info("Attesa della risposta da Copilot.")
-        time.sleep(10)
-        response_element = WebDriverWait(driver, 10).until(
-            ec.presence_of_element_located(
-                (By.XPATH, '//*[@class="text-sm font-ligatures-none"]')
-            )
+
+def configure_copilot_pool(max_sessions=None, max_uses=None):
+    """
+    Imposta le dimensioni del pool di sessioni Copilot del processo corrente.
+    I parametri non indicati restano invariati.
+
+    Parametri:
+    max_sessions (int): Numero massimo di browser aperti contemporaneamente (uno per worker LLM).
+    max_uses (int): Query servite da una sessione prima di essere chiusa e sostituita.
+    """
+    with copilot_pool["condition"]:
+        if max_sessions is not None:
+            copilot_pool["max_sessions"] = max(1, max_sessions)
+        if max_uses is not None:
+            copilot_pool["max_uses"] = max(1, max_uses)
+        copilot_pool["condition"].notify_all()
+
+
+def quit_copilot_driver(driver):
+    try:
+        driver.quit()
+    except Exception as e:
+        logger.error(f"Errore durante la chiusura del browser: {e}")
+
+
+def is_copilot_session_healthy(session):
+    """
+    Controllo di salute di una sessione riutilizzata: riporta la pagina su una nuova conversazione
+    e verifica che la casella di input sia disponibile (browser vivo e onboarding ancora valido).
+    """
+    try:
+        session["driver"].get(copilot_url)
+        WebDriverWait(session["driver"], 10).until(
+            ec.presence_of_element_located((By.ID, "userInput"))
         )
-        logger.info("Risposta ricevuta da Copilot.")
+        return True
+    except Exception as e:
+        logger.warning(f"Sessione Copilot non più utilizzabile, verrà sostituita: {e}")
+        return False
+
+
+def acquire_copilot_session():
+    """
+    Preleva una sessione dal pool. Riusa una sessione libera e sana, ne avvia una nuova
+    (con onboarding) se il pool non è pieno, altrimenti attende che un'altra venga rilasciata.
+
+    Ritorna:
+    dict: Sessione con il driver ('driver') e il numero di query già servite ('uses').
+    """
+    condition = copilot_pool["condition"]
+    while True:
+        with condition:
+            while (
+                not copilot_pool["idle_sessions"]
+                and copilot_pool["open_sessions"] >= copilot_pool["max_sessions"]
+            ):
+                condition.wait()
+            if copilot_pool["idle_sessions"]:
+                session = copilot_pool["idle_sessions"].pop()
+            else:
+                session = None
+                copilot_pool["open_sessions"] += 1
+                if copilot_pool["finalizer"] is None:
+                    # Chiude i browser all'uscita del processo, anche nei worker di un pool di processi
+                    copilot_pool["finalizer"] = Finalize(
+                        None, close_copilot_sessions, exitpriority=10
+                    )
+
+        if session is None:
+            # Avvio fuori dal lock: più sessioni possono fare l'onboarding in parallelo
+            try:
+                return {"driver": start_copilot_session(), "uses": 0}
+            except Exception:
+                discard_copilot_session(None)
+                raise
+
+        if is_copilot_session_healthy(session):
+            logger.info(f"Riutilizzo di una sessione Copilot ({session['uses']} query servite).")
+            return session
+        discard_copilot_session(session)
+
+
+def discard_copilot_session(session):
+    """
+    Chiude una sessione e libera il suo posto nel pool.
+    """
+    if session is not None:
+        quit_copilot_driver(session["driver"])
+    with copilot_pool["condition"]:
+        copilot_pool["open_sessions"] -= 1
+        copilot_pool["condition"].notify()
+
+
+def release_copilot_session(session, failed=False):
+    """
+    Restituisce una sessione al pool dopo una query. La sessione viene chiusa se la query
+    è fallita o se ha raggiunto il numero massimo di utilizzi.
+    """
+    session["uses"] += 1
+    if failed or session["uses"] >= copilot_pool["max_uses"]:
+        reason = "errore" if failed else f"{session['uses']} query servite"
+        logger.info(f"Riciclo della sessione Copilot ({reason}).")
+        discard_copilot_session(session)
+        return
+    with copilot_pool["condition"]:
+        copilot_pool["idle_sessions"].append(session)
+        copilot_pool["condition"].notify()
+
+
+def close_copilot_sessions():
+    """
+    Chiude tutte le sessioni libere del pool.
+    """
+    with copilot_pool["condition"]:
+        idle_sessions = copilot_pool["idle_sessions"]
+        copilot_pool["idle_sessions"] = []
+        copilot_pool["open_sessions"] -= len(idle_sessions)
+    if idle_sessions:
+        logger.info(f"Chiusura di {len(idle_sessions)} sessioni Copilot.")
+    for session in idle_sessions:
+        quit_copilot_driver(session["driver"])
+
+
+def run_copilot(input_text, info_to_extract, keep_session=False):
+    """
+    Automazione dell'interazione con il sito Copilot di Microsoft con logica di fallback.
+
+    Parametri:
+    input_text (str): Il testo non formattato che verrà analizzato da Copilot.
+    info_to_extract (list[str]): Campi da estrarre dal testo.
+    keep_session (bool): Se True usa una sessione del pool (vedi acquire_copilot_session),
+                         evitando avvio e onboarding del browser a ogni documento.
+
+    Questo metodo automatizza l'interazione con Copilot: apre il sito, invia richieste e riceve risposte.
+    In caso di errori, vengono loggati e il browser viene chiuso correttamente.
+    """
+    return run_copilot_query(build_copilot_query(input_text, info_to_extract), keep_session)
+
+
+def run_copilot_query(query, keep_session=False):
+    """
+    Invia una query già costruita a Copilot, con un browser del pool o dedicato.
 
-        response_text = response_element.text
-        logger.info(response_text)
+    Parametri:
+    query (str): Testo della query.
+    keep_session (bool): Se True usa una sessione del pool, altrimenti avvia e chiude un browser.
 
+    Ritorna:
+    str: Il testo della risposta, oppure None in caso di errore.
+    """
+    logger.info("Inizio interazione con Copilot.")
+
+    if keep_session:
+        try:
+            session = acquire_copilot_session()
+        except Exception as e:
+            logger.error(f"Impossibile avviare una sessione Copilot: {e}")
+            return None
+        try:
+            response_text = send_copilot_query(session["driver"], query)
+        except Exception as e:
+            logger.error(
+                f"Si è verificato un errore durante l'interazione con Copilot: {e}"
+            )
+            # La sessione potrebbe essere compromessa: viene sostituita alla prossima richiesta
+            release_copilot_session(session, failed=True)
+            return None
+        release_copilot_session(session, failed=response_text is None)
         return response_text
 
+    driver = None
+    try:
+        driver = start_copilot_session()
+        return send_copilot_query(driver, query)
+
     except Exception as e:
         # In caso di errore durante l'interazione, viene loggato il messaggio di errore
         logger.error(
@@ -109,8 +493,5 @@ def run_copilot(input_text, info_to_extract):
     finally:
         # Garantiamo che il driver venga sempre chiuso, anche se si è verificato un errore
         if driver:
-            try:
-                logger.info("Chiusura del browser.")
-                driver.quit()
-            except Exception as e:
-                logger.error(f"Errore durante la chiusura del browser: {e}")
+            logger.info("Chiusura del browser.")
+            quit_copilot_driver(driver)
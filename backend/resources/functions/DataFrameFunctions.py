@@ -1,5 +1,6 @@
 import logging
 
+import numpy as np
 import pandas as pd
 
 # Configurazione del logger
@@ -65,3 +66,36 @@ def cast_columns_with_defaults(df, schema, default_values):
                 f"Colonna '{col}' aggiunta al DataFrame con valore predefinito: {default_value}."
             )
     return df
+
+
+def validate_mandatory_fields(df, mandatory_fields, note_column="note"):
+    """
+    Verifica i campi obbligatori di tutte le righe con maschere booleane, senza cicli per riga:
+    alla colonna delle note di ogni riga viene aggiunto "; Verificare <campo> mancante" per ogni
+    campo mancante, nell'ordine di mandatory_fields. Il DataFrame viene modificato sul posto.
+
+    Parameters:
+        df (pd.DataFrame): DataFrame da verificare, con la colonna delle note già valorizzata.
+        mandatory_fields (list): Campi obbligatori (vedi *_df_mandatory_fields).
+        note_column (str): Colonna delle note.
+
+    Returns:
+        pd.DataFrame: Tabella dei problemi, una riga per campo mancante con l'indice della riga
+                      del DataFrame ('row'), il campo ('field') e il problema ('issue').
+    """
+    missing = df[mandatory_fields].isnull()
+    missing_counts = missing.sum()
+    notes = df[note_column].astype(str)
+    for field, missing_count in missing_counts[missing_counts > 0].items():
+        logger.warning(f"Ci sono {missing_count} valori mancanti nella colonna '{field}'.")
+        notes = notes.where(~missing[field], notes + f"; Verificare {field} mancante")
+    df[note_column] = notes
+
+    rows, columns = np.nonzero(missing.to_numpy())
+    return pd.DataFrame(
+        {
+            "row": df.index[rows],
+            "field": np.asarray(mandatory_fields, dtype=object)[columns],
+            "issue": "mancante",
+        }
+    )
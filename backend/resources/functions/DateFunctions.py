@@ -0,0 +1,90 @@
+import logging
+import re
+from datetime import date
+
+# Configurazione del logger
+logging.basicConfig(
+    level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s"
+)
+logger = logging.getLogger()
+
+# Mesi in italiano, senza dipendere dal locale del sistema (it_IT.UTF-8 non è sempre installato)
+italian_month_numbers = {
+    "gennaio": 1,
+    "febbraio": 2,
+    "marzo": 3,
+    "aprile": 4,
+    "maggio": 5,
+    "giugno": 6,
+    "luglio": 7,
+    "agosto": 8,
+    "settembre": 9,
+    "ottobre": 10,
+    "novembre": 11,
+    "dicembre": 12,
+}
+
+# Mese per nome completo o abbreviato alle prime tre lettere (es. 'GIU. 2024'), seguito dall'anno.
+# Il mese non deve seguire una lettera, ma può seguire '_' o una cifra (es. 'estratto_gennaio2025.pdf')
+month_year_pattern = re.compile(
+    r"(?<![^\W\d_])("
+    + "|".join(f"{month[:3]}(?:{month[3:]})?" for month in italian_month_numbers)
+    + r")\.?[\s-]*(\d{4})",
+    re.IGNORECASE,
+)
+italian_month_numbers_by_prefix = {
+    month[:3]: number for month, number in italian_month_numbers.items()
+}
+iso_date_pattern = re.compile(r"^(\d{4})-(\d{2})-(\d{2})")
+day_first_date_pattern = re.compile(r"^(\d{1,2})[/.-](\d{1,2})[/.-](\d{4})")
+
+
+def parse_italian_date(value):
+    """
+    Converte in data una stringa nei formati prodotti dall'LLM, dai parser e dai file:
+    mese e anno ('Gennaio 2025', 'GIU. 2024', 'dicembre2024' -> primo giorno del mese),
+    'yyyy-mm-dd' oppure 'dd/mm/yyyy' (anche con '-' o '.').
+
+    Parametri:
+    value (str): Testo da convertire.
+
+    Ritorna:
+    date: La data, oppure None se il testo non è in nessuno dei formati attesi.
+    """
+    text = str(value).strip()
+    try:
+        match = iso_date_pattern.match(text)
+        if match:
+            return date(int(match.group(1)), int(match.group(2)), int(match.group(3)))
+        match = day_first_date_pattern.match(text)
+        if match:
+            return date(int(match.group(3)), int(match.group(2)), int(match.group(1)))
+    except ValueError:
+        return None
+    match = month_year_pattern.search(text)
+    if match:
+        month = italian_month_numbers_by_prefix[match.group(1)[:3].lower()]
+        return date(int(match.group(2)), month, 1)
+    return None
+
+
+def parse_italian_dates(values):
+    """
+    Converte in date una colonna di stringhe (vedi parse_italian_date). Ogni valore distinto
+    viene convertito una sola volta e il risultato è ricondotto alle righe con una mappa.
+
+    Parametri:
+    values (pd.Series): Colonna da convertire.
+
+    Ritorna:
+    pd.Series: Date (datetime.date) con lo stesso indice, None per i valori mancanti.
+
+    Solleva:
+    ValueError: Se un valore non mancante non è in nessuno dei formati attesi.
+    """
+    unique_values = values.dropna().unique()
+    parsed = {value: parse_italian_date(value) for value in unique_values}
+    invalid = [value for value, parsed_date in parsed.items() if parsed_date is None]
+    if invalid:
+        raise ValueError(f"Date non riconosciute nella colonna '{values.name}': {invalid}")
+    return values.map(parsed).astype(object).where(values.notna(), None)
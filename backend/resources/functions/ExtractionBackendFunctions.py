@@ -0,0 +1,209 @@
+import logging
+import threading
+import time
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from resources.constants.common.Constants import llm_backend_url
+from resources.functions.CopilotFunctions import (
+    build_copilot_batch_query,
+    build_copilot_query,
+    close_copilot_sessions,
+    parse_copilot_batch_response,
+    run_copilot_query,
+)
+
+# Configurazione del logger
+logging.basicConfig(
+    level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s"
+)
+logger = logging.getLogger()
+
+
+class ExtractionBackendError(RuntimeError):
+    """
+    Il backend di estrazione non ha restituito una risposta: il file viene segnato come fallito
+    dal chiamante e riproposto all'esecuzione successiva.
+    """
+
+
+# Configurazione del backend di estrazione del processo corrente e backend già creato
+backend_settings = {
+    "config": {"type": "selenium"},
+    "backend": None,
+    "lock": threading.Lock(),
+}
+
+
+def create_selenium_backend(config):
+    """
+    Backend che interroga Copilot tramite il browser (pool di sessioni di CopilotFunctions).
+
+    Parameters:
+        config (dict): Configurazione del backend (nessun parametro specifico).
+
+    Returns:
+        dict: Backend con 'name', 'send_query' e 'close'.
+    """
+    return {
+        "name": "selenium",
+        "send_query": lambda query: run_copilot_query(query, keep_session=True),
+        "close": close_copilot_sessions,
+    }
+
+
+def create_http_backend(config):
+    """
+    Backend che invia le query a un servizio HTTP JSON ({"prompt": ...} -> {"response": ...})
+    con una sessione requests condivisa (connessioni riutilizzate), un limite di richieste
+    contemporanee e un limite di richieste al secondo.
+
+    Parameters:
+        config (dict): 'url', 'concurrency' (richieste contemporanee), 'rate_limit'
+                       (richieste al secondo, 0 senza limite) e 'timeout' (secondi per richiesta).
+
+    Returns:
+        dict: Backend con 'name', 'send_query' e 'close'.
+    """
+    url = config.get("url", llm_backend_url)
+    concurrency = max(1, config.get("concurrency", 4))
+    rate_limit = config.get("rate_limit", 0)
+    timeout = config.get("timeout", 120)
+
+    session = requests.Session()
+    adapter = HTTPAdapter(
+        pool_connections=1,
+        pool_maxsize=concurrency,
+        max_retries=Retry(
+            total=3,
+            backoff_factor=0.5,
+            status_forcelist=(429, 502, 503, 504),
+            allowed_methods=None,
+        ),
+    )
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+
+    slots = threading.BoundedSemaphore(concurrency)
+    rate_state = {"lock": threading.Lock(), "next_request": 0.0}
+
+    def wait_for_rate_limit():
+        if not rate_limit:
+            return
+        with rate_state["lock"]:
+            now = time.monotonic()
+            scheduled = max(now, rate_state["next_request"])
+            rate_state["next_request"] = scheduled + 1 / rate_limit
+        if scheduled > now:
+            time.sleep(scheduled - now)
+
+    def send_query(query):
+        with slots:
+            wait_for_rate_limit()
+            try:
+                response = session.post(url, json={"prompt": query}, timeout=timeout)
+                response.raise_for_status()
+                return response.json()["response"]
+            except Exception as e:
+                raise ExtractionBackendError(
+                    f"errore durante la richiesta al backend HTTP {url}: {e}"
+                ) from e
+
+    logger.info(
+        f"Backend HTTP {url}: {concurrency} richieste contemporanee, "
+        f"limite {rate_limit or 'nessuno'} richieste/s."
+    )
+    return {"name": "http", "send_query": send_query, "close": session.close}
+
+
+# Backend disponibili, creati dalla rispettiva factory a partire dalla configurazione
+backend_factories = {
+    "selenium": create_selenium_backend,
+    "http": create_http_backend,
+}
+
+
+def configure_extraction_backend(config):
+    """
+    Imposta la configurazione del backend di estrazione del processo corrente.
+    Il backend viene creato al primo utilizzo (anche nei worker di un pool di processi).
+
+    Parameters:
+        config (dict): Configurazione con 'type' (chiave di backend_factories) e i parametri del backend.
+    """
+    if config["type"] not in backend_factories:
+        raise ValueError(f"Backend di estrazione non gestito: {config['type']}")
+    with backend_settings["lock"]:
+        backend_settings["config"] = config
+
+
+def get_extraction_backend():
+    """
+    Restituisce il backend di estrazione del processo, creandolo alla prima richiesta.
+    """
+    with backend_settings["lock"]:
+        if backend_settings["backend"] is None:
+            config = backend_settings["config"]
+            backend_settings["backend"] = backend_factories[config["type"]](config)
+        return backend_settings["backend"]
+
+
+def close_extraction_backend():
+    """
+    Chiude il backend di estrazione del processo, se creato.
+    """
+    with backend_settings["lock"]:
+        backend = backend_settings["backend"]
+        backend_settings["backend"] = None
+    if backend is not None:
+        backend["close"]()
+
+
+def run_extraction(input_text, info_to_extract):
+    """
+    Estrae i campi indicati dal testo di un documento con il backend configurato.
+
+    Parameters:
+        input_text (str): Testo del documento.
+        info_to_extract (list[str]): Campi da estrarre.
+
+    Returns:
+        str: Risposta del backend (JSON atteso).
+
+    Raises:
+        ExtractionBackendError: Se il backend non restituisce una risposta.
+    """
+    return send_backend_query(build_copilot_query(input_text, info_to_extract))
+
+
+def send_backend_query(query):
+    """
+    Invia una query al backend configurato. Il backend Selenium segnala gli errori con una
+    risposta None, che viene convertita in ExtractionBackendError come gli errori HTTP.
+    """
+    backend = get_extraction_backend()
+    response = backend["send_query"](query)
+    if response is None:
+        raise ExtractionBackendError(f"nessuna risposta dal backend {backend['name']}")
+    return response
+
+
+def run_extraction_batch(documents, info_to_extract):
+    """
+    Estrae i campi da più documenti dello stesso dominio con una sola query al backend configurato.
+
+    Parameters:
+        documents (dict): Testi dei documenti indicizzati per identificativo.
+        info_to_extract (list[str]): Campi da estrarre da ciascun documento.
+
+    Returns:
+        dict: Dati estratti per identificativo, solo per i documenti con una voce valida.
+
+    Raises:
+        ExtractionBackendError: Se il backend non restituisce una risposta.
+    """
+    logger.info(f"Query multi-documento per {len(documents)} documenti.")
+    response_text = send_backend_query(build_copilot_batch_query(documents, info_to_extract))
+    return parse_copilot_batch_response(response_text, list(documents), info_to_extract)
@@ -0,0 +1,139 @@
+import json
+import logging
+import os
+import tempfile
+from datetime import datetime
+
+from resources.functions.CopilotFunctions import is_complete_json
+
+# Configurazione del logger
+logging.basicConfig(
+    level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s"
+)
+logger = logging.getLogger()
+
+
+def get_extraction_path(store_folder, domain, document_hash):
+    return os.path.join(store_folder, domain, f"{document_hash}.json")
+
+
+def save_extraction(
+    store_folder, domain, document_hash, prompt_version, source_file, response
+):
+    """
+    Salva la risposta grezza dell'LLM per un documento, prima di qualsiasi trasformazione,
+    così che un errore a valle non costringa a interrogare di nuovo Copilot.
+
+    Parameters:
+        store_folder (str): Cartella radice delle estrazioni.
+        domain (str): Dominio del documento.
+        document_hash (str): Hash SHA-256 del contenuto del documento.
+        prompt_version (str): Versione del prompt usato (vedi get_copilot_prompt_version).
+        source_file (str): Percorso del file di origine.
+        response (str): Testo della risposta dell'LLM.
+
+    Returns:
+        bool: True se la risposta è stata salvata; una risposta che non è un JSON completo
+              non viene salvata, così che il documento venga interrogato di nuovo.
+    """
+    if not is_complete_json(response or ""):
+        logger.warning(
+            f"Risposta per {source_file} non in formato JSON: non salvata nello store delle estrazioni."
+        )
+        return False
+    extraction_path = get_extraction_path(store_folder, domain, document_hash)
+    os.makedirs(os.path.dirname(extraction_path), exist_ok=True)
+    record = {
+        "document_hash": document_hash,
+        "domain": domain,
+        "prompt_version": prompt_version,
+        "source_file": source_file,
+        "extracted_at": datetime.now().isoformat(timespec="seconds"),
+        "response": response,
+    }
+
+    file_descriptor, temporary_path = tempfile.mkstemp(
+        dir=os.path.dirname(extraction_path), suffix=".tmp"
+    )
+    with os.fdopen(file_descriptor, "w", encoding="utf-8") as f:
+        json.dump(record, f, ensure_ascii=False, indent=2)
+    os.replace(temporary_path, extraction_path)
+    logger.info(f"Estrazione salvata: {extraction_path}")
+    return True
+
+
+def is_valid_extraction(record):
+    """
+    Verifica che un record dello store contenga una risposta JSON completa
+    (i record salvati prima di questo controllo possono contenere una risposta nulla).
+    """
+    return isinstance(record, dict) and is_complete_json(record.get("response") or "")
+
+
+def load_extraction(store_folder, domain, document_hash, prompt_version=None):
+    """
+    Carica l'estrazione salvata di un documento.
+
+    Parameters:
+        store_folder (str): Cartella radice delle estrazioni.
+        domain (str): Dominio del documento.
+        document_hash (str): Hash SHA-256 del contenuto del documento.
+        prompt_version (str, opzionale): Se indicata, l'estrazione viene restituita solo se
+                                         ottenuta con la stessa versione del prompt.
+
+    Returns:
+        dict: Record dell'estrazione, oppure None se assente, illeggibile, senza una risposta JSON
+              valida o con un prompt diverso.
+    """
+    extraction_path = get_extraction_path(store_folder, domain, document_hash)
+    if not os.path.isfile(extraction_path):
+        return None
+    try:
+        with open(extraction_path, "r", encoding="utf-8") as f:
+            record = json.load(f)
+    except Exception as e:
+        logger.error(f"Estrazione {extraction_path} illeggibile, verrà ripetuta: {e}")
+        return None
+    if not is_valid_extraction(record):
+        logger.warning(f"Estrazione {extraction_path} senza una risposta valida: verrà ripetuta.")
+        return None
+    if prompt_version is not None and record["prompt_version"] != prompt_version:
+        logger.info(
+            f"Estrazione di {record['source_file']} ottenuta con un prompt diverso "
+            f"({record['prompt_version']} invece di {prompt_version}): verrà ripetuta."
+        )
+        return None
+    return record
+
+
+def load_domain_extractions(store_folder, domain):
+    """
+    Carica tutte le estrazioni salvate di un dominio.
+
+    Parameters:
+        store_folder (str): Cartella radice delle estrazioni.
+        domain (str): Dominio di cui caricare le estrazioni.
+
+    Returns:
+        list: Record delle estrazioni, ordinati per file di origine.
+    """
+    domain_folder = os.path.join(store_folder, domain)
+    if not os.path.isdir(domain_folder):
+        return []
+
+    records = []
+    for filename in sorted(os.listdir(domain_folder)):
+        if not filename.endswith(".json"):
+            continue
+        try:
+            with open(os.path.join(domain_folder, filename), "r", encoding="utf-8") as f:
+                record = json.load(f)
+        except Exception as e:
+            logger.error(f"Estrazione {filename} illeggibile: {e}")
+            continue
+        if not is_valid_extraction(record):
+            logger.warning(f"Estrazione {filename} senza una risposta valida, ignorata.")
+            continue
+        records.append(record)
+    logger.info(f"Caricate {len(records)} estrazioni per il dominio {domain}.")
+    return sorted(records, key=lambda record: record["source_file"])
@@ -1,11 +1,12 @@
+import hashlib
 import logging
 import os
-import re
-from datetime import datetime
 
 import pandas as pd
 from openpyxl.reader.excel import load_workbook
 
+from resources.functions.DateFunctions import month_year_pattern, parse_italian_date
+
 # Configurazione del logger
 logging.basicConfig(
     level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s"
@@ -86,6 +87,24 @@ def update_checkpoint(checkpoint_file, new_files):
     logger.info(f"Checkpoint aggiornato con successo: {checkpoint_file}")
 
 
+def compute_file_hash(file_path, chunk_size=1024 * 1024):
+    """
+    Calcola l'hash SHA-256 del contenuto di un file leggendolo a blocchi.
+
+    Parameters:
+        file_path (str): Percorso del file.
+        chunk_size (int): Dimensione dei blocchi letti (default 1 MB).
+
+    Returns:
+        str: Digest esadecimale del contenuto.
+    """
+    sha256 = hashlib.sha256()
+    with open(file_path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            sha256.update(chunk)
+    return sha256.hexdigest()
+
+
 def write_excel_from_df_in_append_mode(file_path, new_data):
     """
     Salva i dati nel file Excel in modalità append.
@@ -125,28 +144,10 @@ def extract_date_from_filename(filename):
     - str: Data in formato 'dd-mm-yyyy'.
     """
     try:
-        # Mappa dei mesi in italiano
-        mesi = {
-            "gennaio": 1,
-            "febbraio": 2,
-            "marzo": 3,
-            "aprile": 4,
-            "maggio": 5,
-            "giugno": 6,
-            "luglio": 7,
-            "agosto": 8,
-            "settembre": 9,
-            "ottobre": 10,
-            "novembre": 11,
-            "dicembre": 12,
-        }
-
-        # Estrarre il nome del mese e l'anno
-        for mese, numero in mesi.items():
-            if mese in filename.lower():
-                anno = re.search(r"\d{4}", filename).group()
-                data = datetime(int(anno), numero, 1)  # Primo giorno del mese
-                return data.strftime("%d-%m-%Y")
+        # Primo mese seguito dall'anno nel nome del file, senza dipendere dal locale
+        match = month_year_pattern.search(filename)
+        if match:
+            return parse_italian_date(match.group()).strftime("%d-%m-%Y")
 
         logger.warning(f"Impossibile estrarre una data valida dal file: {filename}")
         return None
@@ -163,6 +164,7 @@ def upsert_to_csv(dataframe, csv_path, key_column):
     :param dataframe: DataFrame da scrivere.
     :param csv_path: Percorso del file CSV.
     :param key_column: Nome della colonna chiave per l'unicità.
+    :return: True se il file è aggiornato (o non c'erano record nuovi), False in caso di errore.
     """
     logger.info(f"Inizio upsert del DataFrame nel file {csv_path} con chiave '{key_column}'.")
 
@@ -170,27 +172,29 @@ def upsert_to_csv(dataframe, csv_path, key_column):
         # Se il file non esiste, crea il CSV con i dati del DataFrame
         dataframe.to_csv(csv_path, index=False)
         logger.info(f"File creato: {csv_path}")
-        return
+        return True
 
     # Leggi i dati esistenti dal CSV
     logger.info(f"Leggendo i dati esistenti dal file {csv_path}.")
     try:
-        existing_data = pd.read_csv(csv_path, delimiter=",", header=0)
+        existing_data = pd.read_csv(
+            csv_path, delimiter=",", header=0, dtype={key_column: str}, encoding="utf-8-sig"
+        )
         logger.info(f"File {csv_path} letto con successo. Numero di righe esistenti: {len(existing_data)}")
     except Exception as e:
         logger.error(f"Errore durante la lettura del file {csv_path}: {e}")
-        return
+        return False
 
     # Verifica se la colonna chiave esiste nel CSV esistente
     if key_column not in existing_data.columns:
         logger.error(f"La colonna '{key_column}' non esiste nel CSV esistente.")
-        return
+        return False
     else:
         logger.info(f"La colonna '{key_column}' trovata nel CSV esistente.")
 
     # Trova i record nuovi (che non sono presenti nel CSV esistente)
     logger.info(f"Trovo i nuovi record che non sono presenti nel CSV.")
-    new_data = dataframe[~dataframe[key_column].isin(existing_data[key_column])]
+    new_data = dataframe[~dataframe[key_column].astype(str).isin(existing_data[key_column])]
 
     if not new_data.empty:
         logger.info(f"Trovati {len(new_data)} nuovi record da aggiungere.")
@@ -201,9 +205,12 @@ def upsert_to_csv(dataframe, csv_path, key_column):
             logger.info(f"Aggiunti {len(new_data)} record nuovi a {csv_path}. Il file è stato aggiornato.")
         except Exception as e:
             logger.error(f"Errore durante l'aggiornamento del file CSV: {e}")
+            return False
     else:
         logger.info("Nessun nuovo record da aggiungere.")
 
+    return True
+
 
 def print_project_structure(directory, exclude_folders=None, indent=0, last_item=False):
     # Imposta una lista di cartelle da escludere, se non viene specificata ne usa una vuota
@@ -0,0 +1,260 @@
+import logging
+import os
+
+import pandas as pd
+
+# Configurazione del logger
+logging.basicConfig(
+    level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s"
+)
+logger = logging.getLogger()
+
+# Estensione del file indice delle chiavi salvato accanto a ogni CSV di storico
+key_index_extension = ".keys"
+
+# Indici già caricati nel processo, validi finché il file indice non cambia su disco
+# (mantiene gli indici in memoria tra un'elaborazione e l'altra in modalità watch)
+key_index_cache = {}
+
+
+def get_key_index_path(csv_path):
+    """
+    Restituisce il percorso del file indice delle chiavi associato a un CSV di storico.
+    """
+    return csv_path + key_index_extension
+
+
+def is_key_index_valid(csv_path):
+    """
+    Verifica che l'indice delle chiavi esista e sia allineato al CSV.
+    L'indice viene sempre scritto dopo il CSV, quindi se il CSV è più recente
+    è stato modificato da un'altra scrittura (es. upsert_to_csv) e l'indice va ricostruito.
+
+    Parameters:
+        csv_path (str): Percorso del CSV di storico.
+
+    Returns:
+        bool: True se l'indice può essere usato così com'è.
+    """
+    index_path = get_key_index_path(csv_path)
+    if not os.path.exists(index_path) or not os.path.exists(csv_path):
+        return False
+    return os.stat(index_path).st_mtime_ns >= os.stat(csv_path).st_mtime_ns
+
+
+def rebuild_key_index(csv_path, key_column):
+    """
+    Ricostruisce l'indice delle chiavi leggendo dal CSV solo la colonna chiave.
+
+    Parameters:
+        csv_path (str): Percorso del CSV di storico.
+        key_column (str): Nome della colonna chiave.
+
+    Returns:
+        set: Insieme delle chiavi presenti nel CSV.
+    """
+    logger.info(f"Ricostruzione dell'indice delle chiavi per {csv_path}.")
+    keys = pd.read_csv(
+        csv_path, usecols=[key_column], dtype=str, encoding="utf-8-sig"
+    )[key_column]
+    key_set = set(keys.dropna())
+
+    index_path = get_key_index_path(csv_path)
+    with open(index_path, "w") as f:
+        for key in sorted(key_set):
+            f.write(key + "\n")
+    cache_key_index(csv_path, key_set)
+    logger.info(f"Indice {index_path} ricostruito con {len(key_set)} chiavi.")
+    return key_set
+
+
+def cache_key_index(csv_path, key_set):
+    """
+    Memorizza in memoria l'indice delle chiavi insieme all'mtime corrente del file indice.
+    """
+    index_mtime_ns = os.stat(get_key_index_path(csv_path)).st_mtime_ns
+    key_index_cache[csv_path] = (index_mtime_ns, key_set)
+
+
+def load_key_index(csv_path, key_column):
+    """
+    Carica l'indice delle chiavi di un CSV di storico, ricostruendolo se mancante o non allineato.
+
+    Parameters:
+        csv_path (str): Percorso del CSV di storico.
+        key_column (str): Nome della colonna chiave.
+
+    Returns:
+        set: Insieme delle chiavi presenti nel CSV.
+    """
+    if not os.path.exists(csv_path):
+        return set()
+    if not is_key_index_valid(csv_path):
+        return rebuild_key_index(csv_path, key_column)
+
+    cached = key_index_cache.get(csv_path)
+    index_path = get_key_index_path(csv_path)
+    if cached is not None and cached[0] == os.stat(index_path).st_mtime_ns:
+        return cached[1]
+
+    with open(index_path, "r") as f:
+        key_set = set(f.read().splitlines())
+    cache_key_index(csv_path, key_set)
+    logger.info(f"Indice delle chiavi caricato per {csv_path}: {len(key_set)} chiavi.")
+    return key_set
+
+
+def append_to_csv(dataframe, csv_path, key_column):
+    """
+    Aggiunge in coda a un CSV di storico solo i record con chiave non ancora presente,
+    usando l'indice delle chiavi invece di rileggere tutto il file.
+    Il costo di I/O è proporzionale ai record nuovi, non alla dimensione dello storico.
+
+    :param dataframe: DataFrame da scrivere.
+    :param csv_path: Percorso del file CSV.
+    :param key_column: Nome della colonna chiave per l'unicità.
+    :return: True se il file è aggiornato (o non c'erano record nuovi), False in caso di errore.
+    """
+    logger.info(f"Inizio append del DataFrame nel file {csv_path} con chiave '{key_column}'.")
+
+    if key_column not in dataframe.columns:
+        logger.error(f"La colonna '{key_column}' non esiste nel DataFrame da scrivere.")
+        return False
+
+    dataframe = dataframe.drop_duplicates(subset=key_column, keep="first")
+
+    if not os.path.exists(csv_path):
+        # Se il file non esiste, crea il CSV e il relativo indice
+        dataframe.to_csv(csv_path, index=False)
+        rebuild_key_index(csv_path, key_column)
+        logger.info(f"File creato: {csv_path}")
+        return True
+
+    try:
+        header = pd.read_csv(csv_path, nrows=0, encoding="utf-8-sig").columns.tolist()
+        key_set = load_key_index(csv_path, key_column)
+    except Exception as e:
+        logger.error(f"Errore durante la lettura di intestazione o indice di {csv_path}: {e}")
+        return False
+
+    if key_column not in header:
+        logger.error(f"La colonna '{key_column}' non esiste nel CSV esistente.")
+        return False
+
+    new_keys = dataframe[key_column].astype(str)
+    new_data = dataframe[~new_keys.isin(key_set)]
+
+    if new_data.empty:
+        logger.info("Nessun nuovo record da aggiungere.")
+        return True
+
+    unknown_columns = [col for col in new_data.columns if col not in header]
+    if unknown_columns:
+        logger.warning(
+            f"Colonne non presenti nello storico ignorate in append: {unknown_columns}"
+        )
+
+    try:
+        # Garantisce che il file termini con un a capo prima di aggiungere righe
+        needs_newline = False
+        with open(csv_path, "rb") as f:
+            f.seek(0, os.SEEK_END)
+            if f.tell() > 0:
+                f.seek(-1, os.SEEK_END)
+                needs_newline = f.read(1) != b"\n"
+        with open(csv_path, "a", newline="") as f:
+            if needs_newline:
+                f.write("\n")
+            new_data.reindex(columns=header).to_csv(f, index=False, header=False)
+
+        appended_keys = new_data[key_column].astype(str).tolist()
+        with open(get_key_index_path(csv_path), "a") as f:
+            for key in appended_keys:
+                f.write(key + "\n")
+        key_set.update(appended_keys)
+        cache_key_index(csv_path, key_set)
+    except Exception as e:
+        logger.error(f"Errore durante l'append al file CSV {csv_path}: {e}")
+        return False
+
+    logger.info(f"Aggiunti {len(new_data)} record nuovi in coda a {csv_path}.")
+    return True
+
+
+def compact_history(csv_path, key_column):
+    """
+    Riscrive un CSV di storico eliminando i record con chiave duplicata (mantiene il primo)
+    e ricostruisce l'indice delle chiavi. È l'unica operazione che rilegge tutto il file.
+
+    Parameters:
+        csv_path (str): Percorso del CSV di storico.
+        key_column (str): Nome della colonna chiave.
+
+    Returns:
+        bool: True se la compattazione è andata a buon fine.
+    """
+    if not os.path.exists(csv_path):
+        logger.warning(f"Nessuno storico da compattare: {csv_path}")
+        return False
+
+    logger.info(f"Compattazione dello storico {csv_path}.")
+    try:
+        existing_data = pd.read_csv(csv_path, dtype={key_column: str}, encoding="utf-8-sig")
+        compacted_data = existing_data.drop_duplicates(subset=key_column, keep="first")
+        compacted_data.to_csv(csv_path, index=False)
+        rebuild_key_index(csv_path, key_column)
+    except Exception as e:
+        logger.error(f"Errore durante la compattazione di {csv_path}: {e}")
+        return False
+
+    logger.info(
+        f"Storico {csv_path} compattato: {len(existing_data) - len(compacted_data)} "
+        f"record duplicati rimossi, {len(compacted_data)} record rimanenti."
+    )
+    return True
+
+
+def replace_in_csv(dataframe, csv_path, key_column):
+    """
+    Scrive un DataFrame in un CSV di storico sostituendo i record con la stessa chiave:
+    a differenza di upsert_to_csv/append_to_csv, i record già presenti vengono sovrascritti.
+    Usata per ricostruire uno storico dalle estrazioni salvate dopo una modifica delle trasformazioni.
+
+    Parameters:
+        dataframe (pd.DataFrame): Record da scrivere.
+        csv_path (str): Percorso del CSV di storico.
+        key_column (str): Nome della colonna chiave.
+
+    Returns:
+        bool: True se la scrittura è andata a buon fine.
+    """
+    logger.info(f"Sostituzione dei record nel file {csv_path} con chiave '{key_column}'.")
+
+    if key_column not in dataframe.columns:
+        logger.error(f"La colonna '{key_column}' non esiste nel DataFrame da scrivere.")
+        return False
+
+    dataframe = dataframe.drop_duplicates(subset=key_column, keep="first")
+
+    try:
+        if os.path.exists(csv_path):
+            existing_data = pd.read_csv(csv_path, dtype={key_column: str}, encoding="utf-8-sig")
+            kept_data = existing_data[
+                ~existing_data[key_column].isin(dataframe[key_column].astype(str))
+            ]
+            replaced = len(existing_data) - len(kept_data)
+            updated_data = pd.concat([kept_data, dataframe], ignore_index=True)
+        else:
+            replaced = 0
+            updated_data = dataframe
+        updated_data.to_csv(csv_path, index=False)
+        rebuild_key_index(csv_path, key_column)
+    except Exception as e:
+        logger.error(f"Errore durante la sostituzione dei record in {csv_path}: {e}")
+        return False
+
+    logger.info(
+        f"Storico {csv_path} aggiornato: {replaced} record sostituiti, "
+        f"{len(dataframe) - replaced} record nuovi."
+    )
+    return True
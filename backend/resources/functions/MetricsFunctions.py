@@ -0,0 +1,233 @@
+import json
+import logging
+import math
+import os
+import time
+from contextlib import contextmanager
+from datetime import datetime
+
+# Configurazione del logger
+logging.basicConfig(
+    level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s"
+)
+logger = logging.getLogger()
+
+# Prefisso delle metriche esportate in formato Prometheus
+metrics_prefix = "pdfextract"
+
+# Quantili riportati nel riepilogo e nell'export Prometheus
+reported_quantiles = (0.5, 0.95)
+
+
+def create_run_metrics():
+    """
+    Crea il contenitore delle metriche di un'esecuzione.
+
+    Returns:
+        dict: Metriche con durate per fase, righe e byte per dominio e file elaborati.
+    """
+    return {
+        "started_at": time.time(),
+        "started": time.perf_counter(),
+        "durations": {},
+        "rows": {},
+        "bytes": {},
+        "files": 0,
+        "llm_cache": {"hits": 0, "misses": 0},
+        "prompt_chars_saved": 0,
+        "missing_values": 0,
+    }
+
+
+@contextmanager
+def measure_stage(timings, stage):
+    """
+    Misura la durata di un blocco e la aggiunge a timings[stage].
+    timings può essere il dizionario 'timings' di un job (che attraversa i processi
+    insieme al job) oppure le durate dell'esecuzione.
+    """
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        timings.setdefault(stage, []).append(time.perf_counter() - started)
+
+
+def record_job_metrics(run_metrics, job):
+    """
+    Aggiunge alle metriche dell'esecuzione le durate, le righe e i byte di un job completato.
+
+    Parameters:
+        run_metrics (dict): Metriche dell'esecuzione (vedi create_run_metrics).
+        job (dict): Job restituito da process_file, con 'timings', 'bytes_read' e 'df'.
+    """
+    for stage, durations in job.get("timings", {}).items():
+        run_metrics["durations"].setdefault(stage, []).extend(durations)
+    domain = job["domain"]
+    run_metrics["rows"][domain] = run_metrics["rows"].get(domain, 0) + len(job["df"])
+    run_metrics["bytes"][domain] = (
+        run_metrics["bytes"].get(domain, 0) + job.get("bytes_read", 0)
+    )
+    run_metrics["files"] += 1
+    if "llm_cache_hit" in job:
+        run_metrics["llm_cache"]["hits" if job["llm_cache_hit"] else "misses"] += 1
+    run_metrics["prompt_chars_saved"] += job.get("prompt_chars_saved", 0)
+    run_metrics["missing_values"] += job.get("missing_values", 0)
+
+
+def compute_quantile(values, quantile):
+    """
+    Quantile con il metodo nearest-rank su una lista di valori.
+    """
+    ordered = sorted(values)
+    rank = max(1, math.ceil(quantile * len(ordered)))
+    return ordered[rank - 1]
+
+
+def summarize_run_metrics(run_metrics):
+    """
+    Costruisce il riepilogo dell'esecuzione: per ogni fase numero di misure, totale, p50, p95 e massimo,
+    oltre a righe, byte e righe al secondo.
+
+    Parameters:
+        run_metrics (dict): Metriche dell'esecuzione.
+
+    Returns:
+        dict: Riepilogo serializzabile in JSON.
+    """
+    wall_seconds = time.perf_counter() - run_metrics["started"]
+    stages = {}
+    for stage, durations in run_metrics["durations"].items():
+        if not durations:
+            continue
+        stages[stage] = {
+            "count": len(durations),
+            "total_seconds": round(sum(durations), 6),
+            "max_seconds": round(max(durations), 6),
+        }
+        for quantile in reported_quantiles:
+            stages[stage][f"p{int(quantile * 100)}_seconds"] = round(
+                compute_quantile(durations, quantile), 6
+            )
+
+    total_rows = sum(run_metrics["rows"].values())
+    return {
+        "started_at": datetime.fromtimestamp(run_metrics["started_at"]).isoformat(
+            timespec="seconds"
+        ),
+        "wall_seconds": round(wall_seconds, 6),
+        "files": run_metrics["files"],
+        "rows": run_metrics["rows"],
+        "bytes": run_metrics["bytes"],
+        "total_rows": total_rows,
+        "total_bytes": sum(run_metrics["bytes"].values()),
+        "rows_per_second": round(total_rows / wall_seconds, 3) if wall_seconds else 0.0,
+        "llm_cache": run_metrics["llm_cache"],
+        "prompt_chars_saved": run_metrics["prompt_chars_saved"],
+        "missing_values": run_metrics["missing_values"],
+        "stages": stages,
+    }
+
+
+def format_prometheus_metrics(summary):
+    """
+    Converte il riepilogo di un'esecuzione nel formato testuale di Prometheus
+    (adatto al textfile collector di node_exporter).
+    """
+    name = metrics_prefix
+    lines = [
+        f"# HELP {name}_stage_duration_seconds Durata per file (o per dominio) delle fasi nell'ultima esecuzione.",
+        f"# TYPE {name}_stage_duration_seconds summary",
+    ]
+    for stage, stats in summary["stages"].items():
+        for quantile in reported_quantiles:
+            value = stats[f"p{int(quantile * 100)}_seconds"]
+            lines.append(
+                f'{name}_stage_duration_seconds{{stage="{stage}",quantile="{quantile}"}} {value}'
+            )
+        lines.append(f'{name}_stage_duration_seconds_sum{{stage="{stage}"}} {stats["total_seconds"]}')
+        lines.append(f'{name}_stage_duration_seconds_count{{stage="{stage}"}} {stats["count"]}')
+
+    lines += [
+        f"# HELP {name}_rows Righe trasformate nell'ultima esecuzione.",
+        f"# TYPE {name}_rows gauge",
+    ]
+    lines += [f'{name}_rows{{domain="{domain}"}} {rows}' for domain, rows in summary["rows"].items()]
+    lines += [
+        f"# HELP {name}_bytes_read Byte dei file di input letti nell'ultima esecuzione.",
+        f"# TYPE {name}_bytes_read gauge",
+    ]
+    lines += [
+        f'{name}_bytes_read{{domain="{domain}"}} {size}' for domain, size in summary["bytes"].items()
+    ]
+    lines += [
+        f"# HELP {name}_files Numero di file elaborati nell'ultima esecuzione.",
+        f"# TYPE {name}_files gauge",
+        f"{name}_files {summary['files']}",
+        f"# HELP {name}_llm_cache_lookups Consultazioni della cache delle risposte LLM nell'ultima esecuzione.",
+        f"# TYPE {name}_llm_cache_lookups gauge",
+        f'{name}_llm_cache_lookups{{result="hit"}} {summary["llm_cache"]["hits"]}',
+        f'{name}_llm_cache_lookups{{result="miss"}} {summary["llm_cache"]["misses"]}',
+        f"# HELP {name}_prompt_chars_saved Caratteri rimossi dai prompt dalla compattazione del testo nell'ultima esecuzione.",
+        f"# TYPE {name}_prompt_chars_saved gauge",
+        f"{name}_prompt_chars_saved {summary['prompt_chars_saved']}",
+        f"# HELP {name}_missing_values Campi obbligatori mancanti nelle righe trasformate nell'ultima esecuzione.",
+        f"# TYPE {name}_missing_values gauge",
+        f"{name}_missing_values {summary['missing_values']}",
+        f"# HELP {name}_rows_per_second Righe trasformate al secondo nell'ultima esecuzione.",
+        f"# TYPE {name}_rows_per_second gauge",
+        f"{name}_rows_per_second {summary['rows_per_second']}",
+        f"# HELP {name}_run_duration_seconds Durata complessiva dell'ultima esecuzione.",
+        f"# TYPE {name}_run_duration_seconds gauge",
+        f"{name}_run_duration_seconds {summary['wall_seconds']}",
+        f"# HELP {name}_last_run_timestamp_seconds Istante di fine dell'ultima esecuzione.",
+        f"# TYPE {name}_last_run_timestamp_seconds gauge",
+        f"{name}_last_run_timestamp_seconds {int(time.time())}",
+    ]
+    return "\n".join(lines) + "\n"
+
+
+def write_run_metrics(run_metrics, metrics_folder):
+    """
+    Scrive le metriche di un'esecuzione: il riepilogo viene aggiunto allo storico
+    delle esecuzioni (una riga JSON per esecuzione) e l'export Prometheus viene sovrascritto.
+
+    Parameters:
+        run_metrics (dict): Metriche dell'esecuzione.
+        metrics_folder (str): Cartella di destinazione.
+
+    Returns:
+        dict: Riepilogo dell'esecuzione.
+    """
+    summary = summarize_run_metrics(run_metrics)
+    try:
+        os.makedirs(metrics_folder, exist_ok=True)
+        with open(os.path.join(metrics_folder, "run_history.jsonl"), "a", encoding="utf-8") as f:
+            f.write(json.dumps(summary) + "\n")
+
+        # Scrittura atomica: il collector non deve mai leggere un file a metà
+        prometheus_path = os.path.join(metrics_folder, f"{metrics_prefix}.prom")
+        with open(prometheus_path + ".tmp", "w", encoding="utf-8") as f:
+            f.write(format_prometheus_metrics(summary))
+        os.replace(prometheus_path + ".tmp", prometheus_path)
+    except OSError as e:
+        logger.error(f"Errore durante la scrittura delle metriche in {metrics_folder}: {e}")
+
+    log_run_summary(summary)
+    return summary
+
+
+def log_run_summary(summary):
+    logger.info(
+        f"Metriche: {summary['files']} file, {summary['total_rows']} righe, "
+        f"{summary['total_bytes']} byte in {summary['wall_seconds']:.2f}s "
+        f"({summary['rows_per_second']:.1f} righe/s), cache delle risposte LLM: "
+        f"{summary['llm_cache']['hits']} hit, {summary['llm_cache']['misses']} miss, "
+        f"{summary['prompt_chars_saved']} caratteri risparmiati nei prompt, "
+        f"{summary['missing_values']} campi obbligatori mancanti."
+    )
+    for stage, stats in summary["stages"].items():
+        logger.info(
+            f"Fase '{stage}': {stats['count']} misure, p50 {stats['p50_seconds']:.3f}s, "
+            f"p95 {stats['p95_seconds']:.3f}s, totale {stats['total_seconds']:.2f}s."
+        )
@@ -0,0 +1,80 @@
+import logging
+import re
+
+# Configurazione del logger
+logging.basicConfig(
+    level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s"
+)
+logger = logging.getLogger()
+
+# Valori numerici (importi, date, quantità) e parole di una pagina, per la densità dei dati
+number_pattern = re.compile(r"\d+(?:[.,/]\d+)*")
+word_pattern = re.compile(r"\w+")
+
+# Punteggio minimo di una pagina, in proporzione alla pagina migliore, per essere selezionata
+min_relative_page_score = 0.3
+
+
+def score_page(page_text, keywords):
+    """
+    Punteggio di rilevanza di una pagina: numero di parole chiave del dominio presenti,
+    pesato per la densità di valori numerici. Le pagine di tabelle e riepiloghi hanno molti
+    numeri, quelle di condizioni e note legali soprattutto testo.
+
+    Parameters:
+        page_text (str): Testo della pagina.
+        keywords (list[str]): Parole chiave del dominio (confronto senza maiuscole).
+
+    Returns:
+        float: Punteggio della pagina, 0 se non contiene nessuna parola chiave.
+    """
+    lowered = page_text.lower()
+    keyword_hits = sum(1 for keyword in keywords if keyword.lower() in lowered)
+    if not keyword_hits:
+        return 0.0
+    words = word_pattern.findall(page_text)
+    numbers = number_pattern.findall(page_text)
+    density = len(numbers) / len(words) if words else 0.0
+    return keyword_hits * (0.5 + density)
+
+
+def select_relevant_pages(pages, keywords, max_chars):
+    """
+    Sceglie le pagine da inviare all'LLM: le pagine con punteggio almeno pari a
+    min_relative_page_score volte quello della migliore, in ordine di punteggio finché
+    entrano nel limite di caratteri. Se nessuna pagina contiene le parole chiave,
+    le pagine vengono prese in ordine come in extract_pdf_data.
+
+    Parameters:
+        pages (list[str]): Testo di ogni pagina.
+        keywords (list[str]): Parole chiave del dominio.
+        max_chars (int): Numero massimo di caratteri del testo selezionato.
+
+    Returns:
+        list: Indici delle pagine selezionate, in ordine di documento.
+    """
+    scores = [score_page(page, keywords) for page in pages]
+    best_score = max(scores, default=0.0)
+    if best_score:
+        candidates = sorted(
+            (i for i, score in enumerate(scores) if score >= min_relative_page_score * best_score),
+            key=lambda i: scores[i],
+            reverse=True,
+        )
+    else:
+        candidates = range(len(pages))
+
+    selected, used_chars = [], 0
+    for i in candidates:
+        # La prima pagina viene sempre presa (eventualmente troncata), le altre solo se entrano
+        if selected and used_chars + len(pages[i]) > max_chars:
+            continue
+        selected.append(i)
+        used_chars += len(pages[i])
+
+    logger.info(
+        f"Selezionate {len(selected)} pagine su {len(pages)} "
+        f"({sorted(i + 1 for i in selected)}), {used_chars} caratteri su {sum(map(len, pages))}."
+    )
+    return sorted(selected)
+
@@ -2,6 +2,13 @@ import logging
 
 import pdfplumber
 
+from resources.constants.common.Constants import (
+    pdf_text_cache_folder_path,
+    pdf_text_cache_max_bytes,
+)
+from resources.functions.CacheFunctions import build_cache_key, cache_get, cache_set
+from resources.functions.Functions import compute_file_hash
+
 # Configurazione del logger
 logging.basicConfig(
     level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s"
@@ -9,58 +16,137 @@ logging.basicConfig(
 logger = logging.getLogger()
 
 
+def read_pdf_text(pdf_path, pages_to_extract=None, include_last_two=False, max_chars=8000):
+    """
+    Legge il testo dal PDF con pdfplumber secondo i parametri di extract_pdf_data.
+    Solleva un'eccezione in caso di errore.
+    """
+    with pdfplumber.open(pdf_path) as pdf:
+        num_pages = len(pdf.pages)
+        logger.info(f"Il PDF contiene {num_pages} pagina/e.")
+
+        # Se pages_to_extract è None, estrai da tutte le pagine
+        if pages_to_extract is None:
+            pages_to_extract = list(range(num_pages))
+
+        # Verifica che le pagine specificate esistano
+        valid_pages = [i for i in pages_to_extract if i < num_pages]
+
+        # Aggiungi la penultima e l'ultima pagina se richiesto
+        if include_last_two and num_pages > 1:
+            last_two_pages = {num_pages - 2, num_pages - 1}
+            valid_pages = list(set(valid_pages).union(last_two_pages))
+
+        valid_pages.sort()  # Ordina gli indici per sicurezza
+        if not valid_pages:
+            logger.warning("Nessuna delle pagine specificate esiste nel PDF.")
+            return ""
+
+        # Estrai il testo dalle pagine valide e limita i caratteri
+        full_text = ""
+        for i in valid_pages:
+            if len(full_text) >= max_chars:
+                break
+            page_text = (
+                pdf.pages[i].extract_text() or ""
+            )  # Evita None in caso di errori nella pagina
+            full_text += page_text[: max_chars - len(full_text)]
+
+    return full_text
+
+
+def cache_pdf_text(cache_key, value):
+    """
+    Salva nella cache il testo estratto da un PDF. Un errore di scrittura viene solo registrato:
+    il testo è già stato estratto e deve comunque essere restituito.
+    """
+    try:
+        cache_set(pdf_text_cache_folder_path, cache_key, value, pdf_text_cache_max_bytes)
+    except Exception as e:
+        logger.warning(f"Impossibile salvare il testo del PDF nella cache: {e}")
+
+
 def extract_pdf_data(
-    pdf_path, pages_to_extract=None, include_last_two=False, max_chars=8000
+    pdf_path, pages_to_extract=None, include_last_two=False, max_chars=8000, use_cache=True
 ):
     """
     Estrae il testo da un file PDF specificato, con la possibilità di limitare l'estrazione
     a pagine specifiche, includere la penultima e l'ultima pagina e impostare un limite massimo di caratteri.
 
+    Il testo estratto viene salvato in una cache su disco (compressa, con eliminazione LRU)
+    indicizzata per hash del contenuto e parametri di estrazione: riesecuzioni e tentativi
+    successivi sullo stesso file non riaprono il PDF.
+
     Parametri:
     pdf_path (str): Il percorso del file PDF da cui estrarre il testo.
     pages_to_extract (list[int], opzionale): Lista di indici delle pagine da estrarre (0-based).
                                              Se None, estrae tutte le pagine.
     include_last_two (bool, opzionale): Se True, include sempre la penultima e l'ultima pagina.
     max_chars (int, opzionale): Numero massimo di caratteri da estrarre. Default è 8000.
+    use_cache (bool, opzionale): Se False ignora la cache del testo estratto.
 
     Ritorna:
     str: Il testo estratto dalle pagine specificate o da tutto il PDF. In caso di errore, restituisce una stringa vuota.
     """
     logger.info(f"Inizio estrazione dati dal PDF: {pdf_path}")
     try:
-        with pdfplumber.open(pdf_path) as pdf:
-            num_pages = len(pdf.pages)
-            logger.info(f"Il PDF contiene {num_pages} pagina/e.")
-
-            # Se pages_to_extract è None, estrai da tutte le pagine
-            if pages_to_extract is None:
-                pages_to_extract = list(range(num_pages))
-
-            # Verifica che le pagine specificate esistano
-            valid_pages = [i for i in pages_to_extract if i < num_pages]
-
-            # Aggiungi la penultima e l'ultima pagina se richiesto
-            if include_last_two and num_pages > 1:
-                last_two_pages = {num_pages - 2, num_pages - 1}
-                valid_pages = list(set(valid_pages).union(last_two_pages))
-
-            valid_pages.sort()  # Ordina gli indici per sicurezza
-            if not valid_pages:
-                logger.warning("Nessuna delle pagine specificate esiste nel PDF.")
-                return ""
-
-            # Estrai il testo dalle pagine valide e limita i caratteri
-            full_text = ""
-            for i in valid_pages:
-                if len(full_text) >= max_chars:
-                    break
-                page_text = (
-                    pdf.pages[i].extract_text() or ""
-                )  # Evita None in caso di errori nella pagina
-                full_text += page_text[: max_chars - len(full_text)]
+        cache_key = None
+        if use_cache:
+            cache_key = build_cache_key(
+                compute_file_hash(pdf_path), pages_to_extract, include_last_two, max_chars
+            )
+            cached_text = cache_get(pdf_text_cache_folder_path, cache_key)
+            if cached_text is not None:
+                logger.info(
+                    f"Testo del PDF letto dalla cache, {len(cached_text)} caratteri."
+                )
+                return cached_text
+
+        full_text = read_pdf_text(pdf_path, pages_to_extract, include_last_two, max_chars)
+
+        if cache_key is not None:
+            cache_pdf_text(cache_key, full_text)
 
         logger.info(f"Estrazione completata, {len(full_text)} caratteri estratti.")
         return full_text
     except Exception as e:
         logger.error(f"Errore durante l'estrazione del PDF: {e}")
         return ""  # Restituisce una stringa vuota in caso di errore
+
+
+def extract_pdf_pages(pdf_path, use_cache=True):
+    """
+    Estrae il testo completo di un PDF pagina per pagina, senza limite di caratteri
+    (usata dall'estrazione a blocchi dei documenti lunghi). Usa la stessa cache di extract_pdf_data.
+
+    Parametri:
+    pdf_path (str): Il percorso del file PDF.
+    use_cache (bool, opzionale): Se False ignora la cache del testo estratto.
+
+    Ritorna:
+    list[str]: Il testo di ogni pagina. In caso di errore, restituisce una lista vuota.
+    """
+    logger.info(f"Inizio estrazione delle pagine dal PDF: {pdf_path}")
+    try:
+        cache_key = None
+        if use_cache:
+            cache_key = build_cache_key(compute_file_hash(pdf_path), "pages")
+            cached_pages = cache_get(pdf_text_cache_folder_path, cache_key)
+            if cached_pages is not None:
+                logger.info(f"Pagine del PDF lette dalla cache, {len(cached_pages)} pagine.")
+                return cached_pages
+
+        with pdfplumber.open(pdf_path) as pdf:
+            # Evita None in caso di errori nella pagina
+            pages = [page.extract_text() or "" for page in pdf.pages]
+
+        if cache_key is not None:
+            cache_pdf_text(cache_key, pages)
+
+        logger.info(
+            f"Estrazione completata, {len(pages)} pagine e {sum(map(len, pages))} caratteri estratti."
+        )
+        return pages
+    except Exception as e:
+        logger.error(f"Errore durante l'estrazione delle pagine del PDF: {e}")
+        return []
@@ -0,0 +1,961 @@
+import json
+import logging
+import os
+import re
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pandas as pd
+
+from resources.constants.bank_transactions.BankConstants import (
+    bank_key_field,
+    bank_df_columns_to_select,
+    bank_copilot_info_to_extract,
+    bank_relevant_page_keywords,
+    bank_boilerplate_patterns,
+    bank_copilot_movements_to_extract,
+    bank_checkpoint_file_path,
+    bank_history_file_path,
+)
+from resources.constants.berebel.BerebelConstants import (
+    berebel_key_field,
+    berebel_df_columns_to_select,
+    berebel_copilot_info_to_extract,
+    berebel_relevant_page_keywords,
+    berebel_boilerplate_patterns,
+    berebel_df_mandatory_fields,
+    berebel_field_labels,
+    berebel_checkpoint_file_path,
+    berebel_history_file_path,
+)
+from resources.constants.light_bills.LightBillsConstants import (
+    light_key_field,
+    light_df_columns_to_select,
+    light_copilot_info_to_extract,
+    light_relevant_page_keywords,
+    light_boilerplate_patterns,
+    light_df_mandatory_fields,
+    light_field_labels,
+    light_checkpoint_file_path,
+    light_history_file_path,
+)
+from resources.constants.salary.RelatechConstants import (
+    relatech_df_columns_to_select,
+    relatech_key_field,
+    relatech_copilot_info_to_extract,
+    relatech_relevant_page_keywords,
+    relatech_boilerplate_patterns,
+    relatech_df_mandatory_fields,
+    relatech_field_labels,
+    relatech_checkpoint_file_path,
+    relatech_history_file_path,
+)
+from resources.constants.common.Constants import (
+    common_boilerplate_patterns,
+    extraction_store_folder_path,
+    prompt_text_max_chars,
+)
+from resources.functions.ChunkFunctions import split_pages_into_chunks
+from resources.functions.CheckpointFunctions import (
+    mark_files_processed,
+    save_checkpoint_store,
+)
+from resources.functions.CopilotFunctions import (
+    configure_copilot_pool,
+    get_copilot_prompt_version,
+    is_complete_json,
+)
+from resources.functions.ExtractionBackendFunctions import (
+    run_extraction,
+    run_extraction_batch,
+)
+from resources.functions.ExtractionStoreFunctions import (
+    load_domain_extractions,
+    load_extraction,
+    save_extraction,
+)
+from resources.functions.Functions import (
+    compute_file_hash,
+    extract_date_from_filename,
+    upsert_to_csv,
+)
+from resources.functions.HistoryFunctions import (
+    append_to_csv,
+    compact_history,
+    replace_in_csv,
+)
+from resources.functions.MetricsFunctions import measure_stage, record_job_metrics
+from resources.functions.PageSelectionFunctions import select_relevant_pages
+from resources.functions.PdfFunctions import extract_pdf_data, extract_pdf_pages
+from resources.functions.ResponseCacheFunctions import cache_response, get_cached_response
+from resources.functions.SnippetFunctions import build_field_snippets
+from resources.functions.TemplateExtractionFunctions import find_unreliable_fields
+from resources.functions.TextCompactionFunctions import compact_pages
+from transformations.bank_transactions import IngPdfParser, IngTransform
+from transformations.berebel import BerebelPdfParser, BerebelTransform
+from transformations.light_bills import EnelPdfParser, EnelTransform
+from transformations.salary import RelatechPdfParser, RelatechTransform
+
+# Configurazione del logger
+logging.basicConfig(
+    level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s"
+)
+logger = logging.getLogger()
+
+# Configurazione per dominio: l'ordine delle chiavi è quello usato per riconoscere la cartella
+domain_configs = {
+    "bank_transactions": {
+        "checkpoint_file": bank_checkpoint_file_path,
+        "output_path": bank_history_file_path,
+        "key_field": bank_key_field,
+        "columns_to_select": bank_df_columns_to_select,
+        "copilot_info_to_extract": bank_copilot_info_to_extract,
+        "page_keywords": bank_relevant_page_keywords,
+        "boilerplate_patterns": common_boilerplate_patterns + bank_boilerplate_patterns,
+        # Campi richiesti per ogni blocco nell'estrazione a blocchi dei documenti lunghi
+        "chunk_info_to_extract": bank_copilot_movements_to_extract,
+        # Lettura diretta dei PDF con layout noto, senza LLM (None se il layout non è riconosciuto)
+        "native_parser": IngPdfParser.parse_statement_pdf,
+    },
+    "berebel": {
+        "checkpoint_file": berebel_checkpoint_file_path,
+        "output_path": berebel_history_file_path,
+        "key_field": berebel_key_field,
+        "columns_to_select": berebel_df_columns_to_select,
+        "copilot_info_to_extract": berebel_copilot_info_to_extract,
+        "page_keywords": berebel_relevant_page_keywords,
+        "boilerplate_patterns": common_boilerplate_patterns + berebel_boilerplate_patterns,
+        "native_parser": BerebelPdfParser.parse_statement_pdf,
+        # Campi del parser diretto da completare con l'LLM e loro etichette nel testo (estrazione ibrida)
+        "mandatory_fields": berebel_df_mandatory_fields,
+        "field_labels": berebel_field_labels,
+    },
+    "light_bills": {
+        "checkpoint_file": light_checkpoint_file_path,
+        "output_path": light_history_file_path,
+        "key_field": light_key_field,
+        "columns_to_select": light_df_columns_to_select,
+        "copilot_info_to_extract": light_copilot_info_to_extract,
+        "page_keywords": light_relevant_page_keywords,
+        "boilerplate_patterns": common_boilerplate_patterns + light_boilerplate_patterns,
+        "native_parser": EnelPdfParser.parse_bill_pdf,
+        # Campi del parser diretto da completare con l'LLM e loro etichette nel testo (estrazione ibrida)
+        "mandatory_fields": light_df_mandatory_fields,
+        "field_labels": light_field_labels,
+    },
+    "salary": {
+        "checkpoint_file": relatech_checkpoint_file_path,
+        "output_path": relatech_history_file_path,
+        "key_field": relatech_key_field,
+        "columns_to_select": relatech_df_columns_to_select,
+        "copilot_info_to_extract": relatech_copilot_info_to_extract,
+        "page_keywords": relatech_relevant_page_keywords,
+        "boilerplate_patterns": common_boilerplate_patterns + relatech_boilerplate_patterns,
+        "native_parser": RelatechPdfParser.parse_payslip_pdf,
+        # Campi del parser diretto da completare con l'LLM e loro etichette nel testo (estrazione ibrida)
+        "mandatory_fields": relatech_df_mandatory_fields,
+        "field_labels": relatech_field_labels,
+    },
+}
+
+
+# Estrazione a blocchi dei PDF lunghi, per i domini con 'chunk_info_to_extract'
+chunked_extraction_settings = {"enabled": False, "max_chars": 6000, "workers": 4}
+
+
+def configure_chunked_extraction(enabled=None, max_chars=None, workers=None):
+    """
+    Imposta l'estrazione a blocchi del processo corrente. I parametri non indicati restano invariati.
+
+    Parameters:
+        enabled (bool): Se True i PDF dei domini che la supportano vengono estratti a blocchi.
+        max_chars (int): Lunghezza massima del testo di un blocco.
+        workers (int): Blocchi dello stesso documento inviati in parallelo.
+    """
+    for name, value in (("enabled", enabled), ("max_chars", max_chars), ("workers", workers)):
+        if value is not None:
+            chunked_extraction_settings[name] = value
+
+
+# Selezione delle pagine rilevanti dei PDF prima dell'estrazione con l'LLM
+page_selection_settings = {"enabled": True}
+
+
+def configure_page_selection(enabled):
+    """
+    Attiva o disattiva la selezione delle pagine rilevanti nel processo corrente.
+    Se disattivata, il testo dei PDF viene preso in ordine di pagina fino al limite di caratteri.
+    """
+    page_selection_settings["enabled"] = enabled
+
+
+# Compattazione del testo dei PDF (intestazioni ripetute e testo ricorrente) prima dell'estrazione con l'LLM
+text_compaction_settings = {"enabled": True}
+
+
+def configure_text_compaction(enabled):
+    """
+    Attiva o disattiva la compattazione del testo dei PDF nel processo corrente.
+    """
+    text_compaction_settings["enabled"] = enabled
+
+
+# Lettura diretta dei PDF con i parser dei domini, prima di ricorrere all'LLM
+native_parser_settings = {"enabled": True}
+
+
+def configure_native_parsers(enabled):
+    """
+    Attiva o disattiva nel processo corrente i parser diretti dei PDF ('native_parser' dei domini).
+    Se disattivati, tutti i PDF vengono estratti con l'LLM.
+    """
+    native_parser_settings["enabled"] = enabled
+
+
+# Estrazione ibrida: i campi letti dal parser diretto vengono tenuti e all'LLM vengono chiesti
+# solo i campi obbligatori mancanti, con il testo attorno alle loro etichette
+hybrid_extraction_settings = {"enabled": True, "snippet_chars": 300}
+
+
+def configure_hybrid_extraction(enabled=None, snippet_chars=None):
+    """
+    Imposta l'estrazione ibrida del processo corrente. I parametri non indicati restano invariati.
+
+    Parameters:
+        enabled (bool): Se False i documenti letti solo in parte dal parser diretto vengono
+                        estratti interamente con l'LLM.
+        snippet_chars (int): Caratteri di testo inclusi prima e dopo ogni etichetta.
+    """
+    for name, value in (("enabled", enabled), ("snippet_chars", snippet_chars)):
+        if value is not None:
+            hybrid_extraction_settings[name] = value
+
+
+def get_domain_from_path(path):
+    """
+    Restituisce il dominio a cui appartiene un percorso della cartella input_data.
+
+    Parameters:
+        path (str): Percorso della cartella (o del file) da classificare.
+
+    Returns:
+        str: Nome del dominio (chiave di domain_configs) oppure None se la cartella non è gestita.
+    """
+    lowered_path = path.lower()
+    for domain in domain_configs:
+        if domain in lowered_path:
+            return domain
+    return None
+
+
+def transform_domain_df(domain, df, extracted_date):
+    """
+    Applica al DataFrame la trasformazione del dominio indicato.
+
+    Parameters:
+        domain (str): Nome del dominio.
+        df (pd.DataFrame): DataFrame grezzo letto dal CSV o costruito dalla risposta di Copilot.
+        extracted_date (str): Data estratta dal nome del file (usata solo dalle transazioni bancarie).
+
+    Returns:
+        pd.DataFrame: DataFrame trasformato con le colonne del dominio.
+    """
+    columns_to_select = domain_configs[domain]["columns_to_select"]
+    if domain == "bank_transactions":
+        return IngTransform.transform_df(df, columns_to_select, extracted_date)
+    elif domain == "berebel":
+        return BerebelTransform.transform_df(df, columns_to_select)
+    elif domain == "light_bills":
+        return EnelTransform.transform_df(df, columns_to_select)
+    elif domain == "salary":
+        return RelatechTransform.transform_df(df, columns_to_select)
+    raise ValueError(f"Dominio non gestito: {domain}")
+
+
+def create_job(file_path):
+    """
+    Prepara il job di elaborazione di un file: dominio di appartenenza e data dal nome del file.
+
+    Parameters:
+        file_path (str): Percorso del file CSV o PDF da elaborare.
+
+    Returns:
+        dict: Job con 'file_path', 'filename', 'domain', 'extracted_date', la dimensione del file
+              in 'bytes_read' e le durate delle fasi in 'timings'.
+    """
+    filename = os.path.basename(file_path)
+    root = os.path.dirname(file_path)
+    logger.info(f"Inizio elaborazione del file: {filename}")
+
+    domain = get_domain_from_path(root)
+    if domain is None:
+        raise ValueError(f"Folder non gestita: {root.lower()}")
+    if not filename.endswith((".csv", ".pdf")):
+        raise ValueError(f"Tipo di file non gestito: {filename}")
+
+    return {
+        "file_path": file_path,
+        "filename": filename,
+        "domain": domain,
+        # Estrai la data dal nome del file
+        "extracted_date": extract_date_from_filename(filename),
+        "bytes_read": os.path.getsize(file_path),
+        "timings": {},
+    }
+
+
+def extract_stage(job):
+    """
+    Fase di estrazione: legge il CSV in 'df' oppure estrae il testo del PDF in 'text'.
+    Se per il PDF esiste già una risposta di Copilot ottenuta con lo stesso prompt,
+    la mette in 'response' e salta l'estrazione del testo.
+    """
+    with measure_stage(job["timings"], "extract"):
+        return read_job_input(job)
+
+
+def read_job_input(job):
+    """
+    Legge l'input del job: DataFrame dal CSV o dal parser diretto del PDF,
+    risposta salvata oppure testo del PDF.
+    """
+    if job["filename"].endswith(".csv"):
+        # Crea il DataFrame solo con i dati del file corrente
+        job["df"] = pd.read_csv(job["file_path"], delimiter=";", header=0)
+        return job
+
+    config = domain_configs[job["domain"]]
+    if native_parser_settings["enabled"] and "native_parser" in config:
+        if read_native_fields(job, config):
+            return job
+
+    job["chunked"] = (
+        chunked_extraction_settings["enabled"] and "chunk_info_to_extract" in config
+    )
+    job["document_hash"] = compute_file_hash(job["file_path"])
+    job["prompt_version"] = get_copilot_prompt_version(get_info_to_extract(job))
+    job["domain_version"] = get_domain_prompt_version(job["domain"])
+    stored_extraction = load_extraction(
+        extraction_store_folder_path,
+        job["domain"],
+        job["document_hash"],
+        job["prompt_version"],
+    )
+    if stored_extraction is not None and not is_complete_stored_extraction(job, stored_extraction):
+        # Estrazione ibrida salvata con i soli campi dell'LLM: il testo viene riletto e la risposta,
+        # presa dalla cache, salvata di nuovo insieme ai campi del parser diretto
+        stored_extraction = None
+    if stored_extraction is not None:
+        logger.info(f"Risposta di Copilot già salvata per {job['filename']}, riutilizzata.")
+        job["response"] = stored_extraction["response"]
+    elif job["chunked"]:
+        # Testo completo, senza il limite di caratteri di extract_pdf_data
+        pages = extract_pdf_pages(job["file_path"])
+        if text_compaction_settings["enabled"]:
+            pages = compact_job_pages(job, pages)
+        job["chunks"] = split_pages_into_chunks(pages, chunked_extraction_settings["max_chars"])
+    else:
+        text = None
+        if "missing_fields" in job:
+            text = build_field_snippets(
+                "\n".join(extract_pdf_pages(job["file_path"])),
+                config["field_labels"],
+                job["missing_fields"],
+                hybrid_extraction_settings["snippet_chars"],
+            )
+        if text is None:
+            text = read_prompt_text(job)
+        job["text"] = re.sub(r"\s+", " ", text).strip()
+    return job
+
+
+def read_native_fields(job, config):
+    """
+    Legge il PDF con il parser diretto del dominio. Se il parser restituisce la confidenza dei campi
+    (attrs['field_confidence']) e qualche campo obbligatorio manca o è incerto, con l'estrazione
+    ibrida i campi affidabili vengono tenuti in 'partial_fields' e quelli da chiedere all'LLM
+    messi in 'missing_fields'.
+
+    Returns:
+        bool: True se il documento è stato letto interamente e 'df' è pronto.
+    """
+    df = config["native_parser"](job["file_path"])
+    if df is None:
+        return False
+    confidences = df.attrs.get("field_confidence")
+    if confidences is None:
+        # Parser senza confidenza per campo (es. tabella dei movimenti ING): documento completo
+        missing_fields = []
+    else:
+        fields = df.to_dict("records")[0]
+        missing_fields = find_unreliable_fields(fields, confidences, config["mandatory_fields"])
+
+    if not missing_fields:
+        logger.info(f"{job['filename']} letto con il parser diretto, senza LLM.")
+        job["df"] = df
+        return True
+    if hybrid_extraction_settings["enabled"]:
+        logger.info(
+            f"{job['filename']}: {len(missing_fields)} campi da estrarre con l'LLM: {missing_fields}."
+        )
+        job["partial_fields"] = {
+            field: value for field, value in fields.items() if field not in missing_fields
+        }
+        job["missing_fields"] = missing_fields
+    return False
+
+
+def read_prompt_text(job):
+    """
+    Legge il testo del PDF da inviare all'LLM: le sole pagine rilevanti per i campi del dominio
+    (vedi select_relevant_pages), compattate (vedi compact_pages), entro prompt_text_max_chars caratteri.
+    """
+    if not page_selection_settings["enabled"] and not text_compaction_settings["enabled"]:
+        return extract_pdf_data(job["file_path"], max_chars=prompt_text_max_chars)
+
+    config = domain_configs[job["domain"]]
+    pages = extract_pdf_pages(job["file_path"])
+    if page_selection_settings["enabled"]:
+        # Le pagine vengono valutate già compattate, così che il limite di caratteri
+        # non sia consumato dalle intestazioni ripetute
+        candidates = (
+            compact_pages(pages, config["boilerplate_patterns"])
+            if text_compaction_settings["enabled"]
+            else pages
+        )
+        selected = select_relevant_pages(
+            candidates, config["page_keywords"], prompt_text_max_chars
+        )
+        pages = [pages[i] for i in selected]
+    if text_compaction_settings["enabled"]:
+        pages = compact_job_pages(job, pages)
+    return "\n".join(pages)[:prompt_text_max_chars]
+
+
+def compact_job_pages(job, pages):
+    """
+    Compatta il testo delle pagine di un job e registra in 'prompt_chars_saved' i caratteri risparmiati.
+    """
+    compacted_pages = compact_pages(
+        pages, domain_configs[job["domain"]]["boilerplate_patterns"]
+    )
+    original_chars = len("\n".join(pages))
+    job["prompt_chars_saved"] = original_chars - len("\n".join(compacted_pages))
+    logger.info(
+        f"Testo di {job['filename']} compattato: {job['prompt_chars_saved']} caratteri "
+        f"risparmiati su {original_chars}."
+    )
+    return compacted_pages
+
+
+def get_domain_prompt_version(domain):
+    """
+    Restituisce la versione del dominio: la versione del prompt con tutti i campi del dominio,
+    compresi quelli dei blocchi. Non dipende dai campi richiesti al singolo job, quindi è la stessa
+    per documenti interi, blocchi ed estrazione ibrida e cambia solo con la configurazione del dominio.
+    """
+    config = domain_configs[domain]
+    return get_copilot_prompt_version(
+        config["copilot_info_to_extract"] + config.get("chunk_info_to_extract", [])
+    )
+
+
+def get_info_to_extract(job):
+    """
+    Restituisce i campi da estrarre per il job: quelli dei blocchi nell'estrazione a blocchi,
+    i soli campi mancanti nell'estrazione ibrida, altrimenti quelli del dominio.
+    """
+    config = domain_configs[job["domain"]]
+    if job.get("chunked"):
+        return config["chunk_info_to_extract"]
+    if "missing_fields" in job:
+        return [
+            info
+            for info in config["copilot_info_to_extract"]
+            if any(re.search(rf"\b{field}\b", info) for field in job["missing_fields"])
+        ]
+    return config["copilot_info_to_extract"]
+
+
+def combine_partial_fields(job, data):
+    """
+    Unisce i campi letti dal parser diretto con quelli estratti dall'LLM (estrazione ibrida):
+    dalla risposta vengono presi solo i campi mancanti.
+    """
+    merged = dict(job["partial_fields"])
+    for field in job["missing_fields"]:
+        merged[field] = data.get(field)
+    return merged
+
+
+def merge_partial_fields(job, data):
+    """
+    Completa i campi letti dal parser diretto con quelli estratti dall'LLM (vedi combine_partial_fields).
+    """
+    merged = combine_partial_fields(job, data)
+    del job["partial_fields"]
+    logger.info(
+        f"{job['filename']}: {len(merged) - len(job['missing_fields'])} campi dal parser diretto, "
+        f"{len(job['missing_fields'])} dall'LLM."
+    )
+    return merged
+
+
+def build_response_df(domain, data):
+    """
+    Costruisce il DataFrame grezzo dalla risposta JSON di un documento: i movimenti di un'estrazione
+    a blocchi vengono convertiti nelle colonne dell'export CSV, gli altri documenti danno una riga.
+    """
+    if domain == "bank_transactions" and "movimenti" in data:
+        return IngTransform.build_df_from_copilot_movements(data["movimenti"])
+    return pd.DataFrame([data])
+
+
+def run_chunked_extraction(job):
+    """
+    Estrae i movimenti di un documento lungo inviando i suoi blocchi in parallelo
+    (ognuno passa dalla cache delle risposte) e li unisce in un'unica risposta.
+    Se un blocco fallisce fallisce l'intero documento: i blocchi già estratti restano in cache.
+
+    Returns:
+        str: Risposta JSON con tutti i movimenti, nella forma {"movimenti": [...]}.
+    """
+    chunks = job.pop("chunks")
+    info_to_extract = get_info_to_extract(job)
+
+    def extract_chunk(chunk):
+        response = get_cached_response(
+            job["domain"], job["domain_version"], job["prompt_version"], chunk
+        )
+        if response is None:
+            response = run_extraction(chunk, info_to_extract)
+            cache_response(
+                job["domain"], job["domain_version"], job["prompt_version"], chunk, response
+            )
+        movements = json.loads(response)["movimenti"]
+        if not isinstance(movements, list):
+            raise ValueError("il campo 'movimenti' della risposta non è una lista")
+        return movements
+
+    workers = max(1, min(chunked_extraction_settings["workers"], len(chunks)))
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        chunk_movements = list(executor.map(extract_chunk, chunks))
+
+    movements = [movement for movements in chunk_movements for movement in movements]
+    logger.info(
+        f"File {job['filename']}: {len(movements)} movimenti estratti da {len(chunks)} blocchi."
+    )
+    return json.dumps({"movimenti": movements}, ensure_ascii=False)
+
+
+def build_stored_response(job):
+    """
+    Restituisce la risposta da salvare nello store delle estrazioni. Nell'estrazione ibrida la
+    risposta dell'LLM contiene solo i campi mancanti: viene salvata unita ai campi del parser
+    diretto, così che replay_domain possa ricostruire il record completo senza rileggere il PDF.
+    """
+    if "partial_fields" not in job or not is_complete_json(job["response"]):
+        return job["response"]
+    data = json.loads(job["response"])
+    if not isinstance(data, dict):
+        return job["response"]
+    return json.dumps(combine_partial_fields(job, data), ensure_ascii=False)
+
+
+def is_complete_stored_extraction(job, stored_extraction):
+    """
+    Verifica che un'estrazione salvata contenga tutti i campi del job: per l'estrazione ibrida
+    anche quelli del parser diretto (le estrazioni salvate prima contengono solo i campi dell'LLM).
+    """
+    if "partial_fields" not in job:
+        return True
+    data = json.loads(stored_extraction["response"])
+    return isinstance(data, dict) and all(field in data for field in job["partial_fields"])
+
+
+def store_job_response(job):
+    """
+    Salva la risposta del job nello store delle estrazioni (vedi build_stored_response) e, se non
+    proviene già dalla cache, nella cache delle risposte; il testo del documento non serve più
+    e viene rimosso. Una risposta assente fa fallire il file senza salvare nulla.
+    """
+    if job.get("response") is None:
+        raise ValueError(f"nessuna risposta dal backend di estrazione per {job['filename']}")
+    save_extraction(
+        extraction_store_folder_path,
+        job["domain"],
+        job["document_hash"],
+        job["prompt_version"],
+        job["file_path"],
+        build_stored_response(job),
+    )
+    text = job.pop("text", None)
+    if text is not None and not job.get("llm_cache_hit"):
+        cache_response(
+            job["domain"], job["domain_version"], job["prompt_version"], text, job["response"]
+        )
+
+
+def resolve_cached_response(job):
+    """
+    Cerca nella cache delle risposte il testo del job (una sola volta per job).
+    In caso di successo la risposta viene messa in 'response' e il backend non viene interrogato.
+
+    Returns:
+        bool: True se la risposta è stata trovata in cache.
+    """
+    if "llm_cache_hit" not in job:
+        response = get_cached_response(
+            job["domain"], job["domain_version"], job["prompt_version"], job["text"]
+        )
+        job["llm_cache_hit"] = response is not None
+        if response is not None:
+            logger.info(f"Risposta per {job['filename']} trovata nella cache delle risposte.")
+            job["response"] = response
+            store_job_response(job)
+    return job["llm_cache_hit"]
+
+
+def llm_stage(job):
+    """
+    Fase LLM: per i PDF cerca la risposta nella cache, altrimenti invia il testo al backend
+    di estrazione; salva la risposta nello store delle estrazioni e costruisce 'df' dalla risposta JSON.
+    I CSV attraversano la fase senza modifiche.
+    """
+    if "chunks" in job:
+        with measure_stage(job["timings"], "copilot"):
+            job["response"] = run_chunked_extraction(job)
+        store_job_response(job)
+    elif "text" in job and not resolve_cached_response(job):
+        with measure_stage(job["timings"], "copilot"):
+            job["response"] = run_extraction(job["text"], get_info_to_extract(job))
+        # Salvata prima del parsing: un errore a valle non richiede una nuova interrogazione
+        store_job_response(job)
+    if "response" not in job:
+        return job
+    data = json.loads(job.pop("response"))
+    if "partial_fields" in job:
+        data = merge_partial_fields(job, data)
+    job["df"] = build_response_df(job["domain"], data)
+    return job
+
+
+def transform_stage(job):
+    """
+    Fase di trasformazione: applica a 'df' la trasformazione del dominio e conta in
+    'missing_values' i campi obbligatori mancanti trovati dalla validazione.
+    I movimenti di un'estrazione a blocchi vengono deduplicati sulla chiave del dominio,
+    perché lo stesso movimento può comparire in due blocchi.
+    """
+    with measure_stage(job["timings"], "transform"):
+        job["df"] = transform_domain_df(job["domain"], job["df"], job["extracted_date"])
+        job["missing_values"] = len(job["df"].attrs.get("validation_issues", []))
+        if job.get("chunked"):
+            key_field = domain_configs[job["domain"]]["key_field"]
+            job["df"] = job["df"].drop_duplicates(subset=key_field, keep="first")
+    return job
+
+
+def process_file(file_path):
+    """
+    Esegue il lavoro relativo a un singolo file (lettura, estrazione, trasformazione)
+    senza scrivere nulla su disco, così da poter essere eseguito in un processo separato.
+
+    Parameters:
+        file_path (str): Percorso del file CSV o PDF da elaborare.
+
+    Returns:
+        dict: Risultato con 'file_path', 'filename', 'domain' e il DataFrame trasformato in 'df'.
+    """
+    job = extract_stage(create_job(file_path))
+    job = llm_stage(job)
+    return transform_stage(job)
+
+
+def prepare_job(file_path):
+    """
+    Crea il job di un file ed esegue la fase di estrazione (usata dall'elaborazione multi-documento).
+    """
+    return extract_stage(create_job(file_path))
+
+
+def group_jobs_for_batching(jobs, max_chars):
+    """
+    Raggruppa i job per la query multi-documento: i PDF dello stesso dominio vengono accumulati
+    finché la somma dei loro testi resta entro max_chars; i CSV, i job con una risposta
+    già salvata e quelli dell'estrazione ibrida (con i soli campi mancanti) restano in gruppi da uno.
+
+    Parameters:
+        jobs (list[dict]): Job dopo la fase di estrazione.
+        max_chars (int): Budget di caratteri di testo per query.
+
+    Returns:
+        list: Gruppi di job, nell'ordine di arrivo.
+    """
+    groups = []
+    open_groups = {}  # dominio -> (gruppo aperto, caratteri già usati)
+    for job in jobs:
+        if "text" not in job or "missing_fields" in job:
+            groups.append([job])
+            continue
+        text_chars = len(job["text"])
+        group, used_chars = open_groups.get(job["domain"], (None, 0))
+        if group is not None and used_chars + text_chars <= max_chars:
+            group.append(job)
+            open_groups[job["domain"]] = (group, used_chars + text_chars)
+        else:
+            group = [job]
+            groups.append(group)
+            open_groups[job["domain"]] = (group, text_chars)
+    return groups
+
+
+def llm_batch_stage(jobs):
+    """
+    Fase LLM multi-documento: invia i testi di un gruppo di PDF dello stesso dominio in una sola query,
+    escludendo quelli con una risposta in cache.
+    I job con una voce valida nella risposta ricevono 'response' (salvata nello store delle estrazioni);
+    gli altri conservano 'text' e vengono interrogati singolarmente da llm_stage.
+    """
+    domain = jobs[0]["domain"]
+    jobs = [job for job in jobs if "text" in job and not resolve_cached_response(job)]
+    if len(jobs) < 2:
+        return jobs
+    documents = {str(number): job["text"] for number, job in enumerate(jobs, start=1)}
+
+    started = time.perf_counter()
+    extracted_data = run_extraction_batch(
+        documents, domain_configs[domain]["copilot_info_to_extract"]
+    )
+    # Il tempo della query viene ripartito tra i documenti del gruppo
+    elapsed_per_job = (time.perf_counter() - started) / len(jobs)
+
+    for document_id, job in zip(documents, jobs):
+        job["timings"].setdefault("copilot", []).append(elapsed_per_job)
+        if document_id not in extracted_data:
+            continue
+        job["response"] = json.dumps(extracted_data[document_id], ensure_ascii=False)
+        store_job_response(job)
+    logger.info(
+        f"Query multi-documento ({domain}): {len(extracted_data)} documenti su {len(jobs)} estratti, "
+        f"{len(jobs) - len(extracted_data)} da interrogare singolarmente."
+    )
+    return jobs
+
+
+def process_job_group(jobs):
+    """
+    Esegue fase LLM (multi-documento se il gruppo ha più PDF) e trasformazione per un gruppo di job.
+    Gli errori sono gestiti per singolo file: un documento non valido non blocca gli altri.
+
+    Parameters:
+        jobs (list[dict]): Gruppo costruito con group_jobs_for_batching.
+
+    Returns:
+        list: Job trasformati correttamente, nel formato restituito da process_file.
+    """
+    if len(jobs) > 1:
+        try:
+            llm_batch_stage(jobs)
+        except Exception as e:
+            logger.error(f"Errore nella query multi-documento, interrogazione singola: {e}")
+
+    results = []
+    for job in jobs:
+        try:
+            results.append(transform_stage(llm_stage(job)))
+        except Exception as e:
+            logger.error(f"Errore durante l'elaborazione del file {job['filename']}: {e}")
+    return results
+
+
+def build_pipeline_stages(
+    batches, extract_workers=1, llm_workers=1, transform_workers=1, run_metrics=None
+):
+    """
+    Costruisce le fasi della pipeline a stadi (estrazione -> LLM -> trasformazione -> caricamento)
+    da passare a run_staged_pipeline. Il caricamento ha un solo worker e raccoglie i batch per dominio.
+
+    Parameters:
+        batches (dict): Batch per dominio in cui la fase di caricamento accoda i risultati.
+        extract_workers (int): Thread della fase di estrazione (lettura CSV / testo PDF).
+        llm_workers (int): Thread della fase LLM (sessioni Copilot in parallelo).
+        transform_workers (int): Thread della fase di trasformazione.
+        run_metrics (dict, opzionale): Metriche dell'esecuzione in cui registrare i job completati.
+
+    Returns:
+        list: Fasi nel formato atteso da run_staged_pipeline.
+    """
+    # Una sessione Copilot per worker LLM, riutilizzate tra i documenti
+    configure_copilot_pool(max_sessions=llm_workers)
+
+    return [
+        {
+            "name": "extract",
+            "function": lambda file_path: extract_stage(create_job(file_path)),
+            "workers": extract_workers,
+        },
+        {
+            "name": "llm",
+            "function": llm_stage,
+            "workers": llm_workers,
+        },
+        {"name": "transform", "function": transform_stage, "workers": transform_workers},
+        {
+            "name": "load",
+            "function": lambda job: collect_result(batches, job, run_metrics),
+            "workers": 1,
+        },
+    ]
+
+
+def describe_job(item):
+    """
+    Descrive un elemento della pipeline (percorso o job) per i messaggi di log.
+    """
+    if isinstance(item, dict):
+        return item.get("filename", str(item))
+    return os.path.basename(item)
+
+
+def collect_result(batches, result, run_metrics=None):
+    """
+    Accoda il risultato di process_file al batch del suo dominio, senza scrivere su disco.
+
+    Parameters:
+        batches (dict): Batch per dominio, nella forma
+                        {dominio: {"frames": [...], "filenames": [...], "file_paths": [...]}}.
+        result (dict): Risultato restituito da process_file.
+        run_metrics (dict, opzionale): Metriche dell'esecuzione in cui registrare durate e righe del file.
+    """
+    if run_metrics is not None:
+        record_job_metrics(run_metrics, result)
+    batch = batches.setdefault(
+        result["domain"], {"frames": [], "filenames": [], "file_paths": []}
+    )
+    batch["frames"].append(result["df"])
+    batch["filenames"].append(result["filename"])
+    batch["file_paths"].append(result["file_path"])
+    logger.info(
+        f"File {result['filename']} trasformato, in attesa di scrittura ({result['domain']})."
+    )
+
+
+def write_history(domain, df, history_store="rewrite"):
+    """
+    Scrive un DataFrame nello storico del dominio con la modalità richiesta.
+
+    Parameters:
+        domain (str): Nome del dominio.
+        df (pd.DataFrame): Record da scrivere.
+        history_store (str): 'rewrite' rilegge e riscrive il CSV (upsert_to_csv),
+                             'append' aggiunge in coda usando l'indice delle chiavi (append_to_csv).
+
+    Returns:
+        bool: True se la scrittura è andata a buon fine.
+    """
+    config = domain_configs[domain]
+    if history_store == "append":
+        return append_to_csv(df, config["output_path"], config["key_field"])
+    return upsert_to_csv(df, config["output_path"], config["key_field"])
+
+
+def compact_histories():
+    """
+    Compatta gli storici di tutti i domini e ne ricostruisce gli indici delle chiavi.
+
+    Returns:
+        bool: True se tutte le compattazioni sono andate a buon fine.
+    """
+    results = [
+        compact_history(config["output_path"], config["key_field"])
+        for config in domain_configs.values()
+    ]
+    return all(results)
+
+
+def replay_domain(domain, history_store="rewrite"):
+    """
+    Ricostruisce lo storico di un dominio dalle risposte di Copilot salvate, senza interrogare
+    di nuovo l'LLM: ogni estrazione viene riletta e trasformata con le trasformazioni correnti,
+    e i record risultanti sostituiscono quelli con la stessa chiave nello storico.
+
+    Parameters:
+        domain (str): Nome del dominio da ricostruire.
+        history_store (str): Modalità di scrittura ('rewrite' sostituisce i record esistenti,
+                             'append' aggiunge solo le chiavi nuove).
+
+    Returns:
+        bool: True se la ricostruzione è andata a buon fine.
+    """
+    config = domain_configs[domain]
+    frames = []
+    for record in load_domain_extractions(extraction_store_folder_path, domain):
+        filename = os.path.basename(record["source_file"])
+        try:
+            df = build_response_df(domain, json.loads(record["response"]))
+            frames.append(
+                transform_domain_df(domain, df, extract_date_from_filename(filename))
+            )
+        except Exception as e:
+            logger.error(f"Errore durante la rielaborazione dell'estrazione di {filename}: {e}")
+
+    if not frames:
+        logger.info(f"Nessuna estrazione da rielaborare per il dominio {domain}.")
+        return True
+
+    domain_df = pd.concat(frames, ignore_index=True)
+    logger.info(
+        f"Dominio {domain}: {len(frames)} estrazioni rielaborate, {len(domain_df)} record."
+    )
+    if history_store == "append":
+        return append_to_csv(domain_df, config["output_path"], config["key_field"])
+    return replace_in_csv(domain_df, config["output_path"], config["key_field"])
+
+
+def commit_batches(batches, checkpoint_store, history_store="rewrite", run_metrics=None):
+    """
+    Scrive i batch raccolti durante l'esecuzione: per ogni dominio deduplica in memoria
+    sulla colonna chiave, esegue una sola scrittura sullo storico e solo se la scrittura
+    va a buon fine aggiorna il checkpoint con i file del batch.
+
+    Parameters:
+        batches (dict): Batch per dominio costruiti con collect_result.
+        checkpoint_store (dict): Store dei checkpoint (vedi CheckpointFunctions).
+        history_store (str): Modalità di scrittura dello storico ('rewrite' o 'append').
+        run_metrics (dict, opzionale): Metriche dell'esecuzione in cui registrare le durate
+                                       di scrittura ('upsert') e di checkpoint ('checkpoint').
+
+    Returns:
+        list: Percorsi dei file il cui checkpoint è stato aggiornato.
+    """
+    timings = run_metrics["durations"] if run_metrics is not None else {}
+    committed_files = []
+    for domain, batch in batches.items():
+        config = domain_configs[domain]
+        key_field = config["key_field"]
+
+        domain_df = pd.concat(batch["frames"], ignore_index=True)
+        deduplicated_df = domain_df.drop_duplicates(subset=key_field, keep="first")
+        logger.info(
+            f"Dominio {domain}: {len(batch['filenames'])} file, {len(domain_df)} record "
+            f"({len(domain_df) - len(deduplicated_df)} duplicati rimossi in memoria)."
+        )
+
+        with measure_stage(timings, "upsert"):
+            written = write_history(domain, deduplicated_df, history_store)
+        if not written:
+            logger.error(
+                f"Scrittura dello storico {config['output_path']} fallita: "
+                f"checkpoint non aggiornato per {len(batch['filenames'])} file."
+            )
+            continue
+
+        with measure_stage(timings, "checkpoint"):
+            mark_files_processed(checkpoint_store, batch["file_paths"])
+            save_checkpoint_store(checkpoint_store)
+        committed_files.extend(batch["file_paths"])
+        for filename in batch["filenames"]:
+            logger.info(f"File {filename} elaborato e salvato con successo.")
+
+    return committed_files
@@ -0,0 +1,92 @@
+import hashlib
+import logging
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+# Configurazione del logger
+logging.basicConfig(
+    level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s"
+)
+logger = logging.getLogger()
+
+# Separatore tra i valori delle colonne della chiave
+record_key_separator = "|"
+
+# Righe per blocco quando l'hash è calcolato con più thread
+record_key_chunk_rows = 50000
+
+
+def column_to_strings(column):
+    """
+    Converte una colonna in stringhe come astype(str). Le colonne numeriche sono convertite
+    solo sui valori distinti, raggruppati sui bit (0.0 e -0.0 restano distinti): la conversione
+    dei float in stringa è la parte più lenta della chiave.
+
+    Returns:
+        np.ndarray: Stringa di ogni valore della colonna.
+    """
+    if not isinstance(column.dtype, np.dtype) or column.dtype.kind not in "fiu":
+        return column.astype(str).to_numpy()
+    values = column.to_numpy()
+    bits = np.ascontiguousarray(values).view(f"u{values.dtype.itemsize}")
+    codes, uniques = pd.factorize(bits)
+    return pd.Series(uniques.view(values.dtype)).astype(str).to_numpy()[codes]
+
+
+def join_key_columns(df, key_columns, separator=record_key_separator):
+    """
+    Concatena i valori delle colonne della chiave di ogni riga, separati da separator.
+    Ogni colonna è convertita in stringa una sola volta (vedi column_to_strings),
+    senza creare le Series intermedie delle concatenazioni successive.
+
+    Parameters:
+        df (pd.DataFrame): DataFrame di input.
+        key_columns (list): Colonne della chiave, nell'ordine di concatenazione.
+        separator (str): Separatore tra i valori.
+
+    Returns:
+        list: Chiave concatenata di ogni riga.
+    """
+    columns = [column_to_strings(df[column]) for column in key_columns]
+    return [separator.join(values) for values in zip(*columns)]
+
+
+def hash_keys(keys):
+    """
+    Calcola l'hash sha256 (esadecimale) di ogni chiave codificata in UTF-8.
+    """
+    sha256 = hashlib.sha256
+    return [sha256(key.encode()).hexdigest() for key in keys]
+
+
+def build_record_keys(df, key_columns, workers=1):
+    """
+    Genera la record_key di ogni riga: sha256 dei valori delle colonne della chiave
+    convertiti in stringa e separati da '|', identica a quella calcolata riga per riga
+    con hashlib.sha256(concatenated_key.encode()).hexdigest().
+
+    Con workers > 1 l'hash è calcolato a blocchi di record_key_chunk_rows righe su un pool
+    di thread. hashlib rilascia il GIL solo per input superiori a 2 KB, quindi con chiavi
+    corte il guadagno è limitato (vedi record_key_benchmark_main.py).
+
+    Parameters:
+        df (pd.DataFrame): DataFrame di input.
+        key_columns (list): Colonne della chiave, nell'ordine di concatenazione.
+        workers (int): Thread usati per l'hash.
+
+    Returns:
+        pd.Series: Chiavi esadecimali, con lo stesso indice di df.
+    """
+    keys = join_key_columns(df, key_columns)
+    if workers > 1 and len(keys) > record_key_chunk_rows:
+        chunks = [
+            keys[start : start + record_key_chunk_rows]
+            for start in range(0, len(keys), record_key_chunk_rows)
+        ]
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            digests = [digest for chunk in executor.map(hash_keys, chunks) for digest in chunk]
+    else:
+        digests = hash_keys(keys)
+    return pd.Series(digests, index=df.index, dtype=object)
@@ -0,0 +1,122 @@
+import logging
+import os
+import re
+import shutil
+import threading
+
+from resources.constants.common.Constants import (
+    llm_response_cache_folder_path,
+    llm_response_cache_max_bytes,
+    llm_response_cache_ttl_seconds,
+)
+from resources.functions.CacheFunctions import build_cache_key, cache_get, cache_set
+from resources.functions.CopilotFunctions import is_complete_json
+
+# Configurazione del logger
+logging.basicConfig(
+    level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s"
+)
+logger = logging.getLogger()
+
+# Impostazioni della cache delle risposte LLM del processo corrente
+response_cache_settings = {
+    "enabled": True,
+    "ttl_seconds": llm_response_cache_ttl_seconds,
+    "max_bytes": llm_response_cache_max_bytes,
+    "validated_domains": set(),
+    "lock": threading.Lock(),
+}
+
+
+def configure_response_cache(enabled=None, ttl_seconds=None):
+    """
+    Imposta la cache delle risposte LLM del processo corrente. I parametri non indicati restano invariati.
+
+    Parameters:
+        enabled (bool): Se False la cache non viene né letta né scritta.
+        ttl_seconds (float): Età massima di una risposta in cache.
+    """
+    if enabled is not None:
+        response_cache_settings["enabled"] = enabled
+    if ttl_seconds is not None:
+        response_cache_settings["ttl_seconds"] = ttl_seconds
+
+
+def normalize_document_text(text):
+    """
+    Normalizza il testo di un documento per la chiave di cache (spazi e a capo uniformati),
+    così che la stessa estrazione esportata due volte produca la stessa chiave.
+    """
+    return re.sub(r"\s+", " ", text).strip()
+
+
+def get_response_cache_folder(domain, domain_version):
+    """
+    Cartella della cache per dominio e versione del dominio (hash dei modelli di query con tutti
+    i campi del dominio, vedi get_domain_prompt_version). La versione del prompt effettivamente
+    inviato (documento intero, blocchi o soli campi mancanti) fa parte della chiave delle voci,
+    quindi una risposta è valida solo per lo stesso prompt.
+    """
+    return os.path.join(llm_response_cache_folder_path, domain, domain_version)
+
+
+def invalidate_stale_responses(domain, domain_version):
+    """
+    Elimina le risposte in cache del dominio ottenute con versioni del dominio diverse da quella
+    corrente. Viene eseguita una volta per dominio e processo: cambiare la lista dei campi di un
+    dominio invalida solo le risposte di quel dominio, mentre i prompt con campi diversi dello
+    stesso dominio (blocchi, estrazione ibrida) condividono la cartella e non si eliminano a vicenda.
+    """
+    with response_cache_settings["lock"]:
+        if domain in response_cache_settings["validated_domains"]:
+            return
+        response_cache_settings["validated_domains"].add(domain)
+
+    domain_folder = os.path.join(llm_response_cache_folder_path, domain)
+    if not os.path.isdir(domain_folder):
+        return
+    for version in os.listdir(domain_folder):
+        if version != domain_version:
+            logger.info(
+                f"Cache delle risposte {domain}: eliminate le risposte della versione {version}, "
+                f"superata da {domain_version}."
+            )
+            shutil.rmtree(os.path.join(domain_folder, version), ignore_errors=True)
+
+
+def get_cached_response(domain, domain_version, prompt_version, text):
+    """
+    Cerca in cache la risposta LLM per il testo di un documento.
+
+    Parameters:
+        domain (str): Dominio del documento.
+        domain_version (str): Versione del dominio (vedi get_domain_prompt_version).
+        prompt_version (str): Versione del prompt inviato (vedi get_copilot_prompt_version).
+        text (str): Testo del documento inviato al backend.
+
+    Returns:
+        str: La risposta in cache, oppure None.
+    """
+    if not response_cache_settings["enabled"]:
+        return None
+    invalidate_stale_responses(domain, domain_version)
+    return cache_get(
+        get_response_cache_folder(domain, domain_version),
+        build_cache_key(prompt_version, normalize_document_text(text)),
+        response_cache_settings["ttl_seconds"],
+    )
+
+
+def cache_response(domain, domain_version, prompt_version, text, response):
+    """
+    Memorizza in cache la risposta LLM per il testo di un documento.
+    Le risposte non in JSON (errori, risposte incomplete) non vengono memorizzate.
+    """
+    if not response_cache_settings["enabled"] or not is_complete_json(response or ""):
+        return
+    cache_set(
+        get_response_cache_folder(domain, domain_version),
+        build_cache_key(prompt_version, normalize_document_text(text)),
+        response,
+        response_cache_settings["max_bytes"],
+    )
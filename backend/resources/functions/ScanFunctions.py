@@ -0,0 +1,132 @@
+import json
+import logging
+import os
+
+# Configurazione del logger
+logging.basicConfig(
+    level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s"
+)
+logger = logging.getLogger()
+
+
+def load_scan_index(index_path):
+    """
+    Carica l'indice di scansione della cartella di input.
+
+    Sul disco l'indice è un JSON {cartella: {"mtime_ns": ..., "files": [...], "subdirs": [...]}}
+    con lo stato di ogni cartella all'ultima scansione.
+
+    Parameters:
+        index_path (str): Percorso del file JSON dell'indice.
+
+    Returns:
+        dict: Indice di scansione.
+    """
+    directories = {}
+    if os.path.isfile(index_path):
+        try:
+            with open(index_path, "r") as f:
+                directories = json.load(f)
+            logger.info(f"Indice di scansione caricato: {len(directories)} cartelle.")
+        except Exception as e:
+            logger.warning(
+                f"Indice di scansione {index_path} non leggibile, verrà ricostruito: {e}"
+            )
+    return {"path": index_path, "directories": directories, "dirty": False}
+
+
+def list_directory(directory):
+    """
+    Elenca il contenuto di una cartella separando file e sottocartelle (ordinati per nome).
+    """
+    files, subdirs = [], []
+    with os.scandir(directory) as entries:
+        for entry in entries:
+            if entry.is_dir():
+                subdirs.append(entry.name)
+            elif entry.is_file():
+                files.append(entry.name)
+    return sorted(files), sorted(subdirs)
+
+
+def scan_input_folder(scan_index, root_folder, extensions, full_scan=False):
+    """
+    Scansiona ricorsivamente la cartella di input usando l'indice di scansione.
+
+    Per ogni cartella viene letto solo l'mtime: se coincide con quello registrato,
+    l'elenco dei file viene preso dall'indice senza rileggere la cartella.
+    L'mtime di una cartella cambia quando vi si aggiungono, rimuovono o rinominano file,
+    non quando un file viene riscritto sul posto: in quel caso serve full_scan.
+
+    Parameters:
+        scan_index (dict): Indice di scansione caricato con load_scan_index.
+        root_folder (str): Cartella radice da scansionare.
+        extensions (tuple[str]): Estensioni dei file da restituire.
+        full_scan (bool): Se True rilegge tutte le cartelle ignorando l'indice.
+
+    Returns:
+        tuple: (file nelle cartelle modificate, file nelle cartelle invariate).
+    """
+    directories = scan_index["directories"]
+    changed_files, unchanged_files = [], []
+    visited = set()
+    changed_directories = 0
+
+    stack = [os.path.normpath(root_folder)]
+    while stack:
+        directory = stack.pop()
+        try:
+            mtime_ns = os.stat(directory).st_mtime_ns
+        except FileNotFoundError:
+            continue
+        visited.add(directory)
+
+        entry = directories.get(directory)
+        if not full_scan and entry is not None and entry["mtime_ns"] == mtime_ns:
+            target = unchanged_files
+        else:
+            files, subdirs = list_directory(directory)
+            entry = {"mtime_ns": mtime_ns, "files": files, "subdirs": subdirs}
+            directories[directory] = entry
+            scan_index["dirty"] = True
+            changed_directories += 1
+            target = changed_files
+
+        target.extend(
+            os.path.join(directory, filename)
+            for filename in entry["files"]
+            if filename.endswith(extensions)
+        )
+        # Ordine inverso sulla pila per visitare le sottocartelle in ordine alfabetico
+        stack.extend(
+            os.path.join(directory, subdir) for subdir in reversed(entry["subdirs"])
+        )
+
+    # Rimuove dall'indice le cartelle che non esistono più
+    for directory in [d for d in directories if d not in visited]:
+        del directories[directory]
+        scan_index["dirty"] = True
+
+    logger.info(
+        f"Scansione di {root_folder}: {len(visited)} cartelle, {changed_directories} modificate, "
+        f"{len(changed_files)} file da verificare, {len(unchanged_files)} file in cartelle invariate."
+    )
+    return changed_files, unchanged_files
+
+
+def save_scan_index(scan_index):
+    """
+    Salva l'indice di scansione su disco in modo atomico, solo se è stato modificato.
+
+    Parameters:
+        scan_index (dict): Indice di scansione.
+    """
+    if not scan_index["dirty"]:
+        return
+
+    temporary_path = scan_index["path"] + ".tmp"
+    with open(temporary_path, "w") as f:
+        json.dump(scan_index["directories"], f, separators=(",", ":"), sort_keys=True)
+    os.replace(temporary_path, scan_index["path"])
+    scan_index["dirty"] = False
+    logger.info(f"Indice di scansione salvato: {scan_index['path']}")
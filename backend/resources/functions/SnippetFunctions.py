@@ -0,0 +1,69 @@
+import logging
+import re
+
+# Configurazione del logger
+logging.basicConfig(
+    level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s"
+)
+logger = logging.getLogger()
+
+# Occorrenze di ogni etichetta incluse nel testo (le etichette generiche compaiono anche nelle note)
+max_label_occurrences = 2
+
+
+def find_label_windows(text, labels, window_chars):
+    """
+    Trova le finestre di testo attorno alle occorrenze delle etichette di un campo.
+
+    Parameters:
+        text (str): Testo completo del documento.
+        labels (list[str]): Etichette del campo (confronto senza maiuscole).
+        window_chars (int): Caratteri inclusi prima e dopo ogni occorrenza.
+
+    Returns:
+        list: Intervalli (inizio, fine) delle finestre, vuota se nessuna etichetta compare nel testo.
+    """
+    windows = []
+    for label in labels:
+        pattern = re.compile(re.escape(label), re.IGNORECASE)
+        for match in list(pattern.finditer(text))[:max_label_occurrences]:
+            windows.append(
+                (max(0, match.start() - window_chars), min(len(text), match.end() + window_chars))
+            )
+    return windows
+
+
+def build_field_snippets(text, field_labels, fields, window_chars):
+    """
+    Costruisce il testo da inviare all'LLM per estrarre solo alcuni campi: le finestre attorno
+    alle etichette dei campi, unite quando si sovrappongono e nell'ordine del documento.
+
+    Parameters:
+        text (str): Testo completo del documento.
+        field_labels (dict): Etichette di ogni campo (vedi light_field_labels).
+        fields (list[str]): Campi da estrarre.
+        window_chars (int): Caratteri inclusi prima e dopo ogni etichetta.
+
+    Returns:
+        str: Porzioni di testo separate da '...', oppure None se per almeno un campo
+             non è stata trovata nessuna etichetta (serve il testo completo).
+    """
+    windows = []
+    for field in fields:
+        field_windows = find_label_windows(text, field_labels.get(field, []), window_chars)
+        if not field_windows:
+            logger.info(f"Nessuna etichetta del campo '{field}' nel testo del documento.")
+            return None
+        windows.extend(field_windows)
+
+    merged = []
+    for start, end in sorted(windows):
+        if merged and start <= merged[-1][1]:
+            merged[-1][1] = max(merged[-1][1], end)
+        else:
+            merged.append([start, end])
+    snippets = "\n...\n".join(text[start:end] for start, end in merged)
+    logger.info(
+        f"Testo per {len(fields)} campi: {len(merged)} porzioni, {len(snippets)} caratteri su {len(text)}."
+    )
+    return snippets
@@ -0,0 +1,128 @@
+import logging
+import queue
+import threading
+import time
+
+# Configurazione del logger
+logging.basicConfig(
+    level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s"
+)
+logger = logging.getLogger()
+
+# Segnale di fine lavoro inviato a ogni worker di una fase
+end_of_stream = object()
+
+
+def run_stage_worker(stage, input_queue, output_queue, stats, describe_item):
+    """
+    Ciclo di un worker: preleva elementi dalla coda di ingresso, applica la funzione
+    della fase e inoltra il risultato alla coda successiva (bloccandosi se è piena).
+    Gli elementi che falliscono vengono loggati e non proseguono.
+    """
+    while True:
+        item = input_queue.get()
+        if item is end_of_stream:
+            return
+
+        started = time.perf_counter()
+        try:
+            result = stage["function"](item)
+        except Exception as e:
+            stats["busy_seconds"] += time.perf_counter() - started
+            stats["failed"] += 1
+            logger.error(
+                f"Errore nella fase '{stage['name']}' per {describe_item(item)}: {e}"
+            )
+            continue
+        stats["busy_seconds"] += time.perf_counter() - started
+        stats["processed"] += 1
+
+        if output_queue is not None:
+            blocked_since = time.perf_counter()
+            output_queue.put(result)
+            stats["blocked_seconds"] += time.perf_counter() - blocked_since
+
+
+def log_stage_statistics(stage_statistics, wall_seconds):
+    """
+    Logga per ogni fase elementi elaborati, errori, utilizzo e tempo bloccato sulla coda a valle,
+    indicando la fase più occupata come collo di bottiglia.
+    """
+    logger.info(f"Pipeline completata in {wall_seconds:.2f}s.")
+    for name, stats in stage_statistics.items():
+        logger.info(
+            f"Fase '{name}': {stats['workers']} worker, {stats['processed']} elaborati, "
+            f"{stats['failed']} errori, occupata {stats['busy_seconds']:.2f}s "
+            f"(utilizzo {stats['utilisation']:.0%}), bloccata a valle {stats['blocked_seconds']:.2f}s."
+        )
+    if stage_statistics:
+        bottleneck = max(
+            stage_statistics, key=lambda name: stage_statistics[name]["utilisation"]
+        )
+        logger.info(f"Collo di bottiglia: fase '{bottleneck}'.")
+
+
+def run_staged_pipeline(items, stages, queue_size=2, describe_item=str):
+    """
+    Esegue gli elementi attraverso una sequenza di fasi, ognuna con il proprio gruppo di thread,
+    collegate da code limitate: quando una fase è lenta le code a monte si riempiono e le fasi
+    precedenti si fermano (backpressure), mentre fasi diverse lavorano in parallelo su file diversi.
+
+    Parameters:
+        items (iterable): Elementi in ingresso alla prima fase.
+        stages (list[dict]): Fasi in ordine, ognuna {"name": str, "function": callable, "workers": int}.
+                             Il risultato dell'ultima fase viene scartato.
+        queue_size (int): Capacità di ogni coda tra due fasi.
+        describe_item (callable): Descrizione di un elemento per i messaggi di errore.
+
+    Returns:
+        dict: Statistiche per fase (elaborati, errori, tempo occupato, tempo bloccato, utilizzo).
+    """
+    queues = [queue.Queue(maxsize=queue_size) for _ in stages]
+    stage_threads = []
+    worker_statistics = []
+
+    started = time.perf_counter()
+    for index, stage in enumerate(stages):
+        output_queue = queues[index + 1] if index + 1 < len(stages) else None
+        threads, statistics = [], []
+        for worker_number in range(max(1, stage["workers"])):
+            stats = {"processed": 0, "failed": 0, "busy_seconds": 0.0, "blocked_seconds": 0.0}
+            thread = threading.Thread(
+                target=run_stage_worker,
+                args=(stage, queues[index], output_queue, stats, describe_item),
+                name=f"{stage['name']}-{worker_number}",
+                daemon=True,
+            )
+            thread.start()
+            threads.append(thread)
+            statistics.append(stats)
+        stage_threads.append(threads)
+        worker_statistics.append(statistics)
+
+    for item in items:
+        queues[0].put(item)
+
+    # Chiude le fasi in ordine: una fase termina solo dopo che quella a monte ha finito
+    for index, threads in enumerate(stage_threads):
+        for _ in threads:
+            queues[index].put(end_of_stream)
+        for thread in threads:
+            thread.join()
+    wall_seconds = time.perf_counter() - started
+
+    stage_statistics = {}
+    for stage, statistics in zip(stages, worker_statistics):
+        stats = {
+            "workers": len(statistics),
+            "processed": sum(s["processed"] for s in statistics),
+            "failed": sum(s["failed"] for s in statistics),
+            "busy_seconds": sum(s["busy_seconds"] for s in statistics),
+            "blocked_seconds": sum(s["blocked_seconds"] for s in statistics),
+        }
+        capacity = wall_seconds * stats["workers"]
+        stats["utilisation"] = stats["busy_seconds"] / capacity if capacity else 0.0
+        stage_statistics[stage["name"]] = stats
+
+    log_stage_statistics(stage_statistics, wall_seconds)
+    return stage_statistics
@@ -0,0 +1,130 @@
+import logging
+import re
+
+from resources.constants.common.Constants import native_parser_min_confidence
+
+# Configurazione del logger
+logging.basicConfig(
+    level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s"
+)
+logger = logging.getLogger()
+
+# Numero in formato italiano: migliaia separate dal punto, decimali dalla virgola (es. '-1.234,50')
+number_pattern = re.compile(r"-?\d+(?:\.\d{3})*(?:,\d+)?")
+date_pattern = re.compile(r"(\d{2})[./](\d{2})[./](\d{4})")
+
+# Confidenza di un valore letto con un template: etichetta trovata con un solo valore,
+# etichetta trovata più volte con valori diversi (viene usato il primo), etichetta assente
+# e valore di default del campo
+template_confidence = {"match": 1.0, "ambiguous": 0.6, "default": 0.5}
+
+
+def parse_italian_number(text):
+    """
+    Converte un numero in formato italiano (es. '2.044,00€') in float, None se assente.
+    """
+    match = number_pattern.search(text)
+    if match is None:
+        return None
+    return float(match.group().replace(".", "").replace(",", "."))
+
+
+def convert_label_value(text, value_type):
+    """
+    Converte il testo catturato da un'etichetta nel tipo del campo:
+    'str', 'int', 'float', 'date' (dd/mm/yyyy o dd.mm.yyyy, restituita come yyyy-mm-dd)
+    o 'month' (mese e anno, es. 'NOVEMBRE 2024' -> 'Novembre 2024').
+
+    Ritorna:
+    Il valore convertito, oppure None se il testo non è nel formato atteso.
+    """
+    text = text.strip()
+    if not text:
+        return None
+    if value_type == "str":
+        return text
+    if value_type == "month":
+        return text.capitalize()
+    if value_type == "date":
+        match = date_pattern.search(text)
+        return f"{match.group(3)}-{match.group(2)}-{match.group(1)}" if match else None
+    number = parse_italian_number(text)
+    if number is None:
+        return None
+    return int(number) if value_type == "int" else number
+
+
+def compile_template(template):
+    """
+    Precompila le espressioni regolari di un template (riconoscimento del documento ed etichette dei campi).
+
+    Parametri:
+    template (dict): Template con 'detect' e 'fields' (vedi light_bill_templates).
+
+    Ritorna:
+    dict: Lo stesso template con le espressioni regolari compilate in modalità multilinea.
+    """
+    fields = {}
+    for field, spec in template["fields"].items():
+        fields[field] = dict(spec)
+        if "pattern" in spec:
+            fields[field]["pattern"] = re.compile(spec["pattern"], re.MULTILINE)
+    return {"detect": re.compile(template["detect"], re.MULTILINE), "fields": fields}
+
+
+def detect_template(text, compiled_templates):
+    """
+    Restituisce il nome del primo template compilato che riconosce il testo, None se nessuno.
+    """
+    for name, template in compiled_templates.items():
+        if template["detect"].search(text):
+            return name
+    return None
+
+
+def extract_template_fields(text, compiled_template):
+    """
+    Legge i campi di un template dal testo di un PDF.
+
+    Parametri:
+    text (str): Testo completo del PDF (pagine separate da un a capo).
+    compiled_template (dict): Template compilato con compile_template.
+
+    Ritorna:
+    tuple: Valori dei campi (None se non trovati) e confidenza di ogni campo (0 se non trovato,
+           vedi template_confidence).
+    """
+    values, confidences = {}, {}
+    for field, spec in compiled_template["fields"].items():
+        if "value" in spec:
+            values[field], confidences[field] = spec["value"], template_confidence["match"]
+            continue
+
+        group = spec.get("group", 1)
+        found = [
+            convert_label_value(match.group(group), spec["type"])
+            for match in spec["pattern"].finditer(text)
+        ]
+        found = [value for value in found if value is not None]
+        if found:
+            values[field] = found[0]
+            confidences[field] = template_confidence[
+                "match" if len(set(found)) == 1 else "ambiguous"
+            ]
+        elif "default" in spec:
+            values[field], confidences[field] = spec["default"], template_confidence["default"]
+        else:
+            values[field], confidences[field] = None, 0.0
+    return values, confidences
+
+
+def find_unreliable_fields(values, confidences, mandatory_fields):
+    """
+    Restituisce i campi obbligatori mancanti o con confidenza inferiore a native_parser_min_confidence.
+    """
+    return [
+        field
+        for field in mandatory_fields
+        if values.get(field) is None
+        or confidences.get(field, 0.0) < native_parser_min_confidence
+    ]
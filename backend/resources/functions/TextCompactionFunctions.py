@@ -0,0 +1,105 @@
+import logging
+import re
+from collections import Counter
+
+# Configurazione del logger
+logging.basicConfig(
+    level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s"
+)
+logger = logging.getLogger()
+
+
+def normalize_line(line):
+    return " ".join(line.split())
+
+
+def remove_boilerplate(page_text, boilerplate_patterns):
+    """
+    Rimuove da una pagina le righe che corrispondono a uno dei pattern di testo ricorrente
+    (note legali, dati societari, inviti promozionali).
+
+    Parameters:
+        page_text (str): Testo della pagina.
+        boilerplate_patterns (list[str]): Espressioni regolari cercate in ogni riga.
+
+    Returns:
+        str: Testo della pagina senza le righe ricorrenti.
+    """
+    patterns = [re.compile(pattern) for pattern in boilerplate_patterns]
+    lines = [
+        line
+        for line in page_text.splitlines()
+        if not any(pattern.search(normalize_line(line)) for pattern in patterns)
+    ]
+    return "\n".join(lines)
+
+
+def find_repeated_lines(pages):
+    """
+    Trova le righe di intestazione e piè di pagina: righe presenti su almeno due pagine
+    del documento, confrontate con gli spazi normalizzati.
+
+    Parameters:
+        pages (list[str]): Testo di ogni pagina.
+
+    Returns:
+        set: Righe normalizzate ripetute su più pagine.
+    """
+    page_counts = Counter()
+    for page in pages:
+        page_counts.update({normalize_line(line) for line in page.splitlines()} - {""})
+    return {line for line, count in page_counts.items() if count > 1}
+
+
+def remove_repeated_lines(pages, repeated_lines):
+    """
+    Toglie da ogni pagina le intestazioni e i piè di pagina già comparsi in una pagina precedente.
+    Sono considerate solo le righe ripetute consecutive all'inizio e alla fine della pagina,
+    così che etichette e valori ripetuti nel corpo (per esempio due movimenti uguali) restino.
+    La prima occorrenza di ogni riga viene mantenuta.
+
+    Parameters:
+        pages (list[str]): Testo di ogni pagina, in ordine di documento.
+        repeated_lines (set): Righe normalizzate ripetute (vedi find_repeated_lines).
+
+    Returns:
+        list: Testo delle pagine senza le righe già comparse.
+    """
+    seen_lines = set()
+    compacted_pages = []
+    for page in pages:
+        lines = page.splitlines()
+        normalized = [normalize_line(line) for line in lines]
+
+        start = 0
+        while start < len(lines) and normalized[start] in repeated_lines:
+            start += 1
+        end = len(lines)
+        while end > start and normalized[end - 1] in repeated_lines:
+            end -= 1
+
+        kept = []
+        for i, line in enumerate(lines):
+            in_header_or_footer = i < start or i >= end
+            if in_header_or_footer and normalized[i] in seen_lines:
+                continue
+            kept.append(line)
+        seen_lines.update(normalized)
+        compacted_pages.append("\n".join(kept))
+    return compacted_pages
+
+
+def compact_pages(pages, boilerplate_patterns):
+    """
+    Compatta il testo di un documento prima di inviarlo all'LLM: rimuove il testo ricorrente
+    del dominio e le intestazioni e i piè di pagina ripetuti, mantenendone la prima occorrenza.
+
+    Parameters:
+        pages (list[str]): Testo di ogni pagina.
+        boilerplate_patterns (list[str]): Espressioni regolari delle righe da rimuovere.
+
+    Returns:
+        list: Testo compattato di ogni pagina.
+    """
+    pages = [remove_boilerplate(page, boilerplate_patterns) for page in pages]
+    return remove_repeated_lines(pages, find_repeated_lines(pages))
@@ -0,0 +1,145 @@
+import logging
+import os
+import time
+
+try:
+    from inotify_simple import INotify, flags
+except ImportError:  # inotify non disponibile (libreria mancante o sistema non Linux)
+    INotify = None
+
+# Configurazione del logger
+logging.basicConfig(
+    level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s"
+)
+logger = logging.getLogger()
+
+
+def wait_for_stable_files(file_paths, debounce_seconds):
+    """
+    Attende che dimensione e mtime dei file restino invariati per debounce_seconds,
+    così da non elaborare file ancora in fase di copia.
+
+    Parameters:
+        file_paths (list[str]): File da controllare.
+        debounce_seconds (float): Intervallo di stabilità richiesto.
+
+    Returns:
+        list: File ancora esistenti e stabili, nello stesso ordine.
+    """
+
+    def snapshot():
+        states = {}
+        for file_path in file_paths:
+            try:
+                stat = os.stat(file_path)
+                states[file_path] = (stat.st_size, stat.st_mtime_ns)
+            except FileNotFoundError:
+                pass
+        return states
+
+    previous = snapshot()
+    while True:
+        time.sleep(debounce_seconds)
+        current = snapshot()
+        if current == previous:
+            return [file_path for file_path in file_paths if file_path in current]
+        previous = current
+
+
+def watch_with_inotify(root_folder, extensions, on_files, debounce_seconds):
+    """
+    Osserva la cartella con inotify e invoca on_files con i file arrivati,
+    dopo debounce_seconds senza nuovi eventi.
+    """
+    inotify = INotify()
+    watch_flags = flags.CLOSE_WRITE | flags.MOVED_TO | flags.CREATE
+    watched_directories = {}
+
+    def add_watches(directory):
+        found_files = []
+        for dirpath, _, filenames in os.walk(directory):
+            watched_directories[inotify.add_watch(dirpath, watch_flags)] = dirpath
+            found_files.extend(
+                os.path.join(dirpath, filename)
+                for filename in filenames
+                if filename.endswith(extensions)
+            )
+        return found_files
+
+    add_watches(root_folder)
+    logger.info(
+        f"Osservazione di {root_folder} con inotify ({len(watched_directories)} cartelle)."
+    )
+
+    pending_files = set()
+    while True:
+        # Senza file in attesa si blocca fino al prossimo evento, altrimenti attende il debounce
+        timeout = int(debounce_seconds * 1000) if pending_files else None
+        events = inotify.read(timeout=timeout)
+        if not events:
+            if pending_files:
+                on_files(sorted(pending_files))
+                pending_files.clear()
+            continue
+
+        for event in events:
+            directory = watched_directories.get(event.wd)
+            if directory is None or not event.name:
+                continue
+            path = os.path.join(directory, event.name)
+            if event.mask & flags.ISDIR:
+                # Nuova cartella: la osserva e considera i file che contiene già
+                pending_files.update(add_watches(path))
+            elif path.endswith(extensions) and event.mask & (
+                flags.CLOSE_WRITE | flags.MOVED_TO
+            ):
+                pending_files.add(path)
+
+
+def watch_with_polling(discover_files, on_files, debounce_seconds, poll_interval):
+    """
+    Interroga periodicamente discover_files e invoca on_files con i file trovati,
+    una volta che sono rimasti stabili per debounce_seconds.
+    """
+    logger.info(f"Osservazione della cartella di input con polling ogni {poll_interval}s.")
+    while True:
+        file_paths = discover_files()
+        if file_paths:
+            stable_files = wait_for_stable_files(file_paths, debounce_seconds)
+            if stable_files:
+                on_files(stable_files)
+        time.sleep(poll_interval)
+
+
+def watch_input_folder(
+    root_folder,
+    extensions,
+    discover_files,
+    on_files,
+    debounce_seconds=2.0,
+    poll_interval=10.0,
+    use_polling=False,
+):
+    """
+    Resta in ascolto sulla cartella di input e consegna a on_files i nuovi file.
+    Usa inotify se disponibile, altrimenti (o se use_polling è True) il polling di discover_files.
+    Termina solo con un'eccezione (es. KeyboardInterrupt).
+
+    Parameters:
+        root_folder (str): Cartella da osservare.
+        extensions (tuple[str]): Estensioni dei file di interesse.
+        discover_files (callable): Restituisce i file da elaborare (usata dal polling).
+        on_files (callable): Riceve la lista dei file da elaborare.
+        debounce_seconds (float): Attesa senza modifiche prima di consegnare i file.
+        poll_interval (float): Intervallo tra due scansioni in modalità polling.
+        use_polling (bool): Forza il polling anche se inotify è disponibile.
+    """
+    if INotify is None:
+        logger.info("inotify non disponibile, uso il polling.")
+    elif not use_polling:
+        try:
+            watch_with_inotify(root_folder, extensions, on_files, debounce_seconds)
+            return
+        except OSError as e:
+            logger.warning(f"inotify non utilizzabile ({e}), passo al polling.")
+    watch_with_polling(discover_files, on_files, debounce_seconds, poll_interval)
@@ -1,9 +1,8 @@
-import hashlib
-import locale
-
 from resources.constants.common.Constants import df_default_values
-from resources.constants.salary.RelatechConstants import *
+from resources.constants.bank_transactions.BankConstants import *
 from resources.functions.DataFrameFunctions import *
+from resources.functions.DateFunctions import parse_italian_dates
+from resources.functions.RecordKeyFunctions import build_record_keys
 
 # Configura il logger
 logging.basicConfig(
@@ -11,9 +10,6 @@ logging.basicConfig(
 )
 logger = logging.getLogger()
 
-# Imposta la localizzazione
-locale.setlocale(locale.LC_TIME, "it_IT.UTF-8")
-
 
 def transform_df(df, columns_to_select, extracted_date):
     logger.info("Inizio della trasformazione del DataFrame.")
@@ -42,55 +38,30 @@ def transform_df(df, columns_to_select, extracted_date):
     )
     df["causale"] = df["Operazione"]
     df["note"] = "File Estratto Conto Trimestrale - Script completato con successo"
-    df["data_operazione"] = df["Valuta"].apply(
-        lambda x: pd.to_datetime(f"01-{x}", format="%d/%m/%Y").date()
-    )
-    df["concatenated_key"] = (
-        df["data_operazione"].astype(str)
-        + "|"
-        + df["uscite"].astype(str)
-        + "|"
-        + df["entrate"].astype(str)
-        + "|"
-        + df["descrizione"].astype(str)
-        + "|"
-        + df["causale"].astype(str)
-    )
-    df["record_key"] = df["concatenated_key"].apply(
-        lambda x: hashlib.sha256(x.encode()).hexdigest()
-    )
-    df_filtered = df[
-        ~df["descrizione"]
-        .astype(str)
-        .str.contains("Saldo iniziale|Saldo finale", case=True, na=True)
-    ]
+    df["data_operazione"] = parse_italian_dates(df["Valuta"])
+    df["record_key"] = build_record_keys(df, bank_record_key_columns)
     df["data_estratto_conto"] = extracted_date  # Aggiungi la colonna con la data
-    df["data_estratto_conto"] = df["data_estratto_conto"].apply(
-        lambda x: pd.to_datetime(f"01-{x}", format="%d/%m/%Y").date()
-    )
+    df["data_estratto_conto"] = parse_italian_dates(df["data_estratto_conto"])
 
     logger.info("Colonne base aggiunte")
 
     # Verifica i campi obbligatori e aggiorna la colonna 'note' per i campi mancanti
-    for field in relatech_df_mandatory_fields:
-        missing_count = df[field].isnull().sum()
-        if missing_count > 0:
-            logger.warning(
-                f"Ci sono {missing_count} valori mancanti nella colonna '{field}'."
-            )
-        df["note"] = df.apply(
-            lambda row: (
-                row["note"] + f"; Verificare {field} mancante"
-                if pd.isnull(row[field])
-                else row["note"]
-            ),
-            axis=1,
-        )
+    validation_issues = validate_mandatory_fields(df, bank_df_mandatory_fields)
+
+    # Escludi le righe di saldo, dopo aver aggiunto tutte le colonne
+    df_filtered = df[
+        ~df["descrizione"]
+        .astype(str)
+        .str.contains("Saldo iniziale|Saldo finale", case=True, na=True)
+    ]
 
     selected_df = select_columns_from_df(columns_to_select, df_filtered)
     selected_df = cast_columns_with_defaults(
-        selected_df, relatech_df_schema, df_default_values
+        selected_df, bank_df_schema, df_default_values
     )
+    selected_df.attrs["validation_issues"] = validation_issues.loc[
+        validation_issues["row"].isin(df_filtered.index)
+    ].to_dict("records")
 
     logger.info(f"Selezionate {len(columns_to_select)} colonne: {columns_to_select}.")
     logger.info("Trasformazione completata.")
@@ -0,0 +1,203 @@
+import logging
+import re
+
+import pandas as pd
+import pdfplumber
+
+# Configura il logger
+logging.basicConfig(
+    level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s"
+)
+logger = logging.getLogger()
+
+# Colonne della tabella dei movimenti dell'estratto conto ING, nell'ordine dell'export CSV,
+# con le parole della rispettiva intestazione
+ing_statement_columns = {
+    "DATA CONTABILE": ("DATA", "CONTABILE"),
+    "DATA VALUTA": ("DATA", "VALUTA"),
+    "USCITE": ("USCITE",),
+    "ENTRATE": ("ENTRATE",),
+    "CAUSALE": ("CAUSALE",),
+    "DESCRIZIONE OPERAZIONE": ("DESCRIZIONE", "OPERAZIONE"),
+}
+
+# Colonne il cui testo può proseguire sulle righe successive del movimento
+ing_multiline_columns = ("CAUSALE", "DESCRIZIONE OPERAZIONE")
+
+date_pattern = re.compile(r"^\d{2}/\d{2}/\d{4}$")
+amount_pattern = re.compile(r"^[+-]?\d{1,3}(\.\d{3})*,\d{2}$")
+
+# Tolleranza verticale (in punti) per considerare due parole sulla stessa riga
+line_tolerance = 3
+
+# Distanza massima tra due righe dello stesso movimento, in multipli dell'altezza del testo
+max_continuation_gap = 2.0
+
+
+def group_words_into_lines(words):
+    """
+    Raggruppa le parole di una pagina (pdfplumber extract_words) in righe, dall'alto verso il basso.
+    """
+    lines = []
+    for word in sorted(words, key=lambda word: (round(word["top"]), word["x0"])):
+        if lines and abs(lines[-1][0]["top"] - word["top"]) <= line_tolerance:
+            lines[-1].append(word)
+        else:
+            lines.append([word])
+    return [sorted(line, key=lambda word: word["x0"]) for line in lines]
+
+
+def find_header(lines):
+    """
+    Cerca la riga di intestazione della tabella dei movimenti.
+
+    Parametri:
+    lines (list): Righe della pagina (vedi group_words_into_lines).
+
+    Ritorna:
+    tuple: Indice della riga e limiti orizzontali (x0, x1) dell'intestazione di ogni colonna,
+           oppure None se la pagina non contiene la tabella.
+    """
+    for index, line in enumerate(lines):
+        texts = [word["text"].upper() for word in line]
+        positions = {}
+        for column, labels in ing_statement_columns.items():
+            for start in range(len(texts) - len(labels) + 1):
+                if tuple(texts[start : start + len(labels)]) == labels:
+                    positions[column] = (
+                        line[start]["x0"],
+                        line[start + len(labels) - 1]["x1"],
+                    )
+                    break
+        if len(positions) == len(ing_statement_columns):
+            return index, positions
+    return None
+
+
+def build_column_bounds(positions):
+    """
+    Calcola i confini orizzontali delle colonne: ogni confine cade a metà tra la fine
+    di un'intestazione e l'inizio della successiva, così che gli importi allineati a destra
+    e le descrizioni allineate a sinistra restino nella propria colonna.
+    """
+    ordered = sorted(positions.items(), key=lambda item: item[1][0])
+    bounds = []
+    for i, (column, (x0, x1)) in enumerate(ordered):
+        left = (ordered[i - 1][1][1] + x0) / 2 if i > 0 else float("-inf")
+        right = (x1 + ordered[i + 1][1][0]) / 2 if i < len(ordered) - 1 else float("inf")
+        bounds.append((column, left, right))
+    return bounds
+
+
+def split_line_into_cells(line, bounds):
+    """
+    Assegna le parole di una riga alle colonne in base al centro di ogni parola.
+    """
+    cells = {}
+    for word in line:
+        center = (word["x0"] + word["x1"]) / 2
+        for column, left, right in bounds:
+            if left <= center < right:
+                cells.setdefault(column, []).append(word["text"])
+                break
+    return {column: " ".join(texts) for column, texts in cells.items()}
+
+
+def normalize_amount(text, sign):
+    """
+    Riporta un importo nel formato dell'export CSV di ING (es. '1.234,50 €' -> '-1.234,50').
+    """
+    amount = text.replace("€", "").replace(" ", "").lstrip("+-")
+    if not amount_pattern.match(amount):
+        return None
+    return sign + amount
+
+
+def parse_page_movements(page):
+    """
+    Estrae i movimenti di una pagina: una riga con la data contabile apre un nuovo movimento,
+    le righe successive vicine con testo solo in causale e descrizione lo proseguono.
+
+    Parametri:
+    page (pdfplumber.page.Page): Pagina dell'estratto conto.
+
+    Ritorna:
+    list: Movimenti con le colonne dell'export CSV, oppure None se la pagina non contiene la tabella.
+    """
+    lines = group_words_into_lines(page.extract_words())
+    header = find_header(lines)
+    if header is None:
+        return None
+    header_index, positions = header
+    bounds = build_column_bounds(positions)
+
+    movements, current, previous_line = [], None, lines[header_index]
+    for line in lines[header_index + 1 :]:
+        cells = split_line_into_cells(line, bounds)
+        line_height = line[0]["bottom"] - line[0]["top"]
+        gap = line[0]["top"] - previous_line[0]["bottom"]
+        previous_line = line
+
+        if date_pattern.match(cells.get("DATA CONTABILE", "")):
+            current = {column: cells.get(column) for column in ing_statement_columns}
+            movements.append(current)
+        elif (
+            current is not None
+            and gap <= max_continuation_gap * line_height
+            and set(cells) <= set(ing_multiline_columns)
+        ):
+            for column, text in cells.items():
+                current[column] = f"{current[column]} {text}" if current[column] else text
+        else:
+            # Fine della tabella (totali, note o piè di pagina)
+            current = None
+    return movements
+
+
+def is_valid_movement(movement):
+    """
+    Verifica un movimento estratto: date nel formato dd/mm/yyyy, esattamente un importo
+    e una descrizione.
+    """
+    if movement["DATA VALUTA"] and not date_pattern.match(movement["DATA VALUTA"]):
+        return False
+    amounts = [movement["USCITE"], movement["ENTRATE"]]
+    if sum(amount is not None for amount in amounts) != 1:
+        return False
+    return bool(movement["DESCRIZIONE OPERAZIONE"])
+
+
+def parse_statement_pdf(pdf_path):
+    """
+    Estrae i movimenti di un estratto conto ING in PDF leggendo la tabella dei movimenti
+    con le posizioni delle parole, senza interrogare l'LLM.
+
+    Parametri:
+    pdf_path (str): Il percorso del file PDF.
+
+    Ritorna:
+    pd.DataFrame: DataFrame con le colonne dell'export CSV di ING (DATA CONTABILE, DATA VALUTA,
+                  USCITE, ENTRATE, CAUSALE e DESCRIZIONE OPERAZIONE), oppure None se il layout
+                  non è riconosciuto.
+    """
+    movements = []
+    try:
+        with pdfplumber.open(pdf_path) as pdf:
+            for page in pdf.pages:
+                page_movements = parse_page_movements(page)
+                if page_movements is not None:
+                    movements.extend(page_movements)
+    except Exception as e:
+        logger.error(f"Errore durante la lettura dell'estratto conto {pdf_path}: {e}")
+        return None
+
+    for movement in movements:
+        movement["USCITE"] = movement["USCITE"] and normalize_amount(movement["USCITE"], "-")
+        movement["ENTRATE"] = movement["ENTRATE"] and normalize_amount(movement["ENTRATE"], "+")
+
+    if not movements or not all(is_valid_movement(movement) for movement in movements):
+        logger.info(f"Layout dell'estratto conto non riconosciuto: {pdf_path}")
+        return None
+
+    logger.info(f"Estratti {len(movements)} movimenti dall'estratto conto {pdf_path}.")
+    return pd.DataFrame(movements, columns=list(ing_statement_columns), dtype=object)
@@ -1,9 +1,8 @@
-import hashlib
-import locale
-
 from resources.constants.bank_transactions.BankConstants import *
 from resources.constants.common.Constants import *
 from resources.functions.DataFrameFunctions import *
+from resources.functions.DateFunctions import parse_italian_dates
+from resources.functions.RecordKeyFunctions import build_record_keys
 
 # Configura il logger
 logging.basicConfig(
@@ -11,8 +10,54 @@ logging.basicConfig(
 )
 logger = logging.getLogger()
 
-# Imposta la localizzazione
-locale.setlocale(locale.LC_TIME, "it_IT.UTF-8")
+
+def format_italian_amount(value, sign):
+    """
+    Formatta un importo come nell'export CSV di ING (es. 1234.5 -> '-1.234,50').
+    """
+    if value is None or pd.isnull(value):
+        return None
+    formatted = f"{abs(float(value)):,.2f}".replace(",", "_").replace(".", ",").replace("_", ".")
+    return sign + formatted
+
+
+def build_df_from_copilot_movements(movements):
+    """
+    Converte i movimenti estratti da Copilot (vedi bank_copilot_movements_to_extract)
+    in un DataFrame con le colonne dell'export CSV di ING, così da passare per transform_df
+    e ottenere le stesse record_key dei movimenti importati da CSV.
+
+    Parametri:
+    movements (list[dict]): Movimenti restituiti da Copilot.
+
+    Ritorna:
+    pd.DataFrame: DataFrame con le colonne DATA CONTABILE, DATA VALUTA, USCITE, ENTRATE,
+                  CAUSALE e DESCRIZIONE OPERAZIONE.
+    """
+    rows = [
+        {
+            "DATA CONTABILE": movement.get("data_contabile"),
+            "DATA VALUTA": movement.get("data_valuta"),
+            "USCITE": format_italian_amount(movement.get("uscite"), "-"),
+            "ENTRATE": format_italian_amount(movement.get("entrate"), "+"),
+            "CAUSALE": movement.get("causale"),
+            "DESCRIZIONE OPERAZIONE": movement.get("descrizione_operazione"),
+        }
+        for movement in movements
+        if isinstance(movement, dict)
+    ]
+    return pd.DataFrame(
+        rows,
+        columns=[
+            "DATA CONTABILE",
+            "DATA VALUTA",
+            "USCITE",
+            "ENTRATE",
+            "CAUSALE",
+            "DESCRIZIONE OPERAZIONE",
+        ],
+        dtype=object,
+    )
 
 
 def transform_df(df, columns_to_select, extracted_date):
@@ -48,46 +93,21 @@ def transform_df(df, columns_to_select, extracted_date):
     df["note"] = "File Estratto Conto Trimestrale - Script completato con successo"
     df["data_operazione"] = pd.to_datetime(df["DATA VALUTA"], format="%d/%m/%Y").dt.strftime("%Y-%m-%d")
 
-    df["concatenated_key"] = (
-        df["data_operazione"].astype(str)
-        + "|"
-        + df["uscite"].astype(str)
-        + "|"
-        + df["entrate"].astype(str)
-        + "|"
-        + df["descrizione"].astype(str)
-        + "|"
-        + df["causale"].astype(str)
-    )
-    df["record_key"] = df["concatenated_key"].apply(
-        lambda x: hashlib.sha256(x.encode()).hexdigest()
-    )
+    df["record_key"] = build_record_keys(df, bank_record_key_columns)
     df["data_estratto_conto"] = extracted_date  # Aggiungi la colonna con la data
-    df["data_estratto_conto"] = pd.to_datetime(df["data_estratto_conto"])  # Converti la colonna in formato datetime
+    df["data_estratto_conto"] = pd.to_datetime(parse_italian_dates(df["data_estratto_conto"]))  # Converti la colonna in formato datetime
     df["data_estratto_conto"] = df["data_estratto_conto"].dt.strftime("%d/%m/%Y")  # Applica il formato desiderato
 
     logger.info("Colonne base aggiunte")
 
     # Verifica i campi obbligatori e aggiorna la colonna 'note' per i campi mancanti
-    for field in bank_df_mandatory_fields:
-        missing_count = df[field].isnull().sum()
-        if missing_count > 0:
-            logger.warning(
-                f"Ci sono {missing_count} valori mancanti nella colonna '{field}'."
-            )
-        df["note"] = df.apply(
-            lambda row: (
-                row["note"] + f"; Verificare {field} mancante"
-                if pd.isnull(row[field])
-                else row["note"]
-            ),
-            axis=1,
-        )
+    validation_issues = validate_mandatory_fields(df, bank_df_mandatory_fields)
 
     selected_df = select_columns_from_df(columns_to_select, df)
     selected_df = cast_columns_with_defaults(
         selected_df, bank_df_schema, df_default_values
     )
+    selected_df.attrs["validation_issues"] = validation_issues.to_dict("records")
 
     logger.info(f"Selezionate {len(columns_to_select)} colonne: {columns_to_select}.")
     logger.info("Trasformazione completata.")
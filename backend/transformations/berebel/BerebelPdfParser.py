@@ -0,0 +1,70 @@
+import logging
+
+import pandas as pd
+
+from resources.constants.berebel.BerebelConstants import (
+    berebel_df_mandatory_fields,
+    berebel_statement_template,
+)
+from resources.functions.PdfFunctions import extract_pdf_pages
+from resources.functions.TemplateExtractionFunctions import (
+    compile_template,
+    extract_template_fields,
+    find_unreliable_fields,
+)
+
+# Configura il logger
+logging.basicConfig(
+    level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s"
+)
+logger = logging.getLogger()
+
+# Template compilato una sola volta all'import del modulo
+compiled_berebel_template = compile_template(berebel_statement_template)
+
+
+def extract_statement_fields(pdf_path):
+    """
+    Estrae i campi di un estratto conto BeRebel con il template, senza interrogare l'LLM.
+
+    Parametri:
+    pdf_path (str): Il percorso del file PDF.
+
+    Ritorna:
+    tuple: Valori dei campi di berebel_copilot_info_to_extract e confidenza di ogni campo,
+           dizionari vuoti se il documento non è un estratto conto BeRebel.
+    """
+    text = "\n".join(extract_pdf_pages(pdf_path))
+    if not compiled_berebel_template["detect"].search(text):
+        return {}, {}
+    return extract_template_fields(text, compiled_berebel_template)
+
+
+def parse_statement_pdf(pdf_path):
+    """
+    Legge direttamente un estratto conto BeRebel in PDF.
+
+    Parametri:
+    pdf_path (str): Il percorso del file PDF.
+
+    Ritorna:
+    pd.DataFrame: Una riga con i campi dell'estratto conto, anche incompleta (confidenze in
+                  attrs['field_confidence']), oppure None se il layout non è riconosciuto.
+    """
+    try:
+        fields, confidences = extract_statement_fields(pdf_path)
+    except Exception as e:
+        logger.error(f"Errore durante la lettura dell'estratto conto {pdf_path}: {e}")
+        return None
+
+    if not fields:
+        logger.info(f"Layout dell'estratto conto non riconosciuto: {pdf_path}")
+        return None
+    unreliable_fields = find_unreliable_fields(fields, confidences, berebel_df_mandatory_fields)
+    logger.info(
+        f"Estratto conto {pdf_path} letto con il template BeRebel, "
+        f"campi mancanti o incerti: {unreliable_fields or 'nessuno'}."
+    )
+    df = pd.DataFrame([fields])
+    df.attrs["field_confidence"] = confidences
+    return df
@@ -0,0 +1,77 @@
+import logging
+
+import pandas as pd
+
+from resources.constants.light_bills.LightBillsConstants import (
+    light_bill_templates,
+    light_df_mandatory_fields,
+)
+from resources.functions.PdfFunctions import extract_pdf_pages
+from resources.functions.TemplateExtractionFunctions import (
+    compile_template,
+    detect_template,
+    extract_template_fields,
+    find_unreliable_fields,
+)
+
+# Configura il logger
+logging.basicConfig(
+    level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s"
+)
+logger = logging.getLogger()
+
+# Template dei fornitori compilati una sola volta all'import del modulo
+compiled_light_bill_templates = {
+    supplier: compile_template(template)
+    for supplier, template in light_bill_templates.items()
+}
+
+
+def extract_bill_fields(pdf_path):
+    """
+    Estrae i campi di una bolletta della luce con il template del fornitore, senza interrogare l'LLM.
+    Il testo è quello completo del PDF (stessa cache di extract_pdf_data, senza limite di caratteri):
+    i dettagli degli importi sono nelle ultime pagine.
+
+    Parametri:
+    pdf_path (str): Il percorso del file PDF.
+
+    Ritorna:
+    tuple: Valori dei campi di light_copilot_info_to_extract e confidenza di ogni campo,
+           dizionari vuoti se il fornitore non è riconosciuto.
+    """
+    text = "\n".join(extract_pdf_pages(pdf_path))
+    supplier = detect_template(text, compiled_light_bill_templates)
+    if supplier is None:
+        return {}, {}
+    return extract_template_fields(text, compiled_light_bill_templates[supplier])
+
+
+def parse_bill_pdf(pdf_path):
+    """
+    Legge direttamente una bolletta della luce in PDF.
+
+    Parametri:
+    pdf_path (str): Il percorso del file PDF.
+
+    Ritorna:
+    pd.DataFrame: Una riga con i campi della bolletta, anche incompleta (confidenze in
+                  attrs['field_confidence']), oppure None se il fornitore non è riconosciuto.
+    """
+    try:
+        fields, confidences = extract_bill_fields(pdf_path)
+    except Exception as e:
+        logger.error(f"Errore durante la lettura della bolletta {pdf_path}: {e}")
+        return None
+
+    if not fields:
+        logger.info(f"Fornitore della bolletta non riconosciuto: {pdf_path}")
+        return None
+    unreliable_fields = find_unreliable_fields(fields, confidences, light_df_mandatory_fields)
+    logger.info(
+        f"Bolletta {pdf_path} letta con il template {fields['fornitore']}, "
+        f"campi mancanti o incerti: {unreliable_fields or 'nessuno'}."
+    )
+    df = pd.DataFrame([fields])
+    df.attrs["field_confidence"] = confidences
+    return df
@@ -1,8 +1,6 @@
-import locale
 import logging
 
 import numpy as np
-import pandas as pd
 
 from resources.constants.common.Constants import df_default_values
 from resources.constants.light_bills.LightBillsConstants import (
@@ -12,7 +10,9 @@ from resources.constants.light_bills.LightBillsConstants import (
 from resources.functions.DataFrameFunctions import (
     select_columns_from_df,
     cast_columns_with_defaults,
+    validate_mandatory_fields,
 )
+from resources.functions.DateFunctions import parse_italian_dates
 
 # Configura il logger
 logging.basicConfig(
@@ -20,40 +20,23 @@ logging.basicConfig(
 )
 logger = logging.getLogger()
 
-# Imposta la localizzazione
-locale.setlocale(locale.LC_TIME, "it_IT.UTF-8")
-
 
 def transform_df(df, columns_to_select):
     logger.info("Inizio della trasformazione del DataFrame.")
 
     # Aggiungi colonne al DataFrame
     df["note"] = "Script completato con successo"
-    df["data_fattura"] = df["data_fattura"].apply(
-        lambda x: pd.to_datetime(f"01-{x}", format="%d-%B %Y").date()
-    )
+    df["data_fattura"] = parse_italian_dates(df["data_fattura"])
     logger.info("Colonne base aggiunte")
 
     # Verifica i campi obbligatori e aggiorna la colonna 'note' per i campi mancanti
-    for field in light_df_mandatory_fields:
-        missing_count = df[field].isnull().sum()
-        if missing_count > 0:
-            logger.warning(
-                f"Ci sono {missing_count} valori mancanti nella colonna '{field}'."
-            )
-        df["note"] = df.apply(
-            lambda row: (
-                row["note"] + f"; Verificare {field} mancante"
-                if pd.isnull(row[field])
-                else row["note"]
-            ),
-            axis=1,
-        )
+    validation_issues = validate_mandatory_fields(df, light_df_mandatory_fields)
 
     selected_df = select_columns_from_df(columns_to_select, df)
     selected_df = cast_columns_with_defaults(
         selected_df, light_df_schema, df_default_values
     )
+    selected_df.attrs["validation_issues"] = validation_issues.to_dict("records")
 
     # Arrotonda i valori float per eccesso a due cifre decimali
     for column, dtype in light_df_schema.items():
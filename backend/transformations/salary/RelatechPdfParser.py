@@ -0,0 +1,128 @@
+import logging
+import re
+
+import pandas as pd
+import pdfplumber
+
+from resources.constants.salary.RelatechConstants import (
+    relatech_df_mandatory_fields,
+    relatech_payslip_template,
+)
+from resources.functions.TemplateExtractionFunctions import (
+    find_unreliable_fields,
+    parse_italian_number,
+    template_confidence,
+)
+
+# Configura il logger
+logging.basicConfig(
+    level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s"
+)
+logger = logging.getLogger()
+
+period_pattern = re.compile(r"[A-Za-z]+ \d{4}")
+
+
+def read_template_field(words, spec):
+    """
+    Legge il valore di un campo del template da una pagina: cerca l'etichetta e raccoglie
+    le parole nella regione del valore (intervallo orizzontale e scostamento verticale dall'etichetta).
+
+    Parametri:
+    words (list): Parole della pagina (pdfplumber extract_words).
+    spec (dict): Definizione del campo in relatech_payslip_template.
+
+    Ritorna:
+    str: Testo della regione del valore, oppure None se l'etichetta non è nella pagina.
+    """
+    label = re.compile(spec["label"])
+    anchor = next((word for word in words if label.match(word["text"])), None)
+    if anchor is None:
+        return None
+    x0, x1 = spec["x"]
+    dy0, dy1 = spec["dy"]
+    region = [
+        word
+        for word in words
+        if x0 <= (word["x0"] + word["x1"]) / 2 <= x1
+        and dy0 <= word["top"] - anchor["top"] <= dy1
+        and word is not anchor
+    ]
+    return " ".join(word["text"] for word in sorted(region, key=lambda word: word["x0"]))
+
+
+def convert_template_value(text, value_type):
+    """
+    Converte il testo letto da una regione nel tipo del campo ('period', 'int' o 'float').
+    """
+    if not text:
+        return None
+    if value_type == "period":
+        match = period_pattern.search(text)
+        return match.group() if match else None
+    number = parse_italian_number(text)
+    if number is None:
+        return None
+    return int(number) if value_type == "int" else number
+
+
+def extract_payslip_fields(pdf_path):
+    """
+    Estrae i campi del cedolino Relatech leggendo le regioni del template con le coordinate
+    delle parole, senza interrogare l'LLM. Per ogni campo viene usata la prima pagina in cui
+    la regione contiene un valore (i totali sono solo sull'ultima pagina).
+
+    Parametri:
+    pdf_path (str): Il percorso del file PDF.
+
+    Ritorna:
+    tuple: Valori dei campi di relatech_copilot_info_to_extract (None se non trovati),
+           nella forma consumata da RelatechTransform.transform_df, e confidenza di ogni campo
+           (la regione del template identifica un solo valore: 1 se trovato, 0 altrimenti).
+    """
+    fields = {field: None for field in relatech_payslip_template}
+    with pdfplumber.open(pdf_path) as pdf:
+        for page in pdf.pages:
+            words = page.extract_words()
+            for field, spec in relatech_payslip_template.items():
+                if fields[field] is None:
+                    fields[field] = convert_template_value(
+                        read_template_field(words, spec), spec["type"]
+                    )
+    confidences = {
+        field: template_confidence["match"] if value is not None else 0.0
+        for field, value in fields.items()
+    }
+    return fields, confidences
+
+
+def parse_payslip_pdf(pdf_path):
+    """
+    Legge direttamente un cedolino Relatech in PDF.
+
+    Parametri:
+    pdf_path (str): Il percorso del file PDF.
+
+    Ritorna:
+    pd.DataFrame: Una riga con i campi del cedolino, anche incompleta (confidenze in
+                  attrs['field_confidence']), oppure None se il layout non è riconosciuto
+                  (nessun campo obbligatorio trovato).
+    """
+    try:
+        fields, confidences = extract_payslip_fields(pdf_path)
+    except Exception as e:
+        logger.error(f"Errore durante la lettura del cedolino {pdf_path}: {e}")
+        return None
+
+    missing_fields = find_unreliable_fields(fields, confidences, relatech_df_mandatory_fields)
+    if len(missing_fields) == len(relatech_df_mandatory_fields):
+        logger.info(f"Layout del cedolino non riconosciuto: {pdf_path}")
+        return None
+
+    logger.info(
+        f"Cedolino {pdf_path} letto con il template Relatech, "
+        f"campi mancanti: {missing_fields or 'nessuno'}."
+    )
+    df = pd.DataFrame([fields])
+    df.attrs["field_confidence"] = confidences
+    return df
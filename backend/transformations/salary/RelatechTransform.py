@@ -1,19 +1,20 @@
-import hashlib
-import locale
 import logging
 
 import numpy as np
-import pandas as pd
 
 from resources.constants.common.Constants import df_default_values
 from resources.constants.salary.RelatechConstants import (
     relatech_df_mandatory_fields,
     relatech_df_schema,
+    relatech_record_key_columns,
 )
 from resources.functions.DataFrameFunctions import (
     select_columns_from_df,
     cast_columns_with_defaults,
+    validate_mandatory_fields,
 )
+from resources.functions.DateFunctions import parse_italian_dates
+from resources.functions.RecordKeyFunctions import build_record_keys
 
 # Configura il logger
 logging.basicConfig(
@@ -21,54 +22,33 @@ logging.basicConfig(
 )
 logger = logging.getLogger()
 
-# Imposta la localizzazione
-locale.setlocale(locale.LC_TIME, "it_IT.UTF-8")
-
 
 def transform_df(df, columns_to_select):
     logger.info("Inizio della trasformazione del DataFrame.")
 
     # Aggiungi colonne al DataFrame
     df["ragione_sociale_azienda"] = "Relatech Spa"
-    df["date_periodo_di_retribuzione"] = df["periodo_di_retribuzione"].apply(
-        lambda x: pd.to_datetime(f"01-{x}", format="%d-%B %Y").date()
-    )
+    df["date_periodo_di_retribuzione"] = parse_italian_dates(df["periodo_di_retribuzione"])
     df["string_periodo_di_retribuzione"] = df["periodo_di_retribuzione"]
     df["retribuzione_minima_lorda"] = df["totale_retribuzione_minima_lorda"]
     df["percentuale_maggiorazione_ore_straordinario"] = 15
     df["irpef_pagata"] = df["ritenute_irpef"]
     df["note"] = "Script completato con successo"
-    df["concatenated_key"] = (
-        df["date_periodo_di_retribuzione"].astype(str)
-        + "|"
-        + df["netto_del_mese"].astype(int).astype(str)
-    )
-    df["record_key"] = df["concatenated_key"].apply(
-        lambda x: hashlib.sha256(x.encode()).hexdigest()
+    df["record_key"] = build_record_keys(
+        df.assign(netto_del_mese=df["netto_del_mese"].astype(int)),
+        relatech_record_key_columns,
     )
 
     logger.info("Colonne aggiunte.")
 
     # Verifica i campi obbligatori e aggiorna la colonna 'note' per i campi mancanti
-    for field in relatech_df_mandatory_fields:
-        missing_count = df[field].isnull().sum()
-        if missing_count > 0:
-            logger.warning(
-                f"Ci sono {missing_count} valori mancanti nella colonna '{field}'."
-            )
-        df["note"] = df.apply(
-            lambda row: (
-                row["note"] + f"; Verificare {field} mancante"
-                if pd.isnull(row[field])
-                else row["note"]
-            ),
-            axis=1,
-        )
+    validation_issues = validate_mandatory_fields(df, relatech_df_mandatory_fields)
 
     selected_df = select_columns_from_df(columns_to_select, df)
     selected_df = cast_columns_with_defaults(
         selected_df, relatech_df_schema, df_default_values
     )
+    selected_df.attrs["validation_issues"] = validation_issues.to_dict("records")
 
     # Arrotonda i valori float per eccesso a due cifre decimali
     for column, dtype in relatech_df_schema.items():